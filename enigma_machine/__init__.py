@@ -1,4 +1,5 @@
 from .components import *
+from .compiled_enigma_machine import *
 from .enigma_machine import *
 from .exceptions import *
 from .constants import *
@@ -0,0 +1,31 @@
+import argparse
+import sys
+
+from enigma_machine.compiled_enigma_machine import CompiledEnigmaMachine
+from enigma_machine.enigma_setup import EnigmaSetup
+from enigma_machine.streaming import DEFAULT_CHUNK_SIZE, encode_stream
+
+parser = argparse.ArgumentParser(
+    prog="python -m enigma_machine",
+    description=(
+        "Encode or decode a file, or stdin, with an Enigma machine. The input is read in chunks, "
+        "so files larger than the memory can be processed."
+    ),
+)
+parser.add_argument("setup", help='Enigma setup, e.g. "I-II-III B 01-01-01 A-A-Z HL-MO-AJ"')
+parser.add_argument("-i", "--input", type=argparse.FileType("r"), default=sys.stdin, help="Input file")
+parser.add_argument("-o", "--output", type=argparse.FileType("w"), default=sys.stdout, help="Output file")
+parser.add_argument("-c", "--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Characters read at a time")
+parser.add_argument(
+    "--strict", action="store_true", help="Fail on anything else than letters instead of passing it through"
+)
+
+
+def main():
+    args = parser.parse_args()
+    machine = CompiledEnigmaMachine(EnigmaSetup.from_string(args.setup))
+    encode_stream(machine, args.input, args.output, args.chunk_size, skip_non_letters=not args.strict)
+
+
+if __name__ == '__main__':
+    main()
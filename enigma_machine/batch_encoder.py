@@ -0,0 +1,146 @@
+from typing import Optional, Sequence, Union
+
+from enigma_machine.compiled_enigma_machine import from_indices, notch_index, to_indices, wiring_tables
+from enigma_machine.components.rotors import RotorLabel, RotorWiring
+from enigma_machine.constants import ENGLISH_ALPHABET, ENGLISH_ALPHABET_SIZE
+from enigma_machine.enigma_setup import EnigmaSetup
+from enigma_machine.exceptions import IncompatibleConfiguration
+from enigma_machine.optional_dependencies import require_numpy
+
+np = require_numpy()
+
+
+class BatchEncoder:
+    """Encodes one message under many candidate keys at once with NumPy.
+
+    The rotor order and plugboard are taken from the setup, while the start positions, ring settings and reflector
+    may differ per candidate. Each keystroke is a handful of gather operations over all the candidates, so sweeping
+    thousands of keys costs about as much as a few messages on the compiled machine.
+
+    Example:
+        * encoder = BatchEncoder(EnigmaSetup.from_string("BETA-I-III B 23-02-10 A-A-A VH-PT-ZG-BJ-EY-FS"))
+        * decodes = encoder.encode(code, positions=[[0, 0, 0], [1, 0, 0]]) gives a (2, len(code)) array
+    """
+
+    def __init__(self, setup: EnigmaSetup, reflectors: Optional[Sequence[Union[RotorLabel, str]]] = None):
+        """
+        :param setup: (EnigmaSetup) rotor order, plugboard and default key of every candidate
+        :param reflectors: reflector labels or wirings candidates can choose from, defaults to the setup reflector
+        """
+        if len(setup.rotor_labels) not in (3, 4):
+            raise IncompatibleConfiguration("The batch encoder requires 3 or 4 rotors")
+
+        self.setup = setup
+        self.reflectors = list(reflectors or [setup.reflector_label])
+
+        plugboard = np.arange(ENGLISH_ALPHABET_SIZE, dtype=np.intp)
+        for lead in setup.plugs:
+            one, two = ENGLISH_ALPHABET.index(lead.plug_one), ENGLISH_ALPHABET.index(lead.plug_two)
+            plugboard[one], plugboard[two] = two, one
+        self.__plugboard = plugboard
+
+        self.__forward, self.__inverse = [], []
+        for label in setup.rotor_labels:
+            forward_rows, inverse_rows = wiring_tables(RotorWiring.from_label(label))
+            self.__forward.append(np.array(forward_rows, dtype=np.intp))
+            self.__inverse.append(np.array(inverse_rows, dtype=np.intp))
+
+        self.__reflectors = np.array(
+            [
+                [ENGLISH_ALPHABET.index(c) for c in (
+                    RotorWiring.from_label(reflector) if isinstance(reflector, RotorLabel) else reflector
+                )]
+                for reflector in self.reflectors
+            ],
+            dtype=np.intp,
+        )
+        self.__notches = [
+            np.array([notch_index(label, ring) for ring in range(ENGLISH_ALPHABET_SIZE)], dtype=np.intp)
+            for label in setup.rotor_labels[:2]
+        ]
+
+    def encode(self, message: str, positions=None, ring_settings=None, reflectors=None) -> np.ndarray:
+        """Encode or decode a message under every candidate key.
+        Keys are given from the right-most rotor to the left-most one, as in EnigmaSetup, and broadcast against
+        each other, so e.g. a single ring setting applies to all the candidate positions.
+
+        :param message: (str) message in a-zA-Z
+        :param positions: (array) candidates x rotors start positions as letter indices 0-25
+        :param ring_settings: (array) candidates x rotors ring settings in 1-26
+        :param reflectors: (array) candidate reflectors as indices into the encoder reflectors
+        :return: (np.ndarray) candidates x message length letter indices
+        """
+        rotor_count = len(self.setup.rotor_labels)
+        if positions is None:
+            positions = [ENGLISH_ALPHABET.index(p) for p in self.setup.initial_positions]
+        if ring_settings is None:
+            ring_settings = [int(r) for r in self.setup.ring_settings]
+        if reflectors is None:
+            reflectors = 0
+
+        positions = np.atleast_2d(np.asarray(positions, dtype=np.intp))
+        rings = np.atleast_2d(np.asarray(ring_settings, dtype=np.intp)) - 1  # ring settings should be in 0-25
+        positions, rings = np.broadcast_arrays(positions, rings)
+        if positions.shape[1] != rotor_count:
+            raise IncompatibleConfiguration(f"Please provide {rotor_count} positions and ring settings per candidate")
+
+        reflectors = np.broadcast_to(np.asarray(reflectors, dtype=np.intp), positions[:, 0].shape)
+        reflector_tables = self.__reflectors[reflectors]
+
+        p = (positions - rings) % ENGLISH_ALPHABET_SIZE
+        p0, p1, p2 = p[:, 0].copy(), p[:, 1].copy(), p[:, 2].copy()
+        n0, n1 = self.__notches[0][rings[:, 0]], self.__notches[1][rings[:, 1]]
+        candidates = np.arange(len(p0))
+
+        # the reflector and a fourth rotor never rotate, thus they are combined once per candidate
+        core = reflector_tables
+        if rotor_count == 4:
+            letters = np.arange(ENGLISH_ALPHABET_SIZE)
+            p3 = p[:, 3][:, np.newaxis]
+            core = self.__inverse[3][p3, core[candidates[:, np.newaxis], self.__forward[3][p3, letters]]]
+
+        indices = to_indices(message)
+        encoded = np.empty((len(p0), len(indices)), dtype=np.uint8)
+        for inx, c in enumerate(indices):
+            # rotate the rotors from right to left, including the double step of the middle rotor
+            right_notch, middle_notch = p0 == n0, p1 == n1
+            p0 = (p0 + 1) % ENGLISH_ALPHABET_SIZE
+            p1 = (p1 + (right_notch | middle_notch)) % ENGLISH_ALPHABET_SIZE
+            p2 = (p2 + middle_notch) % ENGLISH_ALPHABET_SIZE
+
+            x = self.__forward[0][p0, self.__plugboard[c]]
+            x = self.__forward[1][p1, x]
+            x = self.__forward[2][p2, x]
+            x = core[candidates, x]
+            x = self.__inverse[2][p2, x]
+            x = self.__inverse[1][p1, x]
+            x = self.__inverse[0][p0, x]
+            encoded[:, inx] = self.__plugboard[x]
+
+        return encoded
+
+    def decode(self, message: str, positions=None, ring_settings=None, reflectors=None) -> np.ndarray:
+        """Alias to encode
+        """
+        return self.encode(message, positions, ring_settings, reflectors)
+
+    @staticmethod
+    def find(encoded: np.ndarray, crib: str) -> np.ndarray:
+        """Candidates whose decoded message contains the crib
+        :param encoded: (np.ndarray) candidates x message length letter indices, as given by encode
+        :param crib: (str) a clue to be found in the message
+        :return: (np.ndarray) candidate indices
+        """
+        crib = np.frombuffer(to_indices(crib), dtype=np.uint8)
+        if len(crib) > encoded.shape[1]:
+            return np.empty(0, dtype=np.intp)
+        windows = np.lib.stride_tricks.sliding_window_view(encoded, len(crib), axis=1)
+        return np.flatnonzero((windows == crib).all(axis=2).any(axis=1))
+
+    @staticmethod
+    def to_string(encoded_row: np.ndarray) -> str:
+        """Convert a row of letter indices into a message
+        :param encoded_row: (np.ndarray) letter indices
+        :return: (str) message
+        """
+        return from_indices(np.asarray(encoded_row, dtype=np.uint8).tobytes())
@@ -0,0 +1,137 @@
+import logging
+import mmap
+import multiprocessing
+import os
+import time
+from typing import NamedTuple, Optional, Tuple
+
+from enigma_machine.compiled_enigma_machine import CompiledEnigmaMachine
+
+logging.basicConfig(level=os.environ.get("LOG_LEVEL", logging.INFO))
+logger = logging.getLogger(__name__)
+
+DEFAULT_SLICE_SIZE = 1 << 22  # 4 MiB of letters per worker task
+
+
+class BulkEncodingReport(NamedTuple):
+    """Outcome of encoding a file in bulk"""
+    letters: int
+    seconds: float
+    processes: int
+
+    @property
+    def throughput(self) -> float:
+        """Letters per second"""
+        return self.letters / self.seconds if self.seconds else float("inf")
+
+
+def encode_file(
+        machine: CompiledEnigmaMachine,
+        input_path: str,
+        output_path: str,
+        processes: Optional[int] = None,
+        slice_size: int = DEFAULT_SLICE_SIZE,
+) -> BulkEncodingReport:
+    """Encode or decode a file of ASCII letters into another file.
+
+    Both files are memory-mapped and split by keystroke offset into slices. Worker processes seek their own copy of
+    the machine to the offset of each slice and encode it straight from the input mapping into the output mapping,
+    so no part of the file is ever read into a Python string. The machine ends up where a serial encode would leave it.
+
+    :param machine: (CompiledEnigmaMachine) the machine, e.g., EnigmaMachine(setup).compile()
+    :param input_path: (str) file with letters in a-zA-Z only, i.e., no line breaks
+    :param output_path: (str) file to be created or overwritten
+    :param processes: (int) number of worker processes, defaults to the CPU count
+    :param slice_size: (int) letters per worker task
+    :return: (BulkEncodingReport) letters encoded, elapsed time and throughput
+    :raises ValueError: if the input contains anything else than letters
+    """
+    start_time = time.perf_counter()
+    processes = processes or os.cpu_count() or 1
+    start_positions = machine.positions
+    size = os.path.getsize(input_path)
+
+    with open(output_path, "wb") as output_file:
+        output_file.truncate(size)
+
+    if size:
+        slices = [(offset, min(slice_size, size - offset)) for offset in range(0, size, slice_size)]
+        if processes == 1 or len(slices) == 1:
+            # slices are encoded in order, so the machine simply carries on from one to the next
+            input_map, output_map = _map_files(input_path, output_path)
+            try:
+                for offset, length in slices:
+                    _encode_into(machine, input_map, output_map, offset, length)
+            finally:
+                input_map.close()
+                output_map.close()
+        else:
+            with multiprocessing.Pool(
+                    processes, initializer=_init_worker, initargs=(machine, input_path, output_path)
+            ) as pool:
+                for _ in pool.imap_unordered(_encode_slice, slices):
+                    pass
+            machine.positions = start_positions
+            machine.advance(size)
+
+    report = BulkEncodingReport(letters=size, seconds=time.perf_counter() - start_time, processes=processes)
+    logger.info(
+        f"encoded {report.letters} letters in {report.seconds:.3f} seconds "
+        f"({report.throughput / 1e6:.2f} M letters/s, {report.processes} processes)"
+    )
+    return report
+
+
+_worker_machine: Optional[CompiledEnigmaMachine] = None
+_worker_positions = None
+_worker_files = None
+
+
+def _map_files(input_path: str, output_path: str) -> Tuple[mmap.mmap, mmap.mmap]:
+    """Map the input file for reading and the output file for writing
+    :param input_path: (str) input file
+    :param output_path: (str) output file, already of the same size
+    :return: (tuple) input mapping, output mapping
+    """
+    with open(input_path, "rb") as input_file, open(output_path, "r+b") as output_file:
+        # mappings stay valid after the files are closed
+        return (
+            mmap.mmap(input_file.fileno(), 0, access=mmap.ACCESS_READ),
+            mmap.mmap(output_file.fileno(), 0, access=mmap.ACCESS_WRITE),
+        )
+
+
+def _encode_into(machine: CompiledEnigmaMachine, input_map: mmap.mmap, output_map: mmap.mmap, offset: int,
+                 length: int):
+    """Encode a slice of the input mapping into the same slice of the output mapping, from where the machine is
+    :param machine: (CompiledEnigmaMachine) machine at the positions the slice starts at
+    :param input_map: (mmap.mmap) input mapping
+    :param output_map: (mmap.mmap) output mapping
+    :param offset: (int) offset of the slice
+    :param length: (int) length of the slice
+    """
+    with memoryview(input_map)[offset:offset + length] as source, \
+            memoryview(output_map)[offset:offset + length] as destination:
+        machine.encode_into(source, destination)
+
+
+def _init_worker(machine: CompiledEnigmaMachine, input_path: str, output_path: str):
+    """Keep the machine and the file mappings once per worker process
+    :param machine: (CompiledEnigmaMachine) machine at the positions the file starts at
+    :param input_path: (str) input file
+    :param output_path: (str) output file
+    """
+    global _worker_machine, _worker_positions, _worker_files
+    _worker_machine = machine
+    _worker_positions = machine.positions
+    _worker_files = _map_files(input_path, output_path)
+
+
+def _encode_slice(encoded_slice: Tuple[int, int]):
+    """Encode a slice of the input file into the same slice of the output file, in a worker process
+    :param encoded_slice: (tuple) offset, length
+    """
+    offset, length = encoded_slice
+    _worker_machine.positions = _worker_positions
+    _worker_machine.advance(offset)
+    _encode_into(_worker_machine, *_worker_files, offset, length)
@@ -0,0 +1,12 @@
+from .bombe import Bombe, BombeStop, Menu, MenuEdge
+from .checkpoint import SearchCheckpoint, resume_search, search_key
+from .ciphertext_only import Candidate, CiphertextOnlySolver, IocCheck, SolverProgress
+from .cribs import WILDCARD, CribCheck, CribMatcher, CribPlacement, crib_placements, parse_cribs
+from .fitness import NgramScorer, english_ngrams, index_of_coincidence
+from .plugboard_climb import PlugboardClimber
+from .reflector_search import ReflectorHit, ReflectorSearch, reflector_rewirings
+from .scheduler import ScheduleDecision, Scheduler, Strategy
+from .search_pool import SearchHit, SearchPool, search
+from .search_space import Choices, Dimension, Permutations, PlugboardCompletions, Prefixed, Product, RingEquivalence
+from .search_space import SearchSpace, Variant
+from .sharding import Coordinator, run_node, sharded_search
@@ -0,0 +1,23 @@
+import argparse
+import logging
+
+from enigma_machine.code_breaking.sharding import run_node
+
+parser = argparse.ArgumentParser(
+    prog="python -m enigma_machine.code_breaking",
+    description="Run a search node, checking the shards a coordinator hands out until there are none left.",
+)
+parser.add_argument("address", help="Coordinator address, HOST:PORT")
+parser.add_argument("-p", "--processes", type=int, default=1, help="Worker processes of this node")
+
+
+def main():
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    host, _, port = args.address.rpartition(":")
+    shards_done = run_node((host, int(port)), args.processes)
+    logging.info(f"{shards_done} shards checked")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,174 @@
+import functools
+import heapq
+from typing import Any, Iterable, List, Optional, Tuple
+
+from enigma_machine.code_breaking.fitness import NgramScorer, english_ngrams
+from enigma_machine.constants import ENGLISH_ALPHABET_SIZE
+from enigma_machine.optional_dependencies import require_numpy
+
+np = require_numpy()
+
+
+def letter_counts(candidates: np.ndarray) -> np.ndarray:
+    """Occurrences of each letter in each candidate
+    :param candidates: (np.ndarray) candidates x letters letter indices, e.g., as decoded by the BatchEncoder
+    :return: (np.ndarray) candidates x 26 counts
+    """
+    candidates = np.atleast_2d(np.asarray(candidates, dtype=np.intp))
+    rows = len(candidates)
+    # a single bincount for all the candidates, each one counting into its own 26 bins
+    bins = candidates + ENGLISH_ALPHABET_SIZE * np.arange(rows, dtype=np.intp)[:, None]
+    return np.bincount(bins.ravel(), minlength=rows * ENGLISH_ALPHABET_SIZE).reshape(rows, ENGLISH_ALPHABET_SIZE)
+
+
+def index_of_coincidence(candidates: np.ndarray) -> np.ndarray:
+    """Index of coincidence of each candidate, see fitness.index_of_coincidence, the higher the more English like
+    :param candidates: (np.ndarray) candidates x letters letter indices
+    :return: (np.ndarray) one index per candidate
+    """
+    candidates = np.atleast_2d(np.asarray(candidates, dtype=np.intp))
+    length = candidates.shape[1]
+    if length < 2:
+        return np.zeros(len(candidates))
+    counts = letter_counts(candidates)
+    return (counts * (counts - 1)).sum(axis=1) / (length * (length - 1))
+
+
+@functools.lru_cache(maxsize=None)
+def english_frequencies() -> np.ndarray:
+    """Frequency of each letter in English, see fitness.english_ngrams
+    :return: (np.ndarray) 26 frequencies adding up to 1
+    """
+    frequencies = np.power(10.0, english_ngrams(1).log_probabilities)
+    frequencies = frequencies / frequencies.sum()
+    frequencies.flags.writeable = False
+    return frequencies
+
+
+def chi_squared(candidates: np.ndarray, frequencies: Optional[np.ndarray] = None) -> np.ndarray:
+    """Chi-squared statistic of the letter counts of each candidate against English, the lower the more English like
+    :param candidates: (np.ndarray) candidates x letters letter indices
+    :param frequencies: (np.ndarray) 26 expected letter frequencies, defaults to English ones
+    :return: (np.ndarray) one statistic per candidate
+    """
+    counts = letter_counts(candidates)
+    expected = counts.sum(axis=1, keepdims=True) * (english_frequencies() if frequencies is None else frequencies)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        terms = np.where(expected > 0, (counts - expected) ** 2 / expected, 0.0)
+    return terms.sum(axis=1)
+
+
+class NgramTable:
+    """Log-likelihood of candidates being English, from their n-grams, as NgramScorer.score, for many candidates at
+    once.
+    N-gram numbers are worked out for all the candidates with a few array operations, then looked up in a flat table.
+
+    Example:
+        * table = english_ngram_table(4)
+        * scores = table.score(encoder.decode(code, positions=positions))
+    """
+
+    def __init__(self, scorer: NgramScorer):
+        """
+        :param scorer: (NgramScorer) n-gram log-probabilities
+        """
+        self.n = scorer.n
+        self.log_probabilities = np.array(scorer.log_probabilities, dtype=np.float64)
+        self.log_probabilities.flags.writeable = False
+
+    def score(self, candidates: np.ndarray) -> np.ndarray:
+        """
+        :param candidates: (np.ndarray) candidates x letters letter indices
+        :return: (np.ndarray) sum of the log-probabilities of the n-grams of each candidate, the higher the better
+        """
+        candidates = np.atleast_2d(np.asarray(candidates, dtype=np.intp))
+        windows = candidates.shape[1] - self.n + 1
+        if windows <= 0:
+            return np.zeros(len(candidates))
+        numbers = candidates[:, :windows]
+        for offset in range(1, self.n):
+            numbers = numbers * ENGLISH_ALPHABET_SIZE + candidates[:, offset:offset + windows]
+        return self.log_probabilities[numbers].sum(axis=1)
+
+
+@functools.lru_cache(maxsize=None)
+def english_ngram_table(n: int = 4) -> NgramTable:
+    """Table of English n-grams, quadgrams by default
+    :param n: (int) 1 to 4
+    :return: (NgramTable) table
+    """
+    return NgramTable(english_ngrams(n))
+
+
+class TopK:
+    """Best k of a stream of scored candidates, given a batch at a time, e.g., as they are decoded.
+    A heap holds the best candidates so far, so memory stays flat however many candidates there are, and only the
+    best k of each batch, picked by a partition of its scores, go through the heap.
+
+    Example:
+        * best = TopK(10)
+        * for batch in batches:
+        *     best.push(english_ngram_table().score(encoder.decode(code, positions=batch)), batch)
+        * best.best() => [(score, position), ...]
+    """
+
+    def __init__(self, k: int, largest: bool = True):
+        """
+        :param k: (int) candidates kept
+        :param largest: (bool) whether the largest scores are the best ones, e.g., False for chi_squared
+        """
+        self.k = k
+        self.largest = largest
+        self.pushed = 0  # candidates pushed so far
+        # min-heap of the keys, the scores of the best candidates turned so that the larger the better, then the
+        # order they were pushed in, for candidates with the same score, then the candidates
+        self.__heap: List[Tuple[float, int, Any]] = []
+
+    def __len__(self) -> int:
+        return len(self.__heap)
+
+    def push(self, scores: np.ndarray, candidates: Optional[Iterable[Any]] = None):
+        """Keep the best of a batch of candidates
+        :param scores: (np.ndarray) score of each candidate
+        :param candidates: (Iterable) candidates, as many as scores, defaults to the number of each candidate in the
+            order they were pushed, counting all the batches
+        :return:
+        """
+        scores = np.asarray(scores, dtype=np.float64).ravel()
+        keys = scores if self.largest else -scores
+        candidates = range(self.pushed, self.pushed + len(scores)) if candidates is None else list(candidates)
+        if len(candidates) != len(scores):
+            raise ValueError("Please provide a score per candidate")
+
+        selected = range(len(keys))
+        if len(keys) > self.k > 0:
+            # the k-th best key of the batch, any candidate scoring as much may make it, as the first pushed wins ties
+            threshold = np.partition(keys, len(keys) - self.k)[len(keys) - self.k]
+            selected = np.flatnonzero(keys >= threshold)
+        heap = self.__heap
+        for inx in selected:
+            entry = (float(keys[inx]), -(self.pushed + int(inx)), candidates[inx])
+            if len(heap) < self.k:
+                heapq.heappush(heap, entry)
+            elif heap and entry[:2] > heap[0][:2]:
+                heapq.heapreplace(heap, entry)
+        self.pushed += len(scores)
+
+    def best(self) -> List[Tuple[float, Any]]:
+        """
+        :return: (List[Tuple[float, Any]]) scores and candidates, the best first, the first pushed first among equals
+        """
+        entries = sorted(self.__heap, key=lambda entry: entry[:2], reverse=True)
+        return [(key if self.largest else -key, candidate) for key, _, candidate in entries]
+
+
+def top_k(scores: np.ndarray, k: int, largest: bool = True) -> List[Tuple[float, int]]:
+    """Best k scores of a single batch
+    :param scores: (np.ndarray) scores
+    :param k: (int) scores kept
+    :param largest: (bool) whether the largest scores are the best ones
+    :return: (List[Tuple[float, int]]) scores and their indices, the best first
+    """
+    best = TopK(k, largest)
+    best.push(scores)
+    return best.best()
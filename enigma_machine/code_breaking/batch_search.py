@@ -0,0 +1,104 @@
+import itertools
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from enigma_machine.batch_encoder import BatchEncoder
+from enigma_machine.code_breaking.batch_fitness import TopK, english_ngram_table
+from enigma_machine.code_breaking.cribs import WILDCARD, CribCheck
+from enigma_machine.code_breaking.search_pool import SearchHit
+from enigma_machine.code_breaking.search_space import SearchSpace, Variant, to_setup
+from enigma_machine.components.rotors import RotorLabel
+from enigma_machine.constants import ENGLISH_ALPHABET
+from enigma_machine.optional_dependencies import require_numpy
+
+np = require_numpy()
+
+DEFAULT_BATCH_SIZE = 4096  # candidates decoded at once
+
+
+def batch_search(
+        space: SearchSpace, check: CribCheck, max_hits: Optional[int] = None, batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Iterator[SearchHit]:
+    """Check the variants of a search space with the BatchEncoder, many at a time.
+    Variants sharing rotors and plugboard are decoded together, whatever their reflector, ring settings and starting
+    positions. Candidates where a crib shows up are checked again by the crib check, which gives the hit its result.
+
+    :param space: (SearchSpace) variants
+    :param check: (CribCheck) code and cribs
+    :param max_hits: (int) stop once that many hits are found, defaults to checking all the variants
+    :param batch_size: (int) candidates decoded at once
+    :return: (Iterator[SearchHit]) hits
+    """
+    # a crib with wildcards is looked for by its longest run of letters, the crib check tells whether it is there
+    needles = [max(crib.split(WILDCARD), key=len) for crib in check.matcher.cribs]
+    if not needles:
+        return
+    hits = 0
+    for encoder, batch, decoded in _decoded_batches(space, check.code, batch_size):
+        if all(needles):
+            candidates = np.unique(np.concatenate([encoder.find(decoded, needle) for needle in needles]))
+        else:
+            candidates = range(len(batch))  # a crib of wildcards only, every candidate is checked
+        for candidate in candidates:
+            result = check(batch[candidate])
+            if result is not None:
+                yield SearchHit(space.rank(batch[candidate]), result)
+                hits += 1
+                if max_hits is not None and hits >= max_hits:
+                    return
+
+
+def batch_rank(
+        space: SearchSpace,
+        code: str,
+        k: int,
+        score: Optional[Callable[[np.ndarray], np.ndarray]] = None,
+        largest: bool = True,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+) -> List[Tuple[float, Variant]]:
+    """Best variants of a search space by a fitness of their decoded messages, e.g., when a crib is only a guess.
+    Variants are decoded as by batch_search, and only the best k are kept, whatever the number of variants.
+
+    :param space: (SearchSpace) variants
+    :param code: (str) encoded message
+    :param k: (int) variants kept
+    :param score: (Callable) scores of a batch of decoded messages, see batch_fitness, defaults to quadgrams
+    :param largest: (bool) whether the largest scores are the best ones, e.g., False for chi_squared
+    :param batch_size: (int) candidates decoded at once
+    :return: (List[Tuple[float, Variant]]) scores and variants, the best first
+    """
+    score = score or english_ngram_table(4).score
+    best = TopK(k, largest)
+    for _, batch, decoded in _decoded_batches(space, code, batch_size):
+        best.push(score(decoded), batch)
+    return best.best()
+
+
+def _decoded_batches(
+        space: SearchSpace, code: str, batch_size: int,
+) -> Iterator[Tuple[BatchEncoder, List[Variant], np.ndarray]]:
+    """Variants of a search space decoded a batch at a time, variants sharing rotors and plugboard being decoded
+    together, whatever their reflector, ring settings and starting positions
+    :return: (Iterator) encoder, variants and decoded messages of each batch
+    """
+    rotors, reflectors, ring_settings, starting_positions, plugboards = space.dimensions
+    reflector_labels = [RotorLabel[reflector.upper()] for reflector in reflectors]
+    for rotor_config, plugboard in itertools.product(rotors, plugboards):
+        group = iter(SearchSpace(
+            [rotor_config], reflectors, ring_settings, starting_positions, [plugboard], space.predicate,
+        ))
+        encoder = None
+        while True:
+            batch = list(itertools.islice(group, batch_size))
+            if not batch:
+                break
+            if encoder is None:
+                encoder = BatchEncoder(to_setup(batch[0]), reflectors=reflector_labels)
+
+            # keys are given from the right-most rotor to the left-most one
+            decoded = encoder.decode(
+                code,
+                positions=[[ENGLISH_ALPHABET.index(p) for p in reversed(v[3].upper().split("-"))] for v in batch],
+                ring_settings=[[int(r) for r in reversed(v[2].split("-"))] for v in batch],
+                reflectors=[reflectors.rank(v[1]) for v in batch],
+            )
+            yield encoder, batch, decoded
@@ -0,0 +1,235 @@
+import functools
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from enigma_machine.code_breaking.cribs import WILDCARD
+from enigma_machine.code_breaking.search_space import Variant
+from enigma_machine.compiled_enigma_machine import CompiledEnigmaMachine
+from enigma_machine.constants import ENGLISH_ALPHABET, ENGLISH_ALPHABET_SIZE
+from enigma_machine.enigma_setup import EnigmaSetup
+from enigma_machine.exceptions import IncompatibleConfiguration
+from enigma_machine.stepping_table import STATE_COUNT, from_state, to_state
+
+
+class MenuEdge(NamedTuple):
+    """A crib letter and the code letter it is encoded to, at an offset of the message"""
+    plain: str
+    cipher: str
+    offset: int
+
+
+class Menu:
+    """Letter graph of a crib placed at an offset of a code: the letters are the nodes, and each crib letter is linked
+    to the code letter it is encoded to, by the scrambler at that offset.
+
+    Loops are what makes a menu work on the bombe: going around a loop has to bring a stecker hypothesis back to
+    itself, which a wrong hypothesis seldom does. Menus without loops stop the bombe at most positions.
+    """
+
+    def __init__(self, code: str, crib: str, offset: int):
+        """
+        :param code: (str) encoded message
+        :param crib: (str) crib, wildcards allowed
+        :param offset: (int) offset of the crib in the message
+        :raises ValueError: if the crib does not fit the code at that offset, e.g., a letter would encode to itself
+        """
+        code, crib = code.upper(), crib.upper()
+        if offset < 0 or offset + len(crib) > len(code):
+            raise ValueError("The crib does not fit in the code at that offset")
+        self.code = code
+        self.crib = crib
+        self.offset = offset
+        self.edges: List[MenuEdge] = []
+        for inx, (plain, cipher) in enumerate(zip(crib, code[offset:]), offset):
+            if plain == WILDCARD:
+                continue
+            if plain not in ENGLISH_ALPHABET or cipher not in ENGLISH_ALPHABET:
+                raise ValueError("Please provide a crib and a code in a-zA-Z")
+            if plain == cipher:
+                raise ValueError(f"The crib cannot be at offset {offset}, {plain} would be encoded to itself")
+            self.edges.append(MenuEdge(plain, cipher, inx))
+
+        self.letters = sorted({edge.plain for edge in self.edges} | {edge.cipher for edge in self.edges})
+        parents = {letter: letter for letter in self.letters}
+
+        def root(letter: str) -> str:
+            while parents[letter] != letter:
+                letter = parents[letter]
+            return letter
+
+        for edge in self.edges:
+            parents[root(edge.plain)] = root(edge.cipher)
+        self.components = len({root(letter) for letter in self.letters})
+        self.loops = len(self.edges) - len(self.letters) + self.components
+
+    @property
+    def centre(self) -> Optional[str]:
+        """The letter linked to most others, where stecker hypotheses are tested, None if the menu is empty
+        """
+        degrees = {letter: 0 for letter in self.letters}
+        for edge in self.edges:
+            degrees[edge.plain] += 1
+            degrees[edge.cipher] += 1
+        return max(self.letters, key=lambda letter: degrees[letter], default=None)
+
+    def __str__(self):
+        return (
+            f"{self.crib} at {self.offset}: {len(self.edges)} links between {len(self.letters)} letters, "
+            f"{self.loops} loops"
+        )
+
+
+class BombeStop(NamedTuple):
+    """Rotors and starting positions where a menu holds, with the steckers it implies"""
+    rotors: str
+    reflector: str
+    ring_settings: str
+    starting_positions: str
+    steckers: Tuple[Tuple[str, str], ...]  # letters and their stecker partner, a letter paired with itself is unplugged
+
+    @property
+    def plugboard(self) -> str:
+        """Plugs implied by the stop, e.g., "AJ-HL", letters not in a plug are either unplugged or unknown
+        """
+        return "-".join(f"{one}{two}" for one, two in self.steckers if one < two)
+
+    def to_variant(self) -> Variant:
+        return self.rotors, self.reflector, self.ring_settings, self.starting_positions, self.plugboard
+
+
+@functools.lru_cache(maxsize=8)
+def _state_substitutions(rotors: str, reflector: str) -> bytes:
+    """Scrambler, i.e., the machine without plugboard, at every rotor state. Ring settings only decide how rotors step,
+    so they are left out, states being the positions already shifted by the ring settings.
+    """
+    setup = EnigmaSetup.from_string(f"{rotors} {reflector} {'-'.join(['01'] * len(rotors.split('-')))} "
+                                    f"{'-'.join(['A'] * len(rotors.split('-')))}")
+    return CompiledEnigmaMachine(setup).state_substitutions()
+
+
+class Bombe:
+    """Turing-Welchman bombe: finds the rotor orders and starting positions under which a menu holds, whatever the
+    plugboard.
+
+    For every starting position, the scramblers at the offsets of the menu are taken from a table of the substitutions
+    at every rotor state. A hypothesis, the centre of the menu being steckered to some letter, is then carried along the
+    links of the menu: a letter steckered to s means the letter at the other end of a link is steckered to what the
+    scrambler at the offset of the link turns s into, and, through the diagonal board, that s is steckered to the
+    letter.
+    A hypothesis leading to a letter steckered to two others is dropped, along with every hypothesis it reached on the
+    way. A hypothesis that holds is a stop.
+
+    Ring settings only decide when the middle and left rotors step, positions being relative to them. With rings other
+    than the actual ones, a stop is still found at the equivalent positions as long as the middle and left rotors do
+    not step while the menu is gone through.
+
+    Example:
+        * menu = Menu(code, "WETTERVORHERSAGE", 0)
+        * for stop in Bombe(menu).run(["I-II-III", "II-I-III"]):
+        *     print(stop.starting_positions, stop.plugboard)
+    """
+
+    def __init__(self, menu: Menu, reflectors: Iterable[str] = ("B",), ring_settings: Iterable[str] = ("01-01-01",)):
+        """
+        :param menu: (Menu) menu of a crib placement
+        :param reflectors: (Iterable[str]) reflectors to try, e.g., "B"
+        :param ring_settings: (Iterable[str]) ring settings to try, e.g., "01-01-01"
+        """
+        self.menu = menu
+        self.reflectors = tuple(reflectors)
+        self.ring_settings = tuple(ring_settings)
+        self.positions_tested = 0
+
+        self.__centre = None if menu.centre is None else ENGLISH_ALPHABET.index(menu.centre)
+        self.__offsets = [edge.offset for edge in menu.edges]
+        # links of each letter, to the letter at the other end and the index of the edge
+        self.__links: List[List[Tuple[int, int]]] = [[] for _ in range(ENGLISH_ALPHABET_SIZE)]
+        for edge_inx, edge in enumerate(menu.edges):
+            plain, cipher = ENGLISH_ALPHABET.index(edge.plain), ENGLISH_ALPHABET.index(edge.cipher)
+            self.__links[plain].append((cipher, edge_inx))
+            self.__links[cipher].append((plain, edge_inx))
+
+    def run(
+            self, rotor_orders: Iterable[str], starting_positions: Optional[Iterable[str]] = None,
+    ) -> Iterator[BombeStop]:
+        """Try every rotor order, reflector, ring settings and starting positions
+        :param rotor_orders: (Iterable[str]) rotor orders, e.g., "I-II-III"
+        :param starting_positions: (Iterable[str]) starting positions to try, e.g., "A-A-Z", defaults to all of them
+        :return: (Iterator[BombeStop]) stops
+        """
+        starting_positions = None if starting_positions is None else tuple(starting_positions)
+        for rotors in rotor_orders:
+            if len(rotors.split("-")) != 3:
+                raise IncompatibleConfiguration("The bombe requires 3 rotors")
+            for reflector in self.reflectors:
+                substitutions = _state_substitutions(rotors.upper(), reflector.upper())
+                for ring_settings in self.ring_settings:
+                    yield from self.__run(rotors, reflector, ring_settings, substitutions, starting_positions)
+
+    def __run(
+            self,
+            rotors: str,
+            reflector: str,
+            ring_settings: str,
+            substitutions: bytes,
+            starting_positions: Optional[Tuple[str, ...]],
+    ) -> Iterator[BombeStop]:
+        setup = EnigmaSetup.from_string(f"{rotors} {reflector} {ring_settings} A-A-A".upper())
+        stepping_table = CompiledEnigmaMachine(setup).stepping_table
+        rings = [int(ring) - 1 for ring in setup.ring_settings]  # from the right-most rotor to the left-most one
+
+        if starting_positions is None:
+            states = range(STATE_COUNT)
+        else:
+            states = [
+                to_state(*((ENGLISH_ALPHABET.index(p) - ring) % ENGLISH_ALPHABET_SIZE
+                           for p, ring in zip(reversed(positions.upper().split("-")), rings)))
+                for positions in starting_positions
+            ]
+
+        span = max(self.__offsets, default=-1) + 1
+        for state in states:
+            self.positions_tested += 1
+            walked = stepping_table.walk(state, span)
+            # the letter at offset n is encoded in the state after n + 1 keystrokes
+            bases = [walked[offset] * ENGLISH_ALPHABET_SIZE for offset in self.__offsets]
+            steckers = self.__test(substitutions, bases)
+            if steckers is not None:
+                positions = "-".join(
+                    ENGLISH_ALPHABET[(p + ring) % ENGLISH_ALPHABET_SIZE]
+                    for p, ring in reversed(list(zip(from_state(state), rings)))
+                )
+                yield BombeStop(rotors, reflector, ring_settings, positions, steckers)
+
+    def __test(self, substitutions: bytes, bases: List[int]) -> Optional[Tuple[Tuple[str, str], ...]]:
+        """Steckers of the first hypothesis at the centre of the menu that holds, None if none does
+        :param substitutions: (bytes) scrambler at every rotor state
+        :param bases: (List[int]) offset of the scrambler of each edge in the substitutions
+        """
+        if self.__centre is None:
+            return ()
+        centre, links = self.__centre, self.__links
+        dropped = bytearray(ENGLISH_ALPHABET_SIZE)  # hypotheses at the centre reached by a dropped one
+        for hypothesis in range(ENGLISH_ALPHABET_SIZE):
+            if dropped[hypothesis]:
+                continue
+            steckers = [-1] * ENGLISH_ALPHABET_SIZE
+            pending = [(centre, hypothesis)]
+            while pending:
+                letter, stecker = pending.pop()
+                if letter == centre:
+                    dropped[stecker] = 1
+                current = steckers[letter]
+                if current == stecker:
+                    continue
+                if current >= 0:
+                    break  # a letter steckered to two others
+                steckers[letter] = stecker
+                pending.append((stecker, letter))  # diagonal board
+                for other, edge_inx in links[letter]:
+                    pending.append((other, substitutions[bases[edge_inx] + stecker]))
+            else:
+                return tuple(
+                    (ENGLISH_ALPHABET[letter], ENGLISH_ALPHABET[stecker])
+                    for letter, stecker in enumerate(steckers) if stecker >= 0
+                )
+        return None
@@ -0,0 +1,253 @@
+import bisect
+import hashlib
+import json
+import io
+import os
+import pickle
+import time
+import types
+from typing import Any, Callable, Iterable, Iterator, List, Optional
+
+from enigma_machine.code_breaking.search_pool import SearchHit, SearchPool, search
+from enigma_machine.code_breaking.search_space import SearchSpace, Variant
+
+DEFAULT_CHUNK_SIZE = 1024  # variants checked between records, in this process
+DEFAULT_SYNC_SECONDS = 5.0  # records are flushed to disk at most this often
+
+
+def search_key(space: SearchSpace, check: Callable[[Variant], Any]) -> str:
+    """Fingerprint of a search, so a checkpoint is never resumed by another search.
+    The search space, its predicate and the check are pickled. If that fails, e.g., for a lambda or a function
+    defined in another function, functions are told apart by their name, code and captured values instead, so
+    two such functions only get the same key if they are written the same way, in the same place.
+
+    :param space: (SearchSpace) variants
+    :param check: (Callable) the check
+    :return: (str) key
+    :raises TypeError: if a value captured by such a function cannot be pickled either, so no key would be stable
+    """
+    search = (space.dimensions, space.predicate, check)
+    try:
+        return hashlib.sha256(pickle.dumps(search)).hexdigest()
+    except (pickle.PicklingError, AttributeError, TypeError):
+        return _FunctionsByName.fingerprint(search)
+
+
+class _FunctionsByName(pickle.Pickler):
+    """Pickles functions as their name, code and captured values, rather than as a reference to import them by"""
+
+    @classmethod
+    def fingerprint(cls, obj) -> str:
+        """
+        :param obj: (Any) anything picklable once functions are pickled by name
+        :return: (str) hash of the pickled object
+        """
+        buffer = io.BytesIO()
+        cls(buffer).dump(obj)
+        return hashlib.sha256(buffer.getvalue()).hexdigest()
+
+    def persistent_id(self, obj):
+        if not isinstance(obj, types.FunctionType):
+            return None
+        captured = tuple(self.__captured(obj, cell) for cell in obj.__closure__ or ())
+        return obj.__module__, obj.__qualname__, _code_key(obj.__code__), captured
+
+    def __captured(self, function: types.FunctionType, cell) -> str:
+        """Fingerprint of a value captured by a function, pickled the same way, as its repr may hold an address
+        """
+        try:
+            value = cell.cell_contents
+        except ValueError:
+            return ""  # not assigned yet
+        if value is function:
+            return "self"  # a function calling itself
+        try:
+            return self.fingerprint(value)
+        except (pickle.PicklingError, AttributeError, TypeError) as e:
+            raise TypeError(
+                f"Cannot fingerprint the search: {function.__qualname__} captures a {type(value).__name__} "
+                f"that cannot be pickled, please pass it as an argument of a picklable check instead"
+            ) from e
+
+
+def _code_key(code: types.CodeType) -> tuple:
+    """Bytecode and constants of a function, those of the functions defined in it included
+    :param code: (types.CodeType) code of a function
+    :return: (tuple) key
+    """
+    consts = tuple(_code_key(const) if isinstance(const, types.CodeType) else const for const in code.co_consts)
+    return code.co_code, consts, code.co_names
+
+
+class SearchCheckpoint:
+    """Progress of a search in a JSON lines file: the ranges of variant indices checked and the hits among them.
+
+    The first line identifies the search, any further line is a record of a range and its hits. Records are appended
+    as ranges are checked and flushed to disk every few seconds, so a search killed at any point loses at most that
+    much work, and is resumed by skipping the ranges already recorded. Hits are kept as indices, their results are
+    computed again on resume.
+    """
+
+    def __init__(self, path: str, key: str, sync_seconds: float = DEFAULT_SYNC_SECONDS):
+        """Open a checkpoint, resuming the progress recorded for the same search, if any
+        :param path: (str) checkpoint file, created if it does not exist, started over if it belongs to another search
+        :param key: (str) search fingerprint, e.g. from search_key
+        :param sync_seconds: (float) records are flushed to disk at most this often
+        """
+        self.path = path
+        self.key = key
+        self.sync_seconds = sync_seconds
+        self.hits: List[int] = []
+        self.__starts: List[int] = []  # sorted, disjoint ranges of indices done
+        self.__stops: List[int] = []
+
+        records = self.__load()
+        for record in records or []:
+            self.__add(range(*record["done"]))
+            self.hits.extend(record["hits"])
+
+        # the file is written again with the ranges merged, which also drops a record cut short by a crash
+        temporary_path = f"{path}.tmp"
+        with open(temporary_path, "w") as checkpoint_file:
+            checkpoint_file.write(json.dumps({"search": key}) + "\n")
+            for start, stop in zip(self.__starts, self.__stops):
+                hits = [index for index in self.hits if start <= index < stop]
+                checkpoint_file.write(json.dumps({"done": [start, stop], "hits": hits}) + "\n")
+        os.replace(temporary_path, path)
+
+        self.__file = open(path, "a")
+        self.__synced_at = time.monotonic()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        self.__sync()
+        self.__file.close()
+
+    @property
+    def done(self) -> int:
+        """Number of indices done"""
+        return sum(stop - start for start, stop in zip(self.__starts, self.__stops))
+
+    def record(self, indices: range, hits: Iterable[SearchHit]):
+        """Record a range of indices checked and its hits
+        :param indices: (range) indices checked
+        :param hits: (Iterable[SearchHit]) hits among them
+        """
+        if not indices:
+            return
+        hit_indices = [hit.index for hit in hits]
+        self.__add(indices)
+        self.hits.extend(hit_indices)
+        self.__write({"done": [indices.start, indices.stop], "hits": hit_indices})
+        if time.monotonic() - self.__synced_at >= self.sync_seconds:
+            self.__sync()
+
+    def remaining(self, indices: range) -> Iterator[range]:
+        """Ranges of the given indices not done yet
+        :param indices: (range) indices of the search
+        :return: (Iterator[range]) ranges left
+        """
+        start = indices.start
+        inx = bisect.bisect_right(self.__stops, start)
+        while start < indices.stop:
+            if inx == len(self.__starts) or self.__starts[inx] >= indices.stop:
+                yield range(start, indices.stop)
+                return
+            if self.__starts[inx] > start:
+                yield range(start, self.__starts[inx])
+            start = max(start, self.__stops[inx])
+            inx += 1
+
+    def __add(self, indices: range):
+        """Merge a range into the ranges done
+        """
+        start, stop = indices.start, indices.stop
+        first = bisect.bisect_left(self.__stops, start)
+        last = bisect.bisect_right(self.__starts, stop)
+        if first < last:
+            start = min(start, self.__starts[first])
+            stop = max(stop, self.__stops[last - 1])
+        self.__starts[first:last] = [start]
+        self.__stops[first:last] = [stop]
+
+    def __load(self) -> Optional[list]:
+        """Records of the same search, None if there is no checkpoint of it
+        """
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path) as checkpoint_file:
+            lines = checkpoint_file.read().splitlines()
+
+        records = []
+        for line in lines:
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                break  # a record cut short by a crash, the range is checked again
+        if not records or records[0].get("search") != self.key:
+            return None
+        return records[1:]
+
+    def __write(self, record: dict):
+        self.__file.write(json.dumps(record) + "\n")
+
+    def __sync(self):
+        self.__file.flush()
+        os.fsync(self.__file.fileno())
+        self.__synced_at = time.monotonic()
+
+
+def resume_search(
+        space: SearchSpace,
+        check: Callable[[Variant], Any],
+        checkpoint: SearchCheckpoint,
+        max_hits: Optional[int] = None,
+        pool: Optional[SearchPool] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[SearchHit]:
+    """Check the variants of a search space a checkpoint has not recorded yet, recording progress as it goes.
+    Hits recorded before come first, then the ones found in the remaining ranges.
+
+    :param space: (SearchSpace) variants
+    :param check: (Callable) returns a result for a hit, None otherwise
+    :param checkpoint: (SearchCheckpoint) progress of the search
+    :param max_hits: (int) stop once that many hits are found, defaults to checking all the variants
+    :param pool: (SearchPool) worker processes, defaults to checking the variants in this process
+    :param chunk_size: (int) variants checked between records, when in this process
+    :return: (Iterator[SearchHit]) hits
+    """
+    hits = 0
+    for index in list(checkpoint.hits):
+        if max_hits is not None and hits >= max_hits:
+            return
+        hits += 1
+        yield SearchHit(index, check(space.unrank(index)))
+
+    for indices in list(checkpoint.remaining(space.indices)):
+        if max_hits is not None and hits >= max_hits:
+            return
+        left = None if max_hits is None else max_hits - hits
+        if pool is not None:
+            for hit in pool.search(space, check, max_hits=left, indices=indices, on_range_done=checkpoint.record):
+                hits += 1
+                yield hit
+            continue
+
+        for chunk in space.ranges(chunk_size, indices):
+            chunk_hits = list(search(space, check, max_hits=left, indices=chunk))
+            if left is not None and len(chunk_hits) == left:
+                # stopped at the last hit, so the rest of the chunk is not done
+                chunk = range(chunk.start, chunk_hits[-1].index + 1)
+            checkpoint.record(chunk, chunk_hits)
+            for hit in chunk_hits:
+                hits += 1
+                yield hit
+            if left is not None:
+                left -= len(chunk_hits)
+                if left == 0:
+                    return
@@ -0,0 +1,248 @@
+import heapq
+import itertools
+import logging
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from enigma_machine.code_breaking.fitness import NgramScorer, english_ngrams, index_of_coincidence
+from enigma_machine.code_breaking.plugboard_climb import PlugboardClimber
+from enigma_machine.code_breaking.scheduler import Scheduler
+from enigma_machine.code_breaking.search_space import Choices, Dimension, SearchSpace, Variant, to_setup
+from enigma_machine.compiled_enigma_machine import from_indices, to_indices
+from enigma_machine.constants import ENGLISH_ALPHABET, ENGLISH_ALPHABET_SIZE
+from enigma_machine.machine_pool import MachinePool
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_KEEP = 32  # candidates carried from a stage to the next one
+DEFAULT_MAX_PLUGS = 10  # plugs used on a standard day
+DEFAULT_MAX_CLIMB_ROUNDS = 16  # plugs added, moved or removed per candidate and n-gram length
+PROGRESS_INTERVAL = 4096  # variants scored between progress reports
+
+
+class Candidate(NamedTuple):
+    """A variant and how English its decoded message looks, the higher the score the better"""
+    score: float
+    variant: Variant
+    message: str
+
+
+class SolverProgress(NamedTuple):
+    """Where a solver is: its stage, work done out of the total of the stage and best candidate so far"""
+    stage: str
+    done: int
+    total: int
+    best: Optional[Candidate]
+
+    def __str__(self):
+        best = f", best {self.best.score:.4f} {' '.join(self.best.variant)}" if self.best else ""
+        return f"{self.stage}: {self.done}/{self.total}{best}"
+
+
+class IocCheck:
+    """Decodes a code under a variant and gives the index of coincidence of the decoded message, whatever it is.
+    Instances are picklable, so they can be sent to worker processes, as CribCheck.
+    """
+
+    def __init__(self, code: str):
+        """
+        :param code: (str) encoded message
+        """
+        self.code = code
+        self.indices = to_indices(code)
+
+    def __call__(self, variant: Variant) -> float:
+        """
+        :param variant: (Variant) variant to be checked
+        :return: (float) index of coincidence of the decoded message
+        """
+        with MachinePool.for_current_process().machine(to_setup(variant)) as machine:
+            return index_of_coincidence(machine.decode_indices(self.indices))
+
+
+class CiphertextOnlySolver:
+    """Breaks a code without a crib, by how English its decoded message looks, in three stages:
+        * key search: every variant of a search space is scored by the index of coincidence of the decoded message,
+          which does not depend much on a few plugs being missing, and the best ones are kept
+        * ring settings: only the rings of the two right-most rotors matter, they decide when the rotors to their left
+          step. Each candidate is tried with every ring of the right-most rotor, then of the middle one, positions
+          shifted with the rings so the rotor cores stay where they are, again scored by the index of coincidence
+        * plugboard: plugs are added, moved and removed one at a time by a PlugboardClimber, as long as the decoded
+          message gets more English, scored by bigrams first, then by trigrams, which are also what candidates are
+          ranked by
+
+    Ring settings are only left to their own stage when every starting position is tried, as the positions the
+    rings are shifted to would otherwise not all be in the search. Both are searched together by the key search
+    instead, e.g., known positions and unknown rings.
+
+    Short messages give the statistics little to go on, e.g., a message of 50 letters decoded under a wrong setup
+    may well score better than the right one, which is why candidates are kept between stages. The fewer the
+    unknowns, the better the chances: a plugboard may only be found from scratch in messages of a few hundred letters.
+
+    Example:
+        * solver = CiphertextOnlySolver(code, progress=print)
+        * best = solver.solve(SearchSpace(Permutations(rotors, 3), ["B"], ["01-01-01"], positions, [""]))[0]
+    """
+
+    def __init__(
+            self,
+            code: str,
+            scheduler: Optional[Scheduler] = None,
+            keep: int = DEFAULT_KEEP,
+            max_plugs: int = DEFAULT_MAX_PLUGS,
+            max_climb_rounds: int = DEFAULT_MAX_CLIMB_ROUNDS,
+            max_seconds: Optional[float] = None,
+            progress: Optional[Callable[[SolverProgress], None]] = None,
+    ):
+        """
+        :param code: (str) encoded message
+        :param scheduler: (Scheduler) runs the key search, defaults to a serial one
+        :param keep: (int) candidates carried from a stage to the next one
+        :param max_plugs: (int) plugs the plugboard stage adds up to, those of a variant are kept as they are
+        :param max_climb_rounds: (int) plugs added, moved or removed per candidate and n-gram length
+        :param max_seconds: (float) time after which stages stop early, the candidates found so far being ranked
+        :param progress: (Callable) called with the progress of the stages
+        """
+        self.code = code.upper()
+        self.scheduler = scheduler or Scheduler(processes=1)
+        self.keep = keep
+        self.max_plugs = max_plugs
+        self.max_climb_rounds = max_climb_rounds
+        self.max_seconds = max_seconds
+        self.progress = progress
+
+        self.__indices = to_indices(self.code)
+        self.__deadline = None
+
+    def solve(self, space: SearchSpace) -> List[Candidate]:
+        """Run the three stages over a search space
+        :param space: (SearchSpace) variants, only the ones known for sure should be left out
+        :return: (List[Candidate]) candidates, the best one first
+        """
+        self.__deadline = None if self.max_seconds is None else time.perf_counter() + self.max_seconds
+        rotors, reflectors, ring_settings, starting_positions, plugboards = space.dimensions
+        rotor_count = len(space.unrank(0)[0].split("-"))
+
+        separate_rings = len(ring_settings) > 1 and len(starting_positions) == ENGLISH_ALPHABET_SIZE ** rotor_count
+        if separate_rings:
+            key_space = SearchSpace(
+                rotors, reflectors, Choices([ring_settings.unrank(0)]), starting_positions, plugboards, space.predicate,
+            )
+        else:
+            key_space = space
+
+        candidates = self.__key_search(key_space)
+        if separate_rings:
+            candidates = self.__ring_search(candidates, ring_settings)
+        return self.__plugboard_search(candidates)
+
+    def __key_search(self, space: SearchSpace) -> List[Tuple[float, Variant]]:
+        """Best variants of a search space by index of coincidence"""
+        total = len(space.indices)
+        best: List[Tuple[float, int]] = []  # min-heap of the scores and indices of the best variants
+        done = 0
+        for hit in self.scheduler.search(space, IocCheck(self.code)):
+            if len(best) < self.keep:
+                heapq.heappush(best, (hit.result, hit.index))
+            elif hit.result > best[0][0]:
+                heapq.heapreplace(best, (hit.result, hit.index))
+            done += 1
+            if done % PROGRESS_INTERVAL == 0:
+                if self.__out_of_time():
+                    logger.info(f"Key search stopped after {done} variants of {total}")
+                    break
+                self.__report("key search", done, total, space, best)
+        self.__report("key search", done, total, space, best)
+        return [(score, space.unrank(index)) for score, index in sorted(best, reverse=True)]
+
+    def __ring_search(
+            self, candidates: List[Tuple[float, Variant]], ring_settings: Dimension,
+    ) -> List[Tuple[float, Variant]]:
+        """Best ring settings of the candidates of the key search by index of coincidence, the ring of the right-most
+        rotor first, then the one of the middle rotor"""
+        reference = candidates[0][1][2].split("-") if candidates else []
+        # ring settings the same as the reference one but for the ring of the right-most rotor, then the middle one
+        right_rings = [rings for rings in ring_settings if rings.split("-")[:-1] == reference[:-1]]
+        middle_rings: Dict[str, List[str]] = {}
+        for rings in ring_settings:
+            parts = rings.split("-")
+            if parts[:-2] == reference[:-2]:
+                middle_rings.setdefault(parts[-1], []).append(rings)
+
+        refined = []
+        for done, (score, variant) in enumerate(candidates):
+            reference_variant = variant
+            # under the reference rings the middle rotor steps at another keystroke, the key search may thus have found
+            # it a position away from where it actually starts
+            for rings, middle_step in itertools.product(right_rings, (0, -1, 1)):
+                score, variant = max((score, variant), self.__shift_rings(reference_variant, rings, middle_step))
+            for rings in middle_rings.get(variant[2].split("-")[-1], []):
+                score, variant = max((score, variant), self.__shift_rings(variant, rings))
+            refined.append((score, variant))
+            self.__report("ring settings", done + 1, len(candidates), None, refined)
+            if self.__out_of_time():
+                logger.info(f"Ring settings stopped after {done + 1} candidates of {len(candidates)}")
+                refined.extend(candidates[done + 1:])
+                break
+        return sorted(refined, reverse=True)
+
+    def __shift_rings(self, variant: Variant, rings: str, middle_step: int = 0) -> Tuple[float, Variant]:
+        """Variant with other ring settings and the same rotor cores, the middle one moved by some steps, if any,
+        scored by index of coincidence"""
+        positions = variant[3].split("-")
+        middle = ENGLISH_ALPHABET.index(positions[-2].upper())
+        positions[-2] = ENGLISH_ALPHABET[(middle + middle_step) % ENGLISH_ALPHABET_SIZE]
+        shifted = variant[:2] + (rings, _shift_positions("-".join(positions), variant[2], rings), variant[4])
+        return self.__score(shifted, None).score, shifted
+
+    def __plugboard_search(self, candidates: List[Tuple[float, Variant]]) -> List[Candidate]:
+        """Candidates with the plugs that make their decoded message most English, ranked by trigrams"""
+        trigrams = english_ngrams(3)
+        ranked = []
+        for done, (_, variant) in enumerate(candidates):
+            setup = to_setup(variant)
+            if len(setup.plugs) < self.max_plugs and not self.__out_of_time():
+                climber = PlugboardClimber(self.code, setup, english_ngrams(2))
+                climber.climb(self.max_plugs, self.max_climb_rounds, self.__out_of_time)
+                climber.rescore(trigrams)
+                climber.climb(self.max_plugs, self.max_climb_rounds, self.__out_of_time)
+                variant = variant[:4] + (climber.plugboard,)
+            ranked.append(self.__score(variant, trigrams))
+            self.__report("plugboard", done + 1, len(candidates), None, ranked)
+        return sorted(ranked, reverse=True)
+
+    def __score(self, variant: Variant, scorer: Optional[NgramScorer]) -> Candidate:
+        """Candidate of a variant, scored by n-grams, or by index of coincidence without a scorer"""
+        with MachinePool.for_current_process().machine(to_setup(variant)) as machine:
+            decoded = machine.decode_indices(self.__indices)
+        score = index_of_coincidence(decoded) if scorer is None else scorer.score(decoded)
+        return Candidate(score, variant, from_indices(decoded))
+
+    def __out_of_time(self) -> bool:
+        return self.__deadline is not None and time.perf_counter() > self.__deadline
+
+    def __report(self, stage: str, done: int, total: int, space: Optional[SearchSpace], scored: list):
+        """Report progress with the best of the scored variants, given by index in the search space if any
+        """
+        if self.progress is None:
+            return
+        best = max(scored, default=None)
+        if best is not None and not isinstance(best, Candidate):
+            score, variant = best
+            best = Candidate(score, space.unrank(variant) if space is not None else variant, "")
+        self.progress(SolverProgress(stage, done, total, best))
+
+
+def _shift_positions(positions: str, from_rings: str, to_rings: str) -> str:
+    """Starting positions giving the same rotor cores once the ring settings are changed
+    :param positions: (str) starting positions, e.g., "A-B-C"
+    :param from_rings: (str) ring settings of the starting positions, e.g., "01-01-01"
+    :param to_rings: (str) ring settings to shift the starting positions to
+    :return: (str) starting positions
+    """
+    return "-".join(
+        ENGLISH_ALPHABET[(ENGLISH_ALPHABET.index(position.upper()) + int(to_ring) - int(from_ring))
+                         % ENGLISH_ALPHABET_SIZE]
+        for position, from_ring, to_ring in zip(positions.split("-"), from_rings.split("-"), to_rings.split("-"))
+    )
+
@@ -0,0 +1,278 @@
+import collections
+import re
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from enigma_machine.code_breaking.search_space import Variant, to_setup
+from enigma_machine.compiled_enigma_machine import CompiledEnigmaMachine, to_indices
+from enigma_machine.constants import ENGLISH_ALPHABET, ENGLISH_ALPHABET_SIZE
+from enigma_machine.enigma_setup import EnigmaSetup
+from enigma_machine.machine_pool import MachinePool
+
+WILDCARD = "?"  # stands for any letter in a crib
+MAX_DIRECT_CRIBS = 32  # up to that many cribs, a substring search per crib is faster than a scan of the automaton
+
+# letters to indices 0-25, lowercase included, anything else to 26
+_SCAN_TABLE = bytes(
+    ENGLISH_ALPHABET.index(chr(c).upper()) if chr(c).upper() in ENGLISH_ALPHABET else ENGLISH_ALPHABET_SIZE
+    for c in range(256)
+)
+
+
+class CribPlacement(NamedTuple):
+    """A crib at an offset of a message"""
+    crib: str
+    offset: int
+
+
+def parse_cribs(cribs: Union[str, Iterable[str]]) -> Tuple[str, ...]:
+    """Cribs in uppercase and without the spaces around them, each once, in the order they were given
+    :param cribs: one or more cribs, given as a list or separated by comma
+    :return: (tuple) cribs
+    """
+    if isinstance(cribs, str):
+        cribs = cribs.split(",")
+    return tuple(dict.fromkeys(crib.strip().upper() for crib in cribs if crib.strip()))
+
+
+def _can_be_found(crib: str) -> bool:
+    """Decoded messages are letters only, hence a crib with anything else than letters and wildcards is never found
+    """
+    return bool(crib) and all(c in ENGLISH_ALPHABET or c == WILDCARD for c in crib.upper())
+
+
+def _crib_letters(crib: str) -> bytes:
+    """Letter indices of a crib, 0xff for its wildcards"""
+    return bytes(0xff if c == WILDCARD else ENGLISH_ALPHABET.index(c) for c in crib.upper())
+
+
+def crib_placements(code: str, cribs: Iterable[str]) -> List[CribPlacement]:
+    """Offsets each crib can be found at in the decoded code, whatever the setup.
+    Enigma never encodes a letter to itself, so an offset where a crib letter faces the same code letter is ruled out.
+
+    :param code: (str) encoded message
+    :param cribs: (Iterable[str]) cribs, wildcards allowed
+    :return: (List[CribPlacement]) placements by offset, then crib
+    """
+    code = code.upper()
+    placements = []
+    for crib in cribs:
+        if not _can_be_found(crib):
+            continue
+        crib = crib.upper()
+        for offset in range(len(code) - len(crib) + 1):
+            # a wildcard never equals a code letter
+            if all(c != p for c, p in zip(code[offset:offset + len(crib)], crib)):
+                placements.append(CribPlacement(crib, offset))
+    return sorted(placements, key=lambda placement: (placement.offset, placement.crib))
+
+
+class CribMatcher:
+    """Finds any of a list of cribs in a message in a single pass, however many cribs there are, i.e., Aho-Corasick.
+
+    The cribs are compiled once into an automaton with a state per prefix of a crib and a transition per state and
+    letter, failure links already followed, so scanning a message is a table lookup per letter. A wildcard stands for
+    any letter: a crib with wildcards is split into its runs of letters, which are what the automaton looks for, and
+    it is found at an offset once each of its runs was found at the right distance from that offset.
+
+    Example:
+        * matcher = CribMatcher("INSTAGRAM, FLICKR, TUMBL?")
+        * matcher.find("FOLLOWMEONTUMBLR") => CribPlacement(crib="TUMBL?", offset=10)
+    """
+
+    def __init__(self, cribs: Union[str, Iterable[str]]):
+        """
+        :param cribs: one or more cribs, given as a list or separated by comma, wildcards allowed
+        """
+        self.cribs = tuple(crib for crib in parse_cribs(cribs) if _can_be_found(crib))
+        self.__runs = []  # number of runs of letters per crib
+        self.__blanks = []  # cribs made of wildcards only, found at the start of any message long enough
+
+        # state 0 is the empty prefix, a run is found once its last letter is reached
+        transitions = [[-1] * ENGLISH_ALPHABET_SIZE]
+        outputs = [[]]
+        for crib_inx, crib in enumerate(self.cribs):
+            runs = [(run.group(), run.end() - 1) for run in re.finditer(f"[^{re.escape(WILDCARD)}]+", crib)]
+            self.__runs.append(len(runs))
+            if not runs:
+                self.__blanks.append(crib_inx)
+            for run, run_end in runs:
+                state = 0
+                for letter in to_indices(run):
+                    if transitions[state][letter] < 0:
+                        transitions[state][letter] = len(transitions)
+                        transitions.append([-1] * ENGLISH_ALPHABET_SIZE)
+                        outputs.append([])
+                    state = transitions[state][letter]
+                outputs[state].append((crib_inx, run_end))
+
+        # missing transitions follow the failure links, breadth first so shorter prefixes are done first
+        failure = [0] * len(transitions)
+        queue = collections.deque()
+        for letter, state in enumerate(transitions[0]):
+            if state < 0:
+                transitions[0][letter] = 0
+            else:
+                queue.append(state)
+        while queue:
+            state = queue.popleft()
+            outputs[state].extend(outputs[failure[state]])
+            for letter, next_state in enumerate(transitions[state]):
+                if next_state < 0:
+                    transitions[state][letter] = transitions[failure[state]][letter]
+                else:
+                    failure[next_state] = transitions[failure[state]][letter]
+                    queue.append(next_state)
+
+        self.__direct = len(self.cribs) <= MAX_DIRECT_CRIBS and WILDCARD not in "".join(self.cribs)
+
+        # anything else than a letter goes back to the empty prefix
+        self.__transitions = tuple(tuple(row) + (0,) for row in transitions)
+        self.__outputs = tuple(tuple(output) for output in outputs)
+
+    def find_all(self, message: str) -> Iterator[CribPlacement]:
+        """Cribs found in a message, in the order a single scan from left to right finds them
+        :param message: (str) message
+        :return: (Iterator[CribPlacement]) cribs and their offsets
+        """
+        for crib_inx in self.__blanks:
+            if len(self.cribs[crib_inx]) <= len(message):
+                yield CribPlacement(self.cribs[crib_inx], 0)
+
+        transitions, outputs, runs = self.__transitions, self.__outputs, self.__runs
+        runs_found = {}  # runs found so far of a crib with several runs, by crib and offset
+        state = 0
+        for inx, letter in enumerate(message.encode("ascii", "replace").translate(_SCAN_TABLE)):
+            state = transitions[state][letter]
+            for crib_inx, run_end in outputs[state]:
+                offset = inx - run_end
+                if runs[crib_inx] > 1:
+                    key = crib_inx, offset
+                    runs_found[key] = runs_found.get(key, 0) + 1
+                    if runs_found[key] < runs[crib_inx]:
+                        continue
+                if offset >= 0 and offset + len(self.cribs[crib_inx]) <= len(message):
+                    yield CribPlacement(self.cribs[crib_inx], offset)
+
+    def find(self, message: str) -> Optional[CribPlacement]:
+        """First crib found in a message, as find_all would give it
+        :param message: (str) message
+        :return: (CribPlacement) crib and its offset, None if no crib is found
+        """
+        if not self.__direct or not message.isascii():
+            return next(self.find_all(message), None)
+
+        # a few cribs without wildcards, the substring searches run in C and the first crib to end is the one a scan
+        # finds first, the longest one if several end together
+        message = message.upper()
+        found = None
+        for crib in self.cribs:
+            offset = message.find(crib)
+            if offset >= 0 and (found is None or (offset + len(crib), -len(crib)) < found[0]):
+                found = (offset + len(crib), -len(crib)), CribPlacement(crib, offset)
+        return found[1] if found else None
+
+
+class _WindowPlan:
+    """Letters of a code to be decoded to tell whether a crib placement holds under a setup.
+
+    A letter decoded at some offset tests every placement covering that offset, thus a letter every n offsets, n being
+    the length of the shortest crib, tests each placement once. About one placement in 26 passes, and has its next
+    letter tested, and so on, all the placements left being tested at once in each round.
+    """
+
+    def __init__(self, code: str, placements: List[CribPlacement]):
+        self.code_indices = to_indices(code)
+        self.always = False  # a crib of wildcards only matches any message long enough
+        stride = min((len(placement.crib) for placement in placements), default=1)
+        # the placements tested at each offset, mostly sampled ones, by the decoded letter they expect there
+        candidates = {}
+        for placement in placements:
+            crib = _crib_letters(placement.crib)
+            window = [offset for offset, letter in enumerate(crib, placement.offset) if letter != 0xff]
+            if not window:
+                self.always = True
+                continue
+            # a sampled offset under a wildcard gives its place to an offset tested anyway, if any
+            sampled = [offset for offset in window if (offset + 1) % stride == 0]
+            tested = sampled[0] if sampled else next((offset for offset in window if offset in candidates), window[0])
+            untested = tuple(offset for offset in window if offset != tested)
+            candidates.setdefault(tested, {}).setdefault(crib[tested - placement.offset], []).append(
+                (crib, placement.offset, untested)
+            )
+        self.offsets = sorted(candidates)
+        self.letters = bytes(self.code_indices[offset] for offset in self.offsets)
+        self.candidates = [
+            tuple(tuple(candidates[offset].get(letter, ())) for letter in range(ENGLISH_ALPHABET_SIZE))
+            for offset in self.offsets
+        ]
+
+    def matches(self, machine: CompiledEnigmaMachine) -> bool:
+        """Whether a placement decodes to its crib
+        :param machine: (CompiledEnigmaMachine) machine at the initial positions of a setup
+        :return: (bool)
+        """
+        if self.always:
+            return True
+        decoded = machine.encode_at(self.offsets, self.letters)
+        survivors = [
+            survivor for letter, candidates in zip(decoded, self.candidates) for survivor in candidates[letter]
+        ]
+        if any(not untested for _, _, untested in survivors):
+            return True
+        while survivors:
+            offsets = [untested[0] for _, _, untested in survivors]
+            decoded = machine.encode_at(offsets, bytes(self.code_indices[offset] for offset in offsets))
+            next_survivors = []
+            for (crib, start, untested), offset, letter in zip(survivors, offsets, decoded):
+                if letter == crib[offset - start]:
+                    if len(untested) == 1:
+                        return True
+                    next_survivors.append((crib, start, untested[1:]))
+            survivors = next_survivors
+        return False
+
+
+class CribCheck:
+    """Decodes a code under a variant and looks for a crib in the decoded message.
+    Instances are picklable, so they can be sent to worker processes, where machines are taken from the pool of
+    the process.
+
+    With windows, the placements a crib can have are worked out once, see crib_placements, and only a few letters
+    under those placements are decoded for a variant, giving each placement up at its first mismatching letter.
+    The whole message is only decoded when a placement holds, so results are the same either way.
+    """
+
+    def __init__(self, code: str, cribs: Union[str, Iterable[str]], windows: bool = False):
+        """
+        :param code: (str) encoded message
+        :param cribs: one or more cribs, given as a list or separated by comma, wildcards allowed, see CribMatcher
+        :param windows: (bool) decode only the windows where a crib can be placed
+        """
+        self.code = code
+        self.cribs = parse_cribs(cribs)
+        self.matcher = CribMatcher(self.cribs)
+        self.windows = windows
+        self.placements = crib_placements(code, self.cribs) if windows else None
+        self.__plan = _WindowPlan(code, self.placements) if windows else None
+
+    @property
+    def decoded_letters(self) -> int:
+        """About how many letters are decoded per variant, i.e., the whole message, or the letters tested
+        """
+        return len(self.__plan.offsets) if self.windows else len(self.code)
+
+    def __call__(self, variant: Variant) -> Optional[Tuple[EnigmaSetup, str]]:
+        """
+        :param variant: (Variant) variant to be checked
+        :return: (EnigmaSetup) setup, (str) potential decoded message, if a crib is found
+        """
+        setup = to_setup(variant)
+        with MachinePool.for_current_process().machine(setup) as machine:
+            if self.windows:
+                if not self.__plan.matches(machine):
+                    return None
+            potential_decoded_message = machine.decode(self.code)
+
+        if self.matcher.find(potential_decoded_message) is not None:
+            return setup, potential_decoded_message
+        return None
@@ -0,0 +1,114 @@
+import functools
+import math
+import os
+from typing import Dict
+
+from enigma_machine.constants import ENGLISH_ALPHABET, ENGLISH_ALPHABET_SIZE
+
+ENGLISH_QUADGRAMS_PATH = os.path.join(os.path.dirname(__file__), "data", "english_quadgrams.txt")
+UNSEEN_COUNT = 0.01  # count given to n-grams never seen, so a single one does not rule a message out
+
+
+def index_of_coincidence(indices: bytes) -> float:
+    """Chance that two letters taken at random from a message are the same, about 0.066 for English and 0.038 for
+    letters drawn uniformly, e.g., a message decoded under a wrong setup
+    :param indices: (bytes) letter indices
+    :return: (float) index of coincidence
+    """
+    length = len(indices)
+    if length < 2:
+        return 0.0
+    return sum(count * (count - 1) for count in map(indices.count, range(ENGLISH_ALPHABET_SIZE))) / (
+        length * (length - 1)
+    )
+
+
+def read_counts(path: str) -> Dict[str, int]:
+    """N-gram counts of a file, an n-gram and its count per line, lines starting with # being ignored
+    :param path: (str) path of the file
+    :return: (Dict[str, int]) count of each n-gram, in uppercase
+    """
+    counts = {}
+    with open(path) as counts_file:
+        for line in counts_file:
+            if line.strip() and not line.startswith("#"):
+                ngram, count = line.split()
+                counts[ngram.upper()] = int(count)
+    return counts
+
+
+class NgramScorer:
+    """Log-probability of a message being English, from the frequencies of the n-grams it is made of.
+    The higher the score, the more English like the message, scores being comparable between messages of the same
+    length only.
+
+    N-grams are numbered in base 26, so the log-probabilities are a flat table looked up by number.
+
+    Example:
+        * scorer = english_ngrams(3)
+        * scorer.score(to_indices("ATTACKATDAWN")) => -41.8...
+    """
+
+    def __init__(self, counts: Dict[str, int]):
+        """
+        :param counts: (Dict[str, int]) count of each n-gram, all of the same length, in uppercase
+        """
+        self.n = len(next(iter(counts)))
+        total = sum(counts.values())
+        self.floor = math.log10(UNSEEN_COUNT / total)
+        self.log_probabilities = [self.floor] * ENGLISH_ALPHABET_SIZE ** self.n
+        for ngram, count in counts.items():
+            self.log_probabilities[self.__number(ngram)] = math.log10(count / total)
+
+    @classmethod
+    def from_file(cls, path: str) -> "NgramScorer":
+        """Scorer of the n-gram counts in a file, see read_counts
+        :param path: (str) path of the file
+        :return: (NgramScorer) scorer
+        """
+        return cls(read_counts(path))
+
+    def score(self, indices: bytes) -> float:
+        """
+        :param indices: (bytes) letter indices
+        :return: (float) sum of the log-probabilities of the n-grams of the message
+        """
+        table, n = self.log_probabilities, self.n
+        if n == 1:
+            return sum(map(table.__getitem__, indices))
+        if n == 2:
+            return sum(table[a * ENGLISH_ALPHABET_SIZE + b] for a, b in zip(indices, indices[1:]))
+        if n == 3:
+            return sum(
+                table[(a * ENGLISH_ALPHABET_SIZE + b) * ENGLISH_ALPHABET_SIZE + c]
+                for a, b, c in zip(indices, indices[1:], indices[2:])
+            )
+        score = 0.0
+        for start in range(len(indices) - n + 1):
+            number = 0
+            for letter in indices[start:start + n]:
+                number = number * ENGLISH_ALPHABET_SIZE + letter
+            score += table[number]
+        return score
+
+    @staticmethod
+    def __number(ngram: str) -> int:
+        number = 0
+        for letter in ngram:
+            number = number * ENGLISH_ALPHABET_SIZE + ENGLISH_ALPHABET.index(letter)
+        return number
+
+
+@functools.lru_cache(maxsize=None)
+def english_ngrams(n: int) -> NgramScorer:
+    """Scorer of English n-grams, counted in a public domain book, see data/english_quadgrams.txt.
+    Shorter n-grams are counted from the quadgrams they start.
+    :param n: (int) 1 to 4
+    :return: (NgramScorer) scorer
+    """
+    if n not in (1, 2, 3, 4):
+        raise ValueError("English n-grams are 1 to 4 letters long")
+    counts = {}
+    for quadgram, count in read_counts(ENGLISH_QUADGRAMS_PATH).items():
+        counts[quadgram[:n]] = counts.get(quadgram[:n], 0) + count
+    return NgramScorer(counts)
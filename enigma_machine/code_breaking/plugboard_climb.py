@@ -0,0 +1,206 @@
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from enigma_machine.code_breaking.fitness import NgramScorer, english_ngrams
+from enigma_machine.compiled_enigma_machine import CompiledEnigmaMachine, from_indices, to_indices
+from enigma_machine.constants import ENGLISH_ALPHABET, ENGLISH_ALPHABET_SIZE
+from enigma_machine.enigma_setup import EnigmaSetup
+
+DEFAULT_MAX_ROUNDS = 16  # plugs added, moved or removed per climb
+
+
+class PlugboardClimber:
+    """Finds the plugboard of a setup whose other settings are known, by hill-climbing: plugs are added, moved or
+    removed one at a time, as long as the decoded message gets more English.
+
+    The plugboard is the only thing changing, so the substitutions of the rotors and reflector at each keystroke,
+    i.e., the scrambler, are worked out once. A letter is decoded as plugboard, scrambler, plugboard, and a change of
+    plugs only changes the letters going through one of the letters plugged differently, either way in or on their
+    way out. Those positions are found by letter, and only the n-grams covering them are scored again.
+
+    Example:
+        * climber = PlugboardClimber(code, EnigmaSetup.from_string("V-III-IV A 24-12-10 S-W-U WP-RJ-VF-HN-CG-BS"))
+        * climber.climb(max_plugs=8) => ["AT", "IK"]
+    """
+
+    def __init__(
+            self,
+            code: str,
+            setup: EnigmaSetup,
+            scorer: Optional[NgramScorer] = None,
+            reflector_wiring: Optional[str] = None,
+    ):
+        """
+        :param code: (str) encoded message
+        :param setup: (EnigmaSetup) setup at the initial positions, its plugs being kept as they are
+        :param scorer: (NgramScorer) scorer of the decoded message, defaults to English trigrams
+        :param reflector_wiring: (str) a non-standard reflector wiring, if any
+        """
+        self.code = to_indices(code)
+        self.fixed = [f"{lead.plug_one}{lead.plug_two}" for lead in setup.plugs]
+        self.evaluated = 0  # plug changes scored
+
+        # the machine without plugboard
+        scrambler = EnigmaSetup(
+            setup.rotor_labels, setup.reflector_label, setup.ring_settings, setup.initial_positions, [],
+        )
+        self.__substitutions = CompiledEnigmaMachine(scrambler, reflector_wiring).substitutions(len(self.code))
+        self.__plugboard = list(range(ENGLISH_ALPHABET_SIZE))
+        for plug in self.fixed:
+            one, two = to_indices(plug)
+            self.__plugboard[one], self.__plugboard[two] = two, one
+        self.__free = [letter for letter in range(ENGLISH_ALPHABET_SIZE) if self.__plugboard[letter] == letter]
+
+        # positions of each code letter, and of each letter leaving the scrambler, before the plugboard
+        self.__code_positions: List[List[int]] = [[] for _ in range(ENGLISH_ALPHABET_SIZE)]
+        for inx, letter in enumerate(self.code):
+            self.__code_positions[letter].append(inx)
+        self.__scrambled = bytearray(len(self.code))
+        self.__scrambled_positions: List[Set[int]] = [set() for _ in range(ENGLISH_ALPHABET_SIZE)]
+        self.__decoded = bytearray(len(self.code))
+        for inx in range(len(self.code)):
+            self.__decode(inx, self.__plugboard)
+
+        self.__scorer = None
+        self.__window_scores: List[float] = []
+        self.score = 0.0
+        self.rescore(scorer or english_ngrams(3))
+
+    @property
+    def plugs(self) -> List[str]:
+        """Plugs on top of the fixed ones, e.g., ["AT", "IK"]"""
+        return [
+            f"{ENGLISH_ALPHABET[one]}{ENGLISH_ALPHABET[two]}"
+            for one, two in enumerate(self.__plugboard) if one < two and one in self.__free
+        ]
+
+    @property
+    def plugboard(self) -> str:
+        """All the plugs, e.g., "WP-RJ-AT" """
+        return "-".join(self.fixed + self.plugs)
+
+    @property
+    def message(self) -> str:
+        """Message decoded with the current plugs"""
+        return from_indices(bytes(self.__decoded))
+
+    def rescore(self, scorer: NgramScorer):
+        """Score the whole decoded message with another scorer, e.g., trigrams once bigrams are no longer improving
+        :param scorer: (NgramScorer) scorer
+        :return:
+        """
+        self.__scorer = scorer
+        self.__window_scores = [
+            scorer.score(self.__decoded[start:start + scorer.n]) for start in range(len(self.code) - scorer.n + 1)
+        ]
+        self.score = sum(self.__window_scores)
+
+    def delta(self, one: str, two: str) -> float:
+        """Change of score if the plugs of two letters were changed, see change
+        :param one: (str) a letter not in a fixed plug
+        :param two: (str) another one
+        :return: (float) change of score, positive if the decoded message would be more English
+        """
+        return self.__evaluate(self.__changed_plugboard(one, two))[0]
+
+    def change(self, one: str, two: str):
+        """Plug two letters together, out of any plug they were in, or unplug them if they are plugged together
+        :param one: (str) a letter not in a fixed plug
+        :param two: (str) another one
+        :return:
+        """
+        changes = self.__changed_plugboard(one, two)
+        delta, decoded, window_scores = self.__evaluate(changes)
+        for letter, partner in changes.items():
+            self.__plugboard[letter] = partner
+        for inx in decoded:
+            self.__decode(inx, self.__plugboard)
+        for start, window_score in window_scores.items():
+            self.__window_scores[start] = window_score
+        self.score += delta
+
+    def climb(
+            self, max_plugs: int, max_rounds: int = DEFAULT_MAX_ROUNDS, stop: Optional[Callable[[], bool]] = None,
+    ) -> List[str]:
+        """Make the best change of plugs, as long as one makes the decoded message more English
+        :param max_plugs: (int) plugs there can be, the fixed ones included
+        :param max_rounds: (int) changes made at most
+        :param stop: (Callable) called after each change, the climb stops once it returns True, e.g., out of time
+        :return: (List[str]) plugs on top of the fixed ones
+        """
+        for _ in range(max_rounds):
+            best_delta, best_change = 0.0, None
+            for one, two in self.__moves(max_plugs - len(self.fixed)):
+                delta = self.delta(one, two)
+                if delta > best_delta + 1e-9:
+                    best_delta, best_change = delta, (one, two)
+            if best_change is None:
+                break
+            self.change(*best_change)
+            if stop is not None and stop():
+                break
+        return self.plugs
+
+    def __moves(self, max_plugs: int) -> Iterator[Tuple[str, str]]:
+        """Pairs of free letters that can be plugged together, or unplugged, without going over max_plugs"""
+        plugged = len(self.plugs)
+        for inx, one in enumerate(self.__free):
+            for two in self.__free[inx + 1:]:
+                if self.__plugboard[one] != two:
+                    # plugs of the two letters, if any, are taken out first
+                    removed = (self.__plugboard[one] != one) + (self.__plugboard[two] != two)
+                    if plugged - removed + 1 > max_plugs:
+                        continue
+                yield ENGLISH_ALPHABET[one], ENGLISH_ALPHABET[two]
+
+    def __changed_plugboard(self, one: str, two: str) -> Dict[int, int]:
+        """Letters whose partner changes and their new partners"""
+        one, two = ENGLISH_ALPHABET.index(one.upper()), ENGLISH_ALPHABET.index(two.upper())
+        if one == two or one not in self.__free or two not in self.__free:
+            raise ValueError("Please provide two distinct letters not in a fixed plug")
+        plugboard = self.__plugboard
+        if plugboard[one] == two:
+            return {one: one, two: two}
+        changes = {plugboard[one]: plugboard[one], plugboard[two]: plugboard[two]}
+        changes.update({one: two, two: one})
+        return changes
+
+    def __evaluate(self, changes: Dict[int, int]) -> Tuple[float, Iterable[int], Dict[int, float]]:
+        """Score change of a change of plugs, with the positions decoded differently and the new n-gram scores"""
+        self.evaluated += 1
+        plugboard = list(self.__plugboard)
+        for letter, partner in changes.items():
+            plugboard[letter] = partner
+
+        positions = set()
+        for letter in changes:
+            positions.update(self.__code_positions[letter])
+            positions.update(self.__scrambled_positions[letter])
+
+        substitutions, code, decoded = self.__substitutions, self.code, self.__decoded
+        new_letters = {}
+        for inx in positions:
+            letter = plugboard[substitutions[inx * ENGLISH_ALPHABET_SIZE + plugboard[code[inx]]]]
+            if letter != decoded[inx]:
+                new_letters[inx] = letter
+
+        n = self.__scorer.n
+        starts = {
+            start for inx in new_letters for start in range(max(0, inx - n + 1), min(inx, len(code) - n) + 1)
+        }
+        window_scores = {}
+        delta = 0.0
+        for start in starts:
+            window = bytearray(decoded[start:start + n])
+            for offset in range(n):
+                window[offset] = new_letters.get(start + offset, window[offset])
+            window_scores[start] = self.__scorer.score(window)
+            delta += window_scores[start] - self.__window_scores[start]
+        return delta, positions, window_scores
+
+    def __decode(self, inx: int, plugboard: List[int]):
+        """Decode the letter at a position again, keeping track of the letter leaving the scrambler"""
+        scrambled = self.__substitutions[inx * ENGLISH_ALPHABET_SIZE + plugboard[self.code[inx]]]
+        self.__scrambled_positions[self.__scrambled[inx]].discard(inx)
+        self.__scrambled_positions[scrambled].add(inx)
+        self.__scrambled[inx] = scrambled
+        self.__decoded[inx] = plugboard[scrambled]
@@ -0,0 +1,160 @@
+from typing import Dict, Iterable, Iterator, NamedTuple, Optional, Union
+
+from enigma_machine.code_breaking.cribs import CribPlacement, crib_placements, parse_cribs
+from enigma_machine.components.rotors import RotorLabel, RotorWiring
+from enigma_machine.compiled_enigma_machine import CompiledEnigmaMachine, from_indices, to_indices, wiring_to_indices
+from enigma_machine.constants import ENGLISH_ALPHABET, ENGLISH_ALPHABET_SIZE
+from enigma_machine.enigma_setup import EnigmaSetup
+
+
+def reflector_rewirings(
+        reflector: Union[RotorLabel, str], swaps: int, required: Optional[Dict[int, int]] = None,
+) -> Iterator[bytes]:
+    """Every wiring of a reflector with some of its wires swapped, one at a time, as permutations of letter indices.
+    Swapping two wires swaps one of their ends, e.g., A-Y and H-J give either A-H and Y-J or A-J and Y-H, and a wire
+    is swapped once at most, so each wiring comes once.
+
+    Wires are settled one at a time, left as they are or swapped with one of the wires not settled yet, and the
+    rewirings of a choice are only gone through if the wires settled so far connect the required letters.
+
+    Example:
+        * len(list(reflector_rewirings(RotorLabel.B, 2))) => 8580
+        * next(reflector_rewirings(RotorLabel.B, 1, {0: 1, 1: 0})) => the first rewiring connecting A and B
+
+    :param reflector: (Union[RotorLabel, str]) reflector, or its wiring, e.g., "YRUHQSLDPXNGOKMIEBFZCWVJAT"
+    :param swaps: (int) wires swapped, two wires each
+    :param required: (Dict[int, int]) letters the rewirings must connect, both ways, by letter index, none by default
+    :return: (Iterator[bytes]) rewirings, 26 letter indices each
+    """
+    wiring = RotorWiring.from_label(reflector) if isinstance(reflector, RotorLabel) else reflector
+    wiring = bytearray(wiring_to_indices(wiring.upper()))
+    required = required or {}
+    wires = sorted((one, two) for one, two in enumerate(wiring) if one < two)
+    if any(one == two for one, two in enumerate(wiring)) or len(wires) * 2 != ENGLISH_ALPHABET_SIZE:
+        raise ValueError("Please provide a reflector connecting every letter to another one")
+    if swaps < 0 or swaps * 2 > len(wires):
+        return
+    # wires of the required letters first, so wrong choices are ruled out before going further
+    wires.sort(key=lambda wire: not (wire[0] in required or wire[1] in required))
+    settled = [False] * len(wires)
+
+    def holds(*letters: int) -> bool:
+        return all(required.get(letter, wiring[letter]) == wiring[letter] for letter in letters)
+
+    def rewire(inx: int, swaps_left: int, unsettled: int) -> Iterator[bytes]:
+        while inx < len(wires) and settled[inx]:
+            inx += 1
+        if swaps_left == 0:
+            if all(holds(*wires[other]) for other in range(inx, len(wires)) if not settled[other]):
+                yield bytes(wiring)
+            return
+        if unsettled < swaps_left * 2:
+            return
+
+        one, two = wires[inx]
+        settled[inx] = True
+        if holds(one, two):
+            yield from rewire(inx + 1, swaps_left, unsettled - 1)
+        for other in range(inx + 1, len(wires)):
+            if settled[other]:
+                continue
+            three, four = wires[other]
+            settled[other] = True
+            for first, second in ((three, four), (four, three)):
+                wiring[one], wiring[first], wiring[two], wiring[second] = first, one, second, two
+                if holds(one, two, first, second):
+                    yield from rewire(inx + 1, swaps_left - 1, unsettled - 2)
+            wiring[one], wiring[two], wiring[three], wiring[four] = two, one, four, three
+            settled[other] = False
+        settled[inx] = False
+
+    yield from rewire(0, swaps, len(wires))
+
+
+class ReflectorHit(NamedTuple):
+    """A rewiring of a reflector under which a crib is found"""
+    reflector: str
+    wiring: str
+    placement: CribPlacement
+    message: str
+
+
+class ReflectorSearch:
+    """Finds how the wires of a reflector were swapped, the rest of the setup being known, from a crib.
+
+    The reflector is the only thing changing, so the letter each code letter reaches the reflector as, and the way
+    back, are worked out once per keystroke, see CompiledEnigmaMachine.reflector_entries. A crib at an offset then
+    tells which letters the reflector has to connect: those the code letter and the crib letter reach it as.
+    Rewirings are gone through lazily, dropping any choice of wires that does not connect them, so the crib rules
+    most of them out long before they are complete, and only rewirings under which the crib is found are decoded.
+
+    Example:
+        * search = ReflectorSearch(code, EnigmaSetup.from_string("V-II-IV B 06-18-07 A-J-L UG-IE-PO-NX-WT"), swaps=2)
+        * next(search.run("INSTAGRAM, FLICKR")) => ReflectorHit("B", "PQUHRSLDYXNGOKMABEFZCWVJIT", ...)
+    """
+
+    def __init__(self, code: str, setup: EnigmaSetup, swaps: int = 2):
+        """
+        :param code: (str) encoded message
+        :param setup: (EnigmaSetup) setup, its reflector being the one rewired
+        :param swaps: (int) wires swapped, two wires each
+        """
+        self.code = code.upper()
+        self.setup = setup
+        self.swaps = swaps
+        indices = to_indices(self.code)
+        entries = CompiledEnigmaMachine(setup).reflector_entries(len(indices))
+        self.__entries = [entries[inx * ENGLISH_ALPHABET_SIZE:(inx + 1) * ENGLISH_ALPHABET_SIZE]
+                          for inx in range(len(indices))]
+        # letters the code letters reach the reflector as
+        self.__code_entries = bytes(entry[letter] for entry, letter in zip(self.__entries, indices))
+
+    def required_wires(self, placement: CribPlacement) -> Optional[Dict[int, int]]:
+        """Letters the reflector has to connect for a crib to be found at its offset
+        :param placement: (CribPlacement) crib and offset
+        :return: (Dict[int, int]) letters connected, both ways, by letter index, None if no reflector can
+        """
+        required = {}
+        for inx, letter in enumerate(placement.crib.upper(), placement.offset):
+            if letter not in ENGLISH_ALPHABET:
+                continue  # wildcard
+            one, two = self.__code_entries[inx], self.__entries[inx][ENGLISH_ALPHABET.index(letter)]
+            if one == two or required.get(one, two) != two or required.get(two, one) != one:
+                return None
+            required[one], required[two] = two, one
+        return required
+
+    def rewirings(self, placement: Optional[CribPlacement] = None) -> Iterator[bytes]:
+        """Rewirings of the reflector, see reflector_rewirings
+        :param placement: (CribPlacement) crib the rewirings have to be found under, if any
+        :return: (Iterator[bytes]) rewirings, 26 letter indices each
+        """
+        if placement is None:
+            return reflector_rewirings(self.setup.reflector_label, self.swaps)
+        required = self.required_wires(placement)
+        if required is None:
+            return iter(())
+        return reflector_rewirings(self.setup.reflector_label, self.swaps, required)
+
+    def decode(self, wiring: bytes) -> str:
+        """
+        :param wiring: (bytes) reflector wiring, 26 letter indices
+        :return: (str) code decoded with that reflector
+        """
+        return from_indices(bytes(
+            entry.index(wiring[letter]) for entry, letter in zip(self.__entries, self.__code_entries)
+        ))
+
+    def run(self, cribs: Union[str, Iterable[str]]) -> Iterator[ReflectorHit]:
+        """Rewirings under which any of the cribs is found, each once, by offset of the crib
+        :param cribs: one or more cribs, given as a list or separated by comma, wildcards allowed
+        :return: (Iterator[ReflectorHit]) hits
+        """
+        found = set()
+        for placement in crib_placements(self.code, parse_cribs(cribs)):
+            for wiring in self.rewirings(placement):
+                if wiring not in found:
+                    found.add(wiring)
+                    yield ReflectorHit(self.setup.reflector_label.name, from_indices(wiring), placement,
+                                       self.decode(wiring))
+
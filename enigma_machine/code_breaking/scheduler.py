@@ -0,0 +1,243 @@
+import enum
+import itertools
+import logging
+import os
+import time
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from enigma_machine.code_breaking.checkpoint import SearchCheckpoint, resume_search
+from enigma_machine.code_breaking.cribs import CribCheck
+from enigma_machine.code_breaking.search_pool import SearchHit, SearchPool, search
+from enigma_machine.code_breaking.search_space import SearchSpace, Variant, to_setup
+from enigma_machine.compiled_enigma_machine import CompiledEnigmaMachine
+from enigma_machine.optional_dependencies import NUMPY_INSTALLED
+
+logger = logging.getLogger(__name__)
+
+CALIBRATION_LETTERS = 4096  # letters decoded to measure the cost of a letter
+CALIBRATION_VARIANTS = 16  # variants checked to measure the cost of setting a machine up
+POOL_STARTUP_SECONDS = 0.05  # per worker process, until a pool was actually started
+BATCH_GROUP_SECONDS = 0.002  # setting up a BatchEncoder for a rotor order and plugboard
+PREDICATE_SAMPLE = 256  # variants spread across a search space to estimate the share its predicate keeps
+
+
+class Strategy(enum.Enum):
+    SERIAL = "serial"
+    PROCESS_POOL = "process pool"
+    BATCH = "batch"
+
+
+class ScheduleDecision(NamedTuple):
+    """Why a search ran the way it did"""
+    strategy: Strategy
+    variants: int  # variants checked, estimated from a sample if the search space has a predicate
+    message_length: int
+    processes: int
+    estimated_seconds: Dict[Strategy, float]  # empty if the strategy was given
+
+    def __str__(self):
+        estimates = ", ".join(
+            f"{strategy.value} {seconds:.3f}s" for strategy, seconds in self.estimated_seconds.items()
+        )
+        return (
+            f"{self.strategy.value} for {self.variants} variants of {self.message_length} letters "
+            f"on {self.processes} processes ({f'estimated {estimates}' if estimates else 'given'})"
+        )
+
+
+class Scheduler:
+    """Runs a search serially, on a process pool or in batches, whichever a cost model expects to be fastest.
+
+    Costs are measured once per process: a letter decoded on the compiled machine, setting a machine up for
+    a variant and, with NumPy, a letter of a candidate decoded by the BatchEncoder. A search then costs about
+    variants x (set up + message length x letter), split across the worker processes if a pool is used, which
+    is only worth it once the work outweighs starting the workers. The batch encoder needs a crib check.
+    Only the variants kept by the predicate of a search space are checked, and their share is estimated from
+    a sample of variants spread across the search space. Nothing is measured when a strategy is given.
+    A check other than a crib check is timed on the first variants of the search, which are not checked again.
+
+    Every decision is logged and kept in decisions.
+    """
+
+    __letter_seconds: Optional[float] = None
+    __batch_letter_seconds: Optional[float] = None
+
+    def __init__(self, processes: Optional[int] = None):
+        """
+        :param processes: (int) number of worker processes, defaults to the CPU count
+        """
+        self.processes = processes or os.cpu_count() or 1
+        self.decisions: List[ScheduleDecision] = []
+        self.__pool: Optional[SearchPool] = None
+        self.__pool_startup_seconds = POOL_STARTUP_SECONDS * self.processes
+
+    def close(self):
+        """Stop the process pool, if it was started
+        """
+        if self.__pool is not None:
+            self.__pool.close()
+            self.__pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def plan(self, space: SearchSpace, check: Callable[[Variant], Any], batch: bool = True) -> ScheduleDecision:
+        """Estimate the cost of each strategy for a search and pick the cheapest
+        :param space: (SearchSpace) variants
+        :param check: (Callable) returns a result for a hit, None otherwise
+        :param batch: (bool) whether batches are an option
+        :return: (ScheduleDecision) decision
+        """
+        return self.__plan(space, check, batch, space.indices)[0]
+
+    def __plan(
+            self, space: SearchSpace, check: Callable[[Variant], Any], batch: bool, indices: range,
+    ) -> Tuple[ScheduleDecision, range, List[SearchHit]]:
+        """Same as plan, also giving the first indices checked to time the check and their hits,
+        which a search need not check again. None are checked for a CribCheck, which is timed on a cheap proxy.
+
+        :param indices: (range) indices yet to be checked, calibration checks the first ones
+        """
+        variants = round(len(space.indices) * Scheduler.__kept_share(space))
+        message_length = len(check.code) if isinstance(check, CribCheck) else 0
+        variant_seconds, calibrated, hits = self.__measure_variant_seconds(space, check, indices)
+
+        estimates = {Strategy.SERIAL: variants * variant_seconds}
+        if self.processes > 1:
+            pool_startup_seconds = 0 if self.__pool is not None else self.__pool_startup_seconds
+            estimates[Strategy.PROCESS_POOL] = pool_startup_seconds + estimates[Strategy.SERIAL] / self.processes
+        if batch and NUMPY_INSTALLED and isinstance(check, CribCheck):
+            rotors, _, _, _, plugboards = space.dimensions
+            estimates[Strategy.BATCH] = (
+                len(rotors) * len(plugboards) * BATCH_GROUP_SECONDS
+                + variants * message_length * Scheduler.__measure_batch_letter_seconds()
+            )
+
+        strategy = min(estimates, key=estimates.get)
+        return ScheduleDecision(strategy, variants, message_length, self.processes, estimates), calibrated, hits
+
+    def search(
+            self,
+            space: SearchSpace,
+            check: Callable[[Variant], Any],
+            max_hits: Optional[int] = None,
+            strategy: Optional[Strategy] = None,
+            checkpoint: Optional[SearchCheckpoint] = None,
+    ) -> Iterator[SearchHit]:
+        """Check the variants of a search space with the strategy of the plan, or the one given
+        :param space: (SearchSpace) variants
+        :param check: (Callable) returns a result for a hit, None otherwise
+        :param max_hits: (int) stop once that many hits are found, defaults to checking all the variants
+        :param strategy: (Strategy) overrides the plan
+        :param checkpoint: (SearchCheckpoint) skip the ranges of variants it recorded and record progress,
+            in which case batches are not an option, as they do not go through the variants by index
+        :return: (Iterator[SearchHit]) hits
+        """
+        calibrated, calibration_hits = range(0), []
+        if strategy is None:
+            unchecked = space.indices if checkpoint is None else next(checkpoint.remaining(space.indices), range(0))
+            decision, calibrated, calibration_hits = self.__plan(space, check, checkpoint is None, unchecked)
+        else:
+            message_length = len(check.code) if isinstance(check, CribCheck) else 0
+            decision = ScheduleDecision(strategy, len(space.indices), message_length, self.processes, {})
+        self.decisions.append(decision)
+        logger.info(f"Scheduled {decision}")
+
+        if checkpoint is not None:
+            if decision.strategy == Strategy.BATCH:
+                raise ValueError("A search in batches cannot be checkpointed")
+            if calibrated:
+                # the variants checked to time the check are done, their hits come back with the recorded ones
+                checkpoint.record(calibrated, calibration_hits)
+            pool = self.__search_pool() if decision.strategy == Strategy.PROCESS_POOL else None
+            return resume_search(space, check, checkpoint, max_hits, pool)
+
+        # the variants checked to time the check are not checked again, their hits come first
+        hits = calibration_hits[:max_hits]
+        left = None if max_hits is None else max_hits - len(hits)
+        if left == 0:
+            return iter(hits)
+        indices = range(calibrated.stop, space.indices.stop)
+        if decision.strategy == Strategy.PROCESS_POOL:
+            return itertools.chain(hits, self.__search_pool().search(space, check, left, indices))
+        if decision.strategy == Strategy.BATCH:
+            from enigma_machine.code_breaking.batch_search import batch_search
+            return batch_search(space, check, max_hits)
+        return itertools.chain(hits, search(space, check, left, indices))
+
+    def __search_pool(self) -> SearchPool:
+        if self.__pool is None:
+            start_time = time.perf_counter()
+            self.__pool = SearchPool(self.processes)
+            self.__pool_startup_seconds = time.perf_counter() - start_time
+        return self.__pool
+
+    def __measure_variant_seconds(
+            self, space: SearchSpace, check: Callable[[Variant], Any], indices: range,
+    ) -> Tuple[float, range, List[SearchHit]]:
+        """Time of a check: setting a machine up, measured on a few variants, and decoding the message.
+        The first variant warms the caches up and is not timed. A CribCheck is timed without a message, and the
+        letters it decodes are timed apart. Any other check is timed on the first variants yet to be checked,
+        whose hits are kept for the search.
+
+        :return: (tuple) seconds per variant, indices checked, hits among them
+        """
+        sample = indices[:CALIBRATION_VARIANTS + 1]
+        if isinstance(check, CribCheck):
+            sample = range(min(CALIBRATION_VARIANTS + 1, len(space.indices)))
+            timed_check, calibrated = CribCheck("", check.cribs), range(0)
+        else:
+            timed_check, calibrated = check, sample
+
+        hits, checked, seconds = [], 0, 0.0
+        for index in sample:
+            variant = space.unrank(index)
+            if calibrated and space.predicate is not None and not space.predicate(variant):
+                continue
+            start_time = time.perf_counter()
+            result = timed_check(variant)
+            if checked:
+                seconds += time.perf_counter() - start_time
+            checked += 1
+            if calibrated and result is not None:
+                hits.append(SearchHit(index, result))
+        variant_seconds = seconds / max(1, checked - 1)
+
+        if isinstance(check, CribCheck):
+            # nothing was decoded, only the set up is timed
+            variant_seconds += check.decoded_letters * Scheduler.__measure_letter_seconds(space)
+        return variant_seconds, calibrated, hits
+
+    @staticmethod
+    def __kept_share(space: SearchSpace) -> float:
+        """Share of the variants the predicate of a search space keeps, from a sample spread across the space
+        """
+        if space.predicate is None or not space.indices:
+            return 1.0
+        sample = space.indices[::max(1, len(space.indices) // PREDICATE_SAMPLE)]
+        return sum(1 for index in sample if space.predicate(space.unrank(index))) / len(sample)
+
+    @staticmethod
+    def __measure_letter_seconds(space: SearchSpace) -> float:
+        if Scheduler.__letter_seconds is None:
+            machine = CompiledEnigmaMachine(to_setup(space.unrank(0)))
+            start_time = time.perf_counter()
+            machine.decode("A" * CALIBRATION_LETTERS)
+            Scheduler.__letter_seconds = (time.perf_counter() - start_time) / CALIBRATION_LETTERS
+        return Scheduler.__letter_seconds
+
+    @staticmethod
+    def __measure_batch_letter_seconds() -> float:
+        if Scheduler.__batch_letter_seconds is None:
+            from enigma_machine.batch_encoder import BatchEncoder
+            from enigma_machine.enigma_setup import EnigmaSetup
+
+            encoder = BatchEncoder(EnigmaSetup.from_string("I-II-III B 01-01-01 A-A-A"))
+            candidates, letters = 1024, 64
+            start_time = time.perf_counter()
+            encoder.decode("A" * letters, positions=[[c % 26, c // 26 % 26, 0] for c in range(candidates)])
+            Scheduler.__batch_letter_seconds = (time.perf_counter() - start_time) / (candidates * letters)
+        return Scheduler.__batch_letter_seconds
@@ -0,0 +1,222 @@
+import logging
+import multiprocessing
+import os
+import pickle
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Iterator, List, NamedTuple, Optional, Tuple
+
+from enigma_machine.code_breaking.search_space import SearchSpace, Variant
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TASK_SECONDS = 0.05  # worker time per task the chunk size is adapted to
+MIN_CHUNK_SIZE = 8
+MAX_CHUNK_SIZE = 1 << 16
+CANCEL_CHECK_INTERVAL = 32  # variants checked between looks at the cancel flag
+
+
+class SearchHit(NamedTuple):
+    """A variant the check accepted"""
+    index: int
+    result: Any
+
+
+def search(
+        space: SearchSpace,
+        check: Callable[[Variant], Any],
+        max_hits: Optional[int] = None,
+        indices: Optional[range] = None,
+) -> Iterator[SearchHit]:
+    """Check the variants of a search space one after the other in this process
+    :param space: (SearchSpace) variants
+    :param check: (Callable) returns a result for a hit, None otherwise
+    :param max_hits: (int) stop once that many hits are found, defaults to checking all the variants
+    :param indices: (range) indices to be checked, defaults to all of them
+    :return: (Iterator[SearchHit]) hits in index order
+    """
+    indices = space.indices if indices is None else indices
+    hits = 0
+    for index in indices:
+        variant = space.unrank(index)
+        if space.predicate is not None and not space.predicate(variant):
+            continue
+        result = check(variant)
+        if result is not None:
+            yield SearchHit(index, result)
+            hits += 1
+            if max_hits is not None and hits >= max_hits:
+                return
+
+
+class SearchPool:
+    """Long-lived pool of worker processes checking ranges of variant indices of a search space.
+
+    The pool is started once and serves any number of searches. The search space and the check are written once
+    per search and loaded once per worker, tasks are just ranges of indices. The size of the ranges adapts to how long
+    workers take to check them, results stream back as they come, and a search is cancelled as soon as it has found
+    the hits it was asked for, or as soon as the caller stops iterating.
+
+    Example:
+        * with SearchPool() as pool:
+        *     hit = next(pool.search(space, CribCheck(code, crib), max_hits=1))
+    """
+
+    def __init__(self, processes: Optional[int] = None, task_seconds: float = DEFAULT_TASK_SECONDS):
+        """
+        :param processes: (int) number of worker processes, defaults to the CPU count
+        :param task_seconds: (float) worker time per task the chunk size is adapted to
+        """
+        self.processes = processes or os.cpu_count() or 1
+        self.task_seconds = task_seconds
+        self.checked = 0  # variant indices checked by all searches
+
+        self.__cancel = multiprocessing.Event()
+        self.__pool = multiprocessing.Pool(self.processes, initializer=_init_worker, initargs=(self.__cancel,))
+        self.__directory = tempfile.TemporaryDirectory(prefix="enigma-search-")
+        self.__searches = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """Wait for the workers to exit
+        """
+        self.__pool.close()
+        self.__pool.join()
+        self.__directory.cleanup()
+
+    def search(
+            self,
+            space: SearchSpace,
+            check: Callable[[Variant], Any],
+            max_hits: Optional[int] = None,
+            indices: Optional[range] = None,
+            on_range_done: Optional[Callable[[range, List[SearchHit]], None]] = None,
+    ) -> Iterator[SearchHit]:
+        """Check the variants of a search space in the worker processes. A pool runs a single search at a time.
+        :param space: (SearchSpace) variants, must be picklable
+        :param check: (Callable) returns a result for a hit, None otherwise, must be picklable
+        :param max_hits: (int) stop once that many hits are found, defaults to checking all the variants
+        :param indices: (range) indices to be checked, defaults to all of them
+        :param on_range_done: (Callable) called with each range of indices checked and its hits
+        :return: (Iterator[SearchHit]) hits as they are found, in no particular order
+        """
+        indices = space.indices if indices is None else indices
+        self.__searches += 1
+        payload_path = os.path.join(self.__directory.name, f"search-{self.__searches}.pickle")
+        with open(payload_path, "wb") as payload_file:
+            pickle.dump((space, check), payload_file)
+
+        dispatch = _Dispatch(indices, self.processes * 2)
+        results = self.__pool.imap_unordered(_search_range, dispatch.tasks(payload_path))
+        hits = 0
+        try:
+            for done, range_hits, seconds in results:
+                dispatch.task_done(len(done), seconds, self.task_seconds)
+                self.checked += len(done)
+                if on_range_done is not None:
+                    on_range_done(done, range_hits)
+                for hit in range_hits:
+                    if max_hits is not None and hits >= max_hits:
+                        break
+                    hits += 1
+                    yield hit
+                if max_hits is not None and hits >= max_hits:
+                    logger.debug(f"Search stopped after {hits} hits")
+                    break
+        finally:
+            # tasks already sent find the cancel flag set, and the pool is drained for the next search
+            dispatch.stop()
+            self.__cancel.set()
+            while True:
+                try:
+                    done, range_hits, _ = next(results)
+                    self.checked += len(done)
+                    if on_range_done is not None:
+                        on_range_done(done, range_hits)
+                except StopIteration:
+                    break
+                except Exception as ex:
+                    # whatever ended the search, if anything, is what the caller gets to see
+                    logger.warning(f"Ignoring an error while draining the search: {ex!r}")
+            self.__cancel.clear()
+            os.remove(payload_path)
+
+
+class _Dispatch:
+    """Ranges of indices handed to the pool, sized after how long the previous ones took.
+    The pool consumes tasks in a thread of its own, so the number of tasks in flight is bounded here, otherwise
+    the whole search space would be queued at once.
+    """
+
+    def __init__(self, indices: range, max_in_flight: int):
+        self.indices = indices
+        self.chunk_size = MIN_CHUNK_SIZE
+        self.max_in_flight = max_in_flight
+        self.__in_flight = threading.Semaphore(max_in_flight)
+        self.__stopped = False
+
+    def tasks(self, payload_path: str) -> Iterator[Tuple[str, range]]:
+        start = self.indices.start
+        while start < self.indices.stop:
+            self.__in_flight.acquire()
+            if self.__stopped:
+                return
+            stop = min(start + self.chunk_size, self.indices.stop)
+            yield payload_path, range(start, stop)
+            start = stop
+
+    def task_done(self, size: int, seconds: float, task_seconds: float):
+        self.__in_flight.release()
+        if size and seconds > 0:
+            self.chunk_size = max(MIN_CHUNK_SIZE, min(MAX_CHUNK_SIZE, int(size * task_seconds / seconds)))
+
+    def stop(self):
+        self.__stopped = True
+        for _ in range(self.max_in_flight):
+            self.__in_flight.release()
+
+
+_cancel = None
+_payload_path: Optional[str] = None
+_payload = None
+
+
+def _init_worker(cancel):
+    """Keep the cancel flag once per worker process
+    :param cancel: (multiprocessing.Event) set when the current search is cancelled
+    """
+    global _cancel
+    _cancel = cancel
+
+
+def _search_range(task: Tuple[str, range]) -> Tuple[range, List[SearchHit], float]:
+    """Check a range of variant indices, the search space and the check are loaded on the first range of a search
+    :param task: (tuple) search payload file, indices
+    :return: (tuple) indices checked, hits, seconds taken
+    """
+    global _payload_path, _payload
+    payload_path, indices = task
+    start_time = time.perf_counter()
+    if payload_path != _payload_path:
+        with open(payload_path, "rb") as payload_file:
+            _payload = pickle.load(payload_file)
+        _payload_path = payload_path
+    space, check = _payload
+
+    hits = []
+    for index in indices:
+        if (index - indices.start) % CANCEL_CHECK_INTERVAL == 0 and _cancel.is_set():
+            return range(indices.start, index), hits, time.perf_counter() - start_time
+        variant = space.unrank(index)
+        if space.predicate is not None and not space.predicate(variant):
+            continue
+        result = check(variant)
+        if result is not None:
+            hits.append(SearchHit(index, result))
+    return indices, hits, time.perf_counter() - start_time
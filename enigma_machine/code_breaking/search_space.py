@@ -0,0 +1,462 @@
+import abc
+import itertools
+import math
+from typing import Callable, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from enigma_machine.constants import ENGLISH_ALPHABET
+from enigma_machine.enigma_setup import EnigmaSetup
+
+Variant = Tuple[str, str, str, str, str]  # rotors, reflector, ring settings, starting positions, plugboard
+
+
+def to_setup(variant: Variant) -> EnigmaSetup:
+    """Setup of a variant
+    :param variant: (Variant) rotors, reflector, ring settings, starting positions, plugboard
+    :return: (EnigmaSetup) setup
+    """
+    return EnigmaSetup.from_string(" ".join(variant).upper())
+
+
+def unrank_permutation(choices: Sequence, r: int, index: int) -> list:
+    """Permutation of r distinct choices at the given index, in the order of itertools.permutations
+    :param choices: (Sequence) choices
+    :param r: (int) length of the permutation
+    :param index: (int) index in 0 to math.perm(len(choices), r) - 1
+    :return: (list) permutation
+    """
+    remaining = list(choices)
+    permutation = []
+    for k in range(r):
+        digit, index = divmod(index, math.perm(len(remaining) - 1, r - k - 1))
+        permutation.append(remaining.pop(digit))
+    return permutation
+
+
+def rank_permutation(choices: Sequence, permutation: Sequence) -> int:
+    """Opposite to unrank_permutation. Index of a permutation, in the order of itertools.permutations
+    :param choices: (Sequence) choices
+    :param permutation: (Sequence) distinct choices
+    :return: (int) index
+    """
+    remaining = list(choices)
+    r = len(permutation)
+    index = 0
+    for k, choice in enumerate(permutation):
+        digit = remaining.index(choice)
+        remaining.pop(digit)
+        index += digit * math.perm(len(remaining), r - k - 1)
+    return index
+
+
+class Dimension(abc.ABC):
+    """Values one setup field can take in a search, e.g. every ring setting to be tried.
+    Values are generated on demand, so a dimension knows its size without holding its values in memory.
+    Values are also numbered, so any of them can be built from its index (unrank) and the other way round (rank).
+    """
+
+    @abc.abstractmethod
+    def __len__(self) -> int:
+        """Number of values"""
+
+    @abc.abstractmethod
+    def __iter__(self) -> Iterator[str]:
+        """Values, in the order they are numbered"""
+
+    @abc.abstractmethod
+    def unrank(self, index: int) -> str:
+        """Value at the given index, in the order values are iterated
+        :param index: (int) index in 0 to len - 1
+        :return: (str) value
+        """
+
+    @abc.abstractmethod
+    def rank(self, value: str) -> int:
+        """Opposite to unrank. Index of the given value
+        :param value: (str) value
+        :return: (int) index
+        :raises ValueError: if the value is not in the dimension
+        """
+
+
+class Choices(Dimension):
+    """A few explicit values, e.g. the reflectors or a known plugboard
+    """
+
+    def __init__(self, values: Iterable[str]):
+        self.values = tuple(values)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.values)
+
+    def unrank(self, index: int) -> str:
+        return self.values[index]
+
+    def rank(self, value: str) -> int:
+        return self.values.index(value)
+
+
+class Product(Dimension):
+    """One choice per rotor, in any combination, e.g. "04-02-14" for ring settings or "M-J-M" for positions
+    """
+
+    def __init__(self, *choices: Sequence[str], predicate: Optional[Callable[[str], bool]] = None):
+        """
+        :param choices: (Sequence[str]) choices of each rotor, from the left-most rotor to the right
+        :param predicate: (Callable) choices it rejects are left out before the combinations are generated
+        """
+        self.choices = tuple(
+            tuple(c for c in rotor_choices if predicate is None or predicate(c)) for rotor_choices in choices
+        )
+
+    def __len__(self) -> int:
+        return math.prod(len(rotor_choices) for rotor_choices in self.choices)
+
+    def __iter__(self) -> Iterator[str]:
+        return map("-".join, itertools.product(*self.choices))
+
+    def unrank(self, index: int) -> str:
+        values = []
+        for rotor_choices in reversed(self.choices):
+            index, digit = divmod(index, len(rotor_choices))
+            values.append(rotor_choices[digit])
+        return "-".join(reversed(values))
+
+    def rank(self, value: str) -> int:
+        parts = value.split("-")
+        if len(parts) != len(self.choices):
+            raise ValueError(f"{value} is not in the dimension")
+        index = 0
+        for rotor_choices, part in zip(self.choices, parts):
+            index = index * len(rotor_choices) + rotor_choices.index(part)
+        return index
+
+
+class Permutations(Dimension):
+    """Combinations of distinct choices, e.g. rotor orders, as a rotor cannot be used twice
+    """
+
+    def __init__(self, choices: Sequence[str], r: int, predicate: Optional[Callable[[str], bool]] = None):
+        """
+        :param choices: (Sequence[str]) choices shared by all the rotors
+        :param r: (int) number of rotors
+        :param predicate: (Callable) choices it rejects are left out before the permutations are generated
+        """
+        self.choices = tuple(c for c in choices if predicate is None or predicate(c))
+        self.r = r
+
+    def __len__(self) -> int:
+        return math.perm(len(self.choices), self.r)
+
+    def __iter__(self) -> Iterator[str]:
+        return map("-".join, itertools.permutations(self.choices, self.r))
+
+    def unrank(self, index: int) -> str:
+        return "-".join(unrank_permutation(self.choices, self.r, index))
+
+    def rank(self, value: str) -> int:
+        parts = value.split("-")
+        if len(parts) != self.r or len(set(parts)) != self.r:
+            raise ValueError(f"{value} is not in the dimension")
+        return rank_permutation(self.choices, parts)
+
+
+class PlugboardCompletions(Dimension):
+    """Every way to fill in the missing plugs of a plugboard such as "WP-RJ-A?-VF-I?", never reusing a plug
+    """
+
+    def __init__(self, incomplete_plugboard: str, placeholder: str = "?"):
+        """
+        :param incomplete_plugboard: (str) plug pairs, where missing plugs are marked with the placeholder
+        :param placeholder: (str) missing plug marker
+        """
+        self.incomplete_plugboard = incomplete_plugboard.upper()
+        self.placeholder = placeholder
+        self.missing = self.incomplete_plugboard.count(placeholder)
+        self.free_plugs = tuple(c for c in ENGLISH_ALPHABET if c not in self.incomplete_plugboard)
+
+    def __len__(self) -> int:
+        return math.perm(len(self.free_plugs), self.missing)
+
+    def __iter__(self) -> Iterator[str]:
+        template = self.__template()
+        for plugs in itertools.permutations(self.free_plugs, self.missing):
+            yield template % plugs
+
+    def unrank(self, index: int) -> str:
+        return self.__template() % tuple(unrank_permutation(self.free_plugs, self.missing, index))
+
+    def rank(self, value: str) -> int:
+        value = value.upper()
+        if len(value) != len(self.incomplete_plugboard):
+            raise ValueError(f"{value} is not in the dimension")
+        plugs = []
+        for template_char, value_char in zip(self.incomplete_plugboard, value):
+            if template_char == self.placeholder:
+                plugs.append(value_char)
+            elif template_char != value_char:
+                raise ValueError(f"{value} is not in the dimension")
+        if len(set(plugs)) != len(plugs):
+            raise ValueError(f"{value} is not in the dimension")
+        return rank_permutation(self.free_plugs, plugs)
+
+    def __template(self) -> str:
+        return self.incomplete_plugboard.replace("%", "%%").replace(self.placeholder, "%s")
+
+
+class SearchSpace:
+    """Every variant of an Enigma setup a search should try, i.e., the product of its dimensions.
+
+    Variants are generated one at a time, so memory stays flat regardless of the number of variants.
+    Constraints on a single field belong to its dimension, e.g. Product(..., predicate=...), and prune the search
+    before any variant is built. A predicate over whole variants is also applied during generation, although the size
+    is then counted by going through the variants once.
+
+    Variants are tuples of strings: rotors, reflector, ring settings, starting positions, plugboard.
+    They are numbered in a mixed radix, one digit per dimension with the rotors as the most significant one,
+    so a range of indices is all a worker needs to know to rebuild its share of the search, and a search can be
+    split into shards or resumed from where it stopped. Indices count variants rejected by the predicate too.
+    """
+
+    def __init__(
+            self,
+            rotors: Union[Dimension, Iterable[str]],
+            reflectors: Union[Dimension, Iterable[str]],
+            ring_settings: Union[Dimension, Iterable[str]],
+            starting_positions: Union[Dimension, Iterable[str]],
+            plugboards: Union[Dimension, Iterable[str]],
+            predicate: Optional[Callable[[Variant], bool]] = None,
+    ):
+        """
+        :param rotors: rotor orders, e.g. "BETA-GAMMA-V"
+        :param reflectors: reflector labels
+        :param ring_settings: ring settings, e.g. "04-02-14"
+        :param starting_positions: starting positions, e.g. "M-J-M"
+        :param plugboards: plugboards, e.g. "KI-XN-FL"
+        :param predicate: (Callable) variants it rejects are skipped
+        """
+        self.dimensions = tuple(
+            dimension if isinstance(dimension, Dimension) else Choices(dimension)
+            for dimension in (rotors, reflectors, ring_settings, starting_positions, plugboards)
+        )
+        self.predicate = predicate
+        self.__size = None
+
+    def __len__(self) -> int:
+        if self.__size is None:
+            if self.predicate is None:
+                self.__size = math.prod(len(dimension) for dimension in self.dimensions)
+            else:
+                self.__size = sum(1 for _ in self)
+        return self.__size
+
+    def __iter__(self) -> Iterator[Variant]:
+        variants = self.__product(self.dimensions)
+        if self.predicate is None:
+            return variants
+        return filter(self.predicate, variants)
+
+    @property
+    def indices(self) -> range:
+        """Indices of all the variants, regardless of the predicate"""
+        return range(math.prod(len(dimension) for dimension in self.dimensions))
+
+    def unrank(self, index: int) -> Variant:
+        """Variant at the given index
+        :param index: (int) index in indices
+        :return: (Variant) variant
+        """
+        if not 0 <= index < len(self.indices):
+            raise IndexError(f"Variant {index} is out of the search space")
+        values = []
+        for dimension in reversed(self.dimensions):
+            index, digit = divmod(index, len(dimension))
+            values.append(dimension.unrank(digit))
+        return tuple(reversed(values))
+
+    def rank(self, variant: Variant) -> int:
+        """Opposite to unrank. Index of the given variant
+        :param variant: (Variant) variant
+        :return: (int) index
+        :raises ValueError: if the variant is not in the search space
+        """
+        index = 0
+        for dimension, value in zip(self.dimensions, variant):
+            index = index * len(dimension) + dimension.rank(value)
+        return index
+
+    def ranges(self, chunk_size: int, indices: Optional[range] = None) -> Iterator[range]:
+        """Split indices into consecutive ranges, e.g. to be handed to workers
+        :param chunk_size: (int) indices per range
+        :param indices: (range) indices to split, defaults to all of them
+        :return: (Iterator[range]) ranges
+        """
+        indices = self.indices if indices is None else indices
+        for start in range(indices.start, indices.stop, chunk_size):
+            yield range(start, min(start + chunk_size, indices.stop))
+
+    def variants(self, indices: range) -> Iterator[Variant]:
+        """Variants of a range of indices, the predicate applied
+        :param indices: (range) indices
+        :return: (Iterator[Variant]) variants
+        """
+        variants = map(self.unrank, indices)
+        if self.predicate is None:
+            return variants
+        return filter(self.predicate, variants)
+
+    @staticmethod
+    def __product(dimensions: Tuple[Dimension, ...]) -> Iterator[tuple]:
+        """Same as itertools.product, without first copying every dimension into a tuple
+        """
+        if not dimensions:
+            yield ()
+            return
+        for value in dimensions[0]:
+            for rest in SearchSpace.__product(dimensions[1:]):
+                yield (value,) + rest
+
+
+class Prefixed(Dimension):
+    """Values of another dimension behind the same prefix, e.g. "01-" before the ring settings of the other rotors
+    """
+
+    def __init__(self, prefix: str, dimension: Dimension):
+        """
+        :param prefix: (str) prefix of every value
+        :param dimension: (Dimension) values after the prefix
+        """
+        self.prefix = prefix
+        self.dimension = dimension
+
+    def __len__(self) -> int:
+        return len(self.dimension)
+
+    def __iter__(self) -> Iterator[str]:
+        return (self.prefix + value for value in self.dimension)
+
+    def unrank(self, index: int) -> str:
+        return self.prefix + self.dimension.unrank(index)
+
+    def rank(self, value: str) -> int:
+        if not value.startswith(self.prefix):
+            raise ValueError(f"{value} is not in the dimension")
+        return self.dimension.rank(value[len(self.prefix):])
+
+
+class RingEquivalence:
+    """Collapses the variants of a search space that give the same machine, so each is only checked once.
+
+    Only the right-most and middle rotors step the rotor to their left, so the ring settings of the rotors to the
+    left of the middle one never decide when a rotor steps, and they only matter, as the starting positions, through
+    the position of the rotor cores, i.e., the starting position minus the ring setting. Variants with the same
+    difference for these rotors, the rest being the same, give the same machine, e.g., 26 ring settings times 26
+    starting positions of the left rotor give 26 machines.
+
+    Representatives have the ring settings of these rotors set to 01 and their starting positions shifted to keep
+    the same cores. Their dimensions are derived from those of the search space, without going through their values,
+    so ring settings have to be given as a Product or Permutations and starting positions as a Product or a single
+    choice. They are only used where they check fewer variants than the search space, e.g., not when the starting
+    positions are known. Unless every representative stands for a variant of the search space, as with a Product of
+    ring settings, those that do not are left out by a predicate, as are those whose variants are all rejected by a
+    predicate of the search space.
+
+    Example:
+        * equivalence = RingEquivalence(SearchSpace(rotors, reflectors, all_rings, all_positions, plugboards))
+        * for hit in search(equivalence.representatives, check):
+        *     variants = equivalence.expand(equivalence.representatives.unrank(hit.index))
+    """
+
+    REFERENCE_RING = "01"
+
+    def __init__(self, space: SearchSpace):
+        """
+        :param space: (SearchSpace) search space
+        """
+        self.space = space
+        self.representatives = space
+        self.collapsed = 0  # rotors whose ring settings and starting positions are collapsed
+
+        rotors, reflectors, ring_settings, starting_positions, plugboards = space.dimensions
+        if isinstance(ring_settings, Product):
+            collapsed = len(ring_settings.choices) - 2
+            collapsed_rings = ring_settings.choices[:collapsed]
+            rings = Product(*[(self.REFERENCE_RING,)] * collapsed, *ring_settings.choices[collapsed:])
+        elif isinstance(ring_settings, Permutations):
+            collapsed = ring_settings.r - 2
+            collapsed_rings = (ring_settings.choices,) * collapsed
+            rings = Prefixed(
+                f"{self.REFERENCE_RING}-" * collapsed, Permutations(ring_settings.choices, ring_settings.r - collapsed),
+            )
+        else:
+            return
+        positions = self.__rotor_choices(starting_positions)
+        if collapsed < 1 or positions is None or len(positions) != collapsed + 2:
+            return
+
+        cores = [
+            tuple(dict.fromkeys(self.__shift(p, r, -1) for r in rotor_rings for p in rotor_positions))
+            for rotor_rings, rotor_positions in zip(collapsed_rings, positions)
+        ]
+        positions = Product(*cores, *positions[collapsed:])
+        if len(rings) * len(positions) < len(ring_settings) * len(starting_positions):
+            self.collapsed = collapsed
+            reachable = isinstance(ring_settings, Product) and space.predicate is None
+            self.representatives = SearchSpace(
+                rotors, reflectors, rings, positions, plugboards, predicate=None if reachable else self.reaches,
+            )
+
+    def reaches(self, representative: Variant) -> bool:
+        """Whether a representative stands for any variant of the search space, see expand
+        :param representative: (Variant) variant of the representatives
+        :return: (bool) True if it does
+        """
+        return bool(self.expand(representative))
+
+    def expand(self, representative: Variant) -> List[Variant]:
+        """Variants of the search space giving the same machine as a representative
+        :param representative: (Variant) variant of the representatives
+        :return: (List[Variant]) variants
+        """
+        if not self.collapsed:
+            return [representative] if self.space.predicate is None or self.space.predicate(representative) else []
+
+        rotors, reflector, ring_settings, starting_positions, plugboard = representative
+        rest = tuple(ring_settings.split("-")[self.collapsed:])
+        cores = starting_positions.split("-")
+        variants = []
+        for prefix in self.__prefixes(rest):
+            positions = [self.__shift(p, r, 1) for p, r in zip(cores, prefix)] + cores[self.collapsed:]
+            variant = (rotors, reflector, "-".join(prefix + rest), "-".join(positions), plugboard)
+            try:
+                self.space.rank(variant)
+            except ValueError:
+                continue
+            if self.space.predicate is None or self.space.predicate(variant):
+                variants.append(variant)
+        return variants
+
+    def __prefixes(self, rest: Tuple[str, ...]) -> Iterator[Tuple[str, ...]]:
+        """Ring settings the collapsed rotors can have, given the ring settings of the other rotors"""
+        ring_settings = self.space.dimensions[2]
+        if isinstance(ring_settings, Product):
+            return itertools.product(*ring_settings.choices[:self.collapsed])
+        return itertools.permutations([r for r in ring_settings.choices if r not in rest], self.collapsed)
+
+    @staticmethod
+    def __rotor_choices(dimension: Dimension) -> Optional[Tuple[Tuple[str, ...], ...]]:
+        """Choices of each rotor of a dimension, if they are taken in any combination"""
+        if isinstance(dimension, Product):
+            return dimension.choices
+        if isinstance(dimension, Choices) and len(dimension) == 1:
+            return tuple((part,) for part in dimension.values[0].split("-"))
+        return None
+
+    @staticmethod
+    def __shift(position: str, ring: str, direction: int) -> str:
+        """Starting position of a rotor shifted by its ring setting, relative to ring 01"""
+        return ENGLISH_ALPHABET[
+            (ENGLISH_ALPHABET.index(position.upper()) + direction * (int(ring) - 1)) % len(ENGLISH_ALPHABET)
+        ]
@@ -0,0 +1,287 @@
+import base64
+import itertools
+import json
+import logging
+import multiprocessing
+import pickle
+import socket
+import socketserver
+import threading
+from typing import Any, Callable, Iterator, List, Optional, Tuple
+
+from enigma_machine.code_breaking.checkpoint import SearchCheckpoint
+from enigma_machine.code_breaking.search_pool import SearchHit, SearchPool, search
+from enigma_machine.code_breaking.search_space import SearchSpace, Variant
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SHARD_SIZE = 4096  # variant indices per shard
+
+
+def _dumps(value: Any) -> str:
+    return base64.b64encode(pickle.dumps(value)).decode("ascii")
+
+
+def _loads(value: str) -> Any:
+    return pickle.loads(base64.b64decode(value))
+
+
+class Coordinator:
+    """Hands shards of a search space out to nodes and gathers their hits, over TCP.
+
+    Nodes, see run_node or `python -m enigma_machine.code_breaking HOST:PORT`, may be processes on this machine or
+    on other hosts. The protocol is a JSON object per line, request and reply, on a connection per node:
+        * {"op": "hello"} -> {"search": the search space and check, pickled}
+        * {"op": "shard"} -> {"shard": [start, stop]} or {"shard": null} once there is nothing left to do
+        * {"op": "done", "shard": [start, stop], "hits": [[index, result pickled], ...]} -> {"stop": bool}
+
+    A request that cannot be served is answered with {"error": reason}, the connection staying open.
+    A shard is leased to a node until it reports it done, and handed out again if the node disconnects before.
+    Pickled data is trusted, so nodes must only connect to a coordinator they trust, and the other way round,
+    which is why the coordinator listens on localhost unless told otherwise.
+    """
+
+    def __init__(
+            self,
+            space: SearchSpace,
+            check: Callable[[Variant], Any],
+            shard_size: int = DEFAULT_SHARD_SIZE,
+            max_hits: Optional[int] = None,
+            checkpoint: Optional[SearchCheckpoint] = None,
+            address: Tuple[str, int] = ("127.0.0.1", 0),
+    ):
+        """
+        :param space: (SearchSpace) variants, must be picklable
+        :param check: (Callable) returns a result for a hit, None otherwise, must be picklable
+        :param shard_size: (int) variant indices per shard
+        :param max_hits: (int) stop once that many hits are found, defaults to checking all the variants
+        :param checkpoint: (SearchCheckpoint) skip the shards it recorded and record the ones done
+        :param address: (tuple) host and port to listen on, any free port by default
+        """
+        self.max_hits = max_hits
+        self.checkpoint = checkpoint
+        self.hits: List[SearchHit] = []
+        self.shards_done = 0
+
+        self.__payload = _dumps((space, check))
+        remaining = checkpoint.remaining(space.indices) if checkpoint is not None else [space.indices]
+        self.__shards = itertools.chain.from_iterable(space.ranges(shard_size, indices) for indices in remaining)
+        self.__requeued: List[range] = []
+        self.__leased = set()
+        self.__lock = threading.Lock()
+        self.__finished = threading.Event()
+
+        self.__server = _Server(address, _Handler)
+        self.__server.coordinator = self
+        self.address = self.__server.server_address
+        self.__thread = threading.Thread(target=self.__server.serve_forever, args=(0.1,), daemon=True)
+        self.__thread.start()
+        self.__update_finished()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """Stop listening
+        """
+        self.__server.shutdown()
+        self.__server.server_close()
+        self.__thread.join()
+
+    @property
+    def finished(self) -> bool:
+        return self.__finished.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every shard is done or enough hits are found
+        :param timeout: (float) seconds, defaults to no timeout
+        :return: (bool) whether the search finished
+        """
+        return self.__finished.wait(timeout)
+
+    def payload(self) -> str:
+        return self.__payload
+
+    def lease(self) -> Optional[range]:
+        """Next shard to be checked by a node, None if there is none left
+        """
+        with self.__lock:
+            if self.__finished.is_set():
+                return None
+            shard = self.__requeued.pop() if self.__requeued else next(self.__shards, None)
+            if shard is not None:
+                self.__leased.add(shard)
+            return shard
+
+    def complete(self, shard: range, hits: List[SearchHit]) -> bool:
+        """Record a shard checked by a node
+        :return: (bool) whether nodes should stop
+        """
+        with self.__lock:
+            if shard not in self.__leased:
+                return self.__finished.is_set()  # already done by another node
+            self.__leased.discard(shard)
+            self.shards_done += 1
+            self.hits.extend(hits)
+            if self.checkpoint is not None:
+                self.checkpoint.record(shard, hits)
+            self.__update_finished()
+            return self.__finished.is_set()
+
+    def release(self, shard: range):
+        """Hand a shard out again, e.g., its node disconnected before it was done
+        """
+        with self.__lock:
+            if shard in self.__leased:
+                logger.info(f"Shard {shard.start}-{shard.stop} is handed out again")
+                self.__leased.discard(shard)
+                self.__requeued.append(shard)
+                self.__update_finished()
+
+    def __update_finished(self):
+        enough_hits = self.max_hits is not None and len(self.hits) >= self.max_hits
+        if enough_hits or not self.__leased and not self.__requeued and self.__peek_shard() is None:
+            self.__finished.set()
+
+    def __peek_shard(self) -> Optional[range]:
+        shard = next(self.__shards, None)
+        if shard is not None:
+            self.__shards = itertools.chain([shard], self.__shards)
+        return shard
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+    coordinator: Coordinator
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    """A node connection, serving its requests until it disconnects.
+    A request that cannot be served, e.g., not JSON or missing a field, is answered with an error, see Coordinator.
+    """
+
+    def handle(self):
+        leased = set()
+        try:
+            for line in self.rfile:
+                try:
+                    reply = self.__reply(json.loads(line), leased)
+                except (EOFError, KeyError, TypeError, ValueError, pickle.UnpicklingError) as e:
+                    logger.warning(f"Invalid request from node {self.client_address}: {e!r}")
+                    reply = {"error": f"invalid request: {e!r}"}
+                self.wfile.write((json.dumps(reply) + "\n").encode("ascii"))
+                self.wfile.flush()
+        except ConnectionError as e:
+            logger.warning(f"Node {self.client_address} dropped: {e}")
+        finally:
+            for shard in leased:
+                self.server.coordinator.release(shard)
+
+    def __reply(self, request: dict, leased: set) -> dict:
+        """Serve a request
+        :param request: (dict) request, see Coordinator
+        :param leased: (set) shards leased to this node, not done yet
+        :return: (dict) reply
+        :raises KeyError, TypeError, ValueError: if the request is not valid, or its hits cannot be unpickled
+        """
+        coordinator = self.server.coordinator
+        op = request["op"]
+        if op == "hello":
+            return {"search": coordinator.payload()}
+        if op == "shard":
+            shard = coordinator.lease()
+            if shard is not None:
+                leased.add(shard)
+            return {"shard": None if shard is None else [shard.start, shard.stop]}
+        if op == "done":
+            start, stop = request["shard"]
+            hits = [(index, result) for index, result in request["hits"]]
+            if not all(isinstance(value, int) for value in [start, stop] + [index for index, _ in hits]):
+                raise ValueError("shards and hits are given by variant indices")
+            shard = range(start, stop)
+            hits = [SearchHit(index, _loads(result)) for index, result in hits]
+            leased.discard(shard)
+            return {"stop": coordinator.complete(shard, hits)}
+        raise ValueError(f"unknown op {op}")
+
+
+def run_node(address: Tuple[str, int], processes: int = 1) -> int:
+    """Check shards handed out by a coordinator until there are none left
+    :param address: (tuple) coordinator host and port
+    :param processes: (int) worker processes of this node, checks shards in this process if 1
+    :return: (int) number of shards checked
+    """
+    shards_done = 0
+    with socket.create_connection(address) as connection, connection.makefile("rw") as stream:
+        def request(message: dict) -> dict:
+            stream.write(json.dumps(message) + "\n")
+            stream.flush()
+            reply = stream.readline()
+            if not reply:
+                raise ConnectionError("The coordinator closed the connection")
+            reply = json.loads(reply)
+            if "error" in reply:
+                raise RuntimeError(f"The coordinator refused a request, {reply['error']}")
+            return reply
+
+        space, check = _loads(request({"op": "hello"})["search"])
+        pool = SearchPool(processes) if processes > 1 else None
+        try:
+            while True:
+                shard = request({"op": "shard"})["shard"]
+                if shard is None:
+                    break
+                indices = range(*shard)
+                hits = pool.search(space, check, indices=indices) if pool else search(space, check, indices=indices)
+                reply = request({
+                    "op": "done",
+                    "shard": shard,
+                    "hits": [[hit.index, _dumps(hit.result)] for hit in hits],
+                })
+                shards_done += 1
+                if reply["stop"]:
+                    break
+        finally:
+            if pool is not None:
+                pool.close()
+    return shards_done
+
+
+def sharded_search(
+        space: SearchSpace,
+        check: Callable[[Variant], Any],
+        nodes: int = 2,
+        shard_size: int = DEFAULT_SHARD_SIZE,
+        max_hits: Optional[int] = None,
+        checkpoint: Optional[SearchCheckpoint] = None,
+) -> Iterator[SearchHit]:
+    """Run a coordinator and a few nodes as processes of this machine, a stand-in for a search across hosts
+    :param space: (SearchSpace) variants, must be picklable
+    :param check: (Callable) returns a result for a hit, None otherwise, must be picklable
+    :param nodes: (int) number of node processes
+    :param shard_size: (int) variant indices per shard
+    :param max_hits: (int) stop once that many hits are found, defaults to checking all the variants
+    :param checkpoint: (SearchCheckpoint) skip the shards it recorded and record the ones done
+    :return: (Iterator[SearchHit]) hits, once the search is over, those recorded by the checkpoint first
+    """
+    # hits recorded before come first, as in resume_search
+    indices = (checkpoint.hits if checkpoint else [])[:max_hits]
+    hits = [SearchHit(index, check(space.unrank(index))) for index in indices]
+    left = None if max_hits is None else max_hits - len(hits)
+    if left == 0:
+        return iter(hits)
+
+    with Coordinator(space, check, shard_size, left, checkpoint) as coordinator:
+        processes = [multiprocessing.Process(target=run_node, args=(coordinator.address,)) for _ in range(nodes)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        if not coordinator.finished:
+            raise RuntimeError("All nodes exited before the search was over")
+        found = sorted(coordinator.hits)
+    return iter(hits + found[:left])
@@ -0,0 +1,548 @@
+import atexit
+import functools
+import multiprocessing
+import multiprocessing.pool
+import os
+from typing import List, Optional, Sequence, Tuple
+
+from enigma_machine.components.rotors import RotorLabel, RotorWiring, Turnover
+from enigma_machine.constants import ENGLISH_ALPHABET, ENGLISH_ALPHABET_SIZE
+from enigma_machine.enigma_setup import EnigmaSetup
+from enigma_machine.exceptions import IncompatibleConfiguration
+from enigma_machine.stepping_table import SteppingTable, from_state, to_state
+
+_ALPHABET_BYTES = ENGLISH_ALPHABET.encode("ascii")
+_TO_INDICES = bytes.maketrans(_ALPHABET_BYTES, bytes(range(ENGLISH_ALPHABET_SIZE)))
+_FROM_INDICES = bytes.maketrans(bytes(range(ENGLISH_ALPHABET_SIZE)), _ALPHABET_BYTES)
+
+MIN_PARALLEL_CHUNK_SIZE = 1 << 16  # smaller chunks cost more to ship to a worker than to encode
+MIN_PARALLEL_LENGTH = 1 << 18  # shorter messages are encoded faster in the calling process
+
+_shared_pool: Optional[Tuple[int, int, multiprocessing.pool.Pool]] = None
+
+
+def to_indices(message: str) -> bytes:
+    """Convert a message into letter indices, i.e., A=0 ... Z=25
+    :param message: (str) a message in a-zA-Z
+    :return: (bytes) one index per letter
+    :raises ValueError: if the message contains anything else than letters
+    """
+    try:
+        raw = message.upper().encode("ascii")
+    except UnicodeEncodeError:
+        raise ValueError("Please provide a letter in a-zA-Z.")
+
+    if raw.translate(None, _ALPHABET_BYTES):
+        raise ValueError("Please provide a letter in a-zA-Z.")
+
+    return raw.translate(_TO_INDICES)
+
+
+def from_indices(indices: bytes) -> str:
+    """Opposite to to_indices. Convert letter indices back into an uppercase message
+    :param indices: (bytes) letter indices in 0-25
+    :return: (str) message
+    """
+    return bytes(indices).translate(_FROM_INDICES).decode("ascii")
+
+
+def wiring_to_indices(wiring: str) -> Tuple[int, ...]:
+    """Convert a wiring string such as "EKMFLGDQVZNTOWYHXUSPAIBRCJ" into a permutation of letter indices
+    :param wiring: (str) rotor or reflector wiring
+    :return: (tuple) permutation
+    """
+    return tuple(ENGLISH_ALPHABET.index(c) for c in wiring)
+
+
+@functools.lru_cache(maxsize=None)
+def wiring_tables(wiring: str) -> Tuple[Tuple[Tuple[int, ...], ...], Tuple[Tuple[int, ...], ...]]:
+    """Forward (right to left) and inverse (left to right) permutations of a rotor wiring, one row per rotor position.
+    Rows already account for the rotor offset, so a signal x entering a rotor at position p leaves it at row[p][x].
+
+    :param wiring: (str) rotor wiring
+    :return: (tuple) forward rows, inverse rows
+    """
+    forward = wiring_to_indices(wiring)
+    inverse = [0] * ENGLISH_ALPHABET_SIZE
+    for inx, target in enumerate(forward):
+        inverse[target] = inx
+
+    def rows(permutation):
+        return tuple(
+            tuple(
+                (permutation[(x + p) % ENGLISH_ALPHABET_SIZE] - p) % ENGLISH_ALPHABET_SIZE
+                for x in range(ENGLISH_ALPHABET_SIZE)
+            )
+            for p in range(ENGLISH_ALPHABET_SIZE)
+        )
+
+    return rows(forward), rows(inverse)
+
+
+def notch_index(rotor_label: RotorLabel, ring: int) -> int:
+    """Notch of a rotor, relative to its ring setting
+    :param rotor_label: (RotorLabel) the rotor label
+    :param ring: (int) ring setting in 0-25
+    :return: (int) notch position in 0-25 or -1 if the rotor has no notch
+    """
+    if not rotor_label.turnover:
+        return -1
+    return (ENGLISH_ALPHABET.index(Turnover.from_label(rotor_label)) - ring) % ENGLISH_ALPHABET_SIZE
+
+
+class CompiledEnigmaMachine:
+    """Integer-domain representation of an Enigma machine.
+
+    The setup is turned once into permutation tables (plugboard, rotors forward and inverse, reflector),
+    so encoding a message is a sequence of table lookups over letter indices 0-25 instead of string scans.
+    The output is identical to EnigmaMachine.encode for the same setup.
+
+    Positions are kept the same way Rotor keeps them, i.e., already shifted by the ring setting,
+    from the right-most rotor to the left-most one.
+    """
+
+    def __init__(self, setup: EnigmaSetup, reflector_wiring: Optional[str] = None):
+        self.setup = None
+        self.__rotor_labels = ()
+        self.__rotor_tables = []
+        self.__plugboard = None
+        self.__reflector_wiring = None
+        self.__core = None
+        self.__middle_cache = {}
+        self.reconfigure(setup, reflector_wiring)
+
+    def reconfigure(self, setup: EnigmaSetup, reflector_wiring: Optional[str] = None):
+        """Set the machine up in place for another setup, e.g., for each candidate key of a search loop.
+        Only the tables that differ from the current setup are rebuilt, and the cached middle permutations are kept
+        as long as the middle and left rotors, a fourth rotor and the reflector stay the same.
+
+        :param setup: (EnigmaSetup) the new setup
+        :param reflector_wiring: (str) a non-standard reflector wiring, if any
+        :return:
+        """
+        if len(setup.rotor_labels) not in (3, 4):
+            raise IncompatibleConfiguration("The compiled machine requires 3 or 4 rotors")
+
+        self.setup = setup
+        rings = [int(ring_setting) - 1 for ring_setting in setup.ring_settings]  # ring settings should be in 0-25
+
+        self.__initial_positions = [
+            (ENGLISH_ALPHABET.index(position) - ring) % ENGLISH_ALPHABET_SIZE
+            for position, ring in zip(setup.initial_positions, rings)
+        ]
+        self.__positions = list(self.__initial_positions)
+        self.stepping_table = SteppingTable.for_notches(
+            (notch_index(setup.rotor_labels[0], rings[0]), notch_index(setup.rotor_labels[1], rings[1]))
+        )
+
+        rotor_labels = tuple(setup.rotor_labels)
+        rotors_changed = rotor_labels != self.__rotor_labels
+        if rotors_changed:
+            if rotor_labels[1:3] != self.__rotor_labels[1:3]:
+                self.__middle_cache = {}
+            self.__rotor_labels = rotor_labels
+            self.__rotor_tables = [wiring_tables(RotorWiring.from_label(label)) for label in rotor_labels]
+
+        plugboard = list(range(ENGLISH_ALPHABET_SIZE))
+        for lead in setup.plugs:
+            one, two = ENGLISH_ALPHABET.index(lead.plug_one), ENGLISH_ALPHABET.index(lead.plug_two)
+            plugboard[one], plugboard[two] = two, one
+        plugboard = tuple(plugboard)
+
+        if rotors_changed or plugboard != self.__plugboard:
+            self.__plugboard = plugboard
+            # the plugboard is folded into the right-most rotor, so it costs nothing per keystroke
+            forward_rows, inverse_rows = self.__rotor_tables[0]
+            self.__entry_rows = tuple(
+                tuple(row[plugboard[x]] for x in range(ENGLISH_ALPHABET_SIZE)) for row in forward_rows
+            )
+            self.__exit_rows = tuple(tuple(plugboard[x] for x in row) for row in inverse_rows)
+            self.__ascii_rows = None  # built on first use by encode_into
+
+        self.reflector_wiring = reflector_wiring or RotorWiring.from_label(setup.reflector_label)
+
+    @classmethod
+    def from_machine(cls, machine):
+        """Compile an EnigmaMachine as it is, i.e., considering its current rotor positions and reflector wiring
+        :param machine: (EnigmaMachine) the machine to compile
+        :return: (CompiledEnigmaMachine) compiled machine
+        """
+        compiled = cls(machine.setup, machine.get_reflector().wiring)
+        compiled.positions = [rotor.position for rotor in machine.rotors[:-1]]
+        return compiled
+
+    @property
+    def reflector_wiring(self) -> str:
+        return self.__reflector_wiring
+
+    @reflector_wiring.setter
+    def reflector_wiring(self, value: str):
+        if value != self.__reflector_wiring:
+            self.__reflector_wiring = value
+            self.__reflector = wiring_to_indices(value)
+        self.__compile_static_core()
+
+    @property
+    def positions(self) -> List[int]:
+        return list(self.__positions)
+
+    @positions.setter
+    def positions(self, value):
+        self.__positions = [position % ENGLISH_ALPHABET_SIZE for position in value]
+        self.__compile_static_core()
+
+    def __reduce__(self):
+        # tables are rebuilt (or found in the caches) on the other side, only the configuration is pickled
+        return _restore_compiled_machine, (self.setup, self.reflector_wiring, self.positions)
+
+    def reset_rotors(self):
+        """Set rotor positions back to initial position
+        :return:
+        """
+        self.positions = self.__initial_positions
+
+    def seek(self, n: int):
+        """Position the rotors where they are after n keystrokes from their initial position,
+        without stepping through the keystrokes in between.
+
+        :param n: (int) number of keystrokes
+        :return:
+        """
+        if n < 0:
+            raise ValueError("Please provide a non-negative number of keystrokes")
+        state = self.stepping_table.advance(to_state(*self.__initial_positions[:3]), n)
+        self.__positions[:3] = from_state(state)
+
+    def advance(self, n: int):
+        """Move the rotors n keystrokes forward from where they are, as seek does from the initial position
+        :param n: (int) number of keystrokes
+        :return:
+        """
+        if n < 0:
+            raise ValueError("Please provide a non-negative number of keystrokes")
+        state = self.stepping_table.advance(to_state(*self.__positions[:3]), n)
+        self.__positions[:3] = from_state(state)
+
+    def encode_indices(self, indices: bytes) -> bytes:
+        """Encode or decode letter indices (A=0 ... Z=25). Rotors will not reset
+        :param indices: (bytes) letter indices
+        :return: (bytes) encoded letter indices
+        """
+        entry_rows, exit_rows = self.__entry_rows, self.__exit_rows
+        states = self.stepping_table.walk(to_state(*self.__positions[:3]), len(indices))
+        middle_key = -1
+        middle = None
+
+        encoded = bytearray(len(indices))
+        for inx, state in enumerate(states):
+            p0 = state % ENGLISH_ALPHABET_SIZE
+            # the middle permutation only changes when the middle or left rotor rotate
+            if state // ENGLISH_ALPHABET_SIZE != middle_key:
+                middle_key = state // ENGLISH_ALPHABET_SIZE
+                middle = self.__middle(middle_key)
+
+            encoded[inx] = exit_rows[p0][middle[entry_rows[p0][indices[inx]]]]
+
+        if states:
+            self.__positions[:3] = from_state(states[-1])
+        return bytes(encoded)
+
+    def encode_at(self, offsets: Sequence[int], indices: bytes) -> bytes:
+        """Encode or decode single letters found at some offsets of a message, without going through the letters
+        in between, e.g., to test a few letters of a message. Rotors will not move.
+
+        :param offsets: (Sequence[int]) keystrokes from the current rotor positions, one per letter
+        :param indices: (bytes) letter indices, one per offset
+        :return: (bytes) encoded letter indices
+        """
+        entry_rows, exit_rows = self.__entry_rows, self.__exit_rows
+        if not offsets:
+            return b""
+        # walking the states from the first offset to the last one costs next to nothing next to encoding a letter
+        first = min(offsets)
+        state = self.stepping_table.advance(to_state(*self.__positions[:3]), first)
+        states = self.stepping_table.walk(state, max(offsets) - first + 1)
+        middle_key = -1
+        middle = None
+
+        encoded = bytearray()
+        for offset, letter in zip(offsets, indices):
+            state = states[offset - first]
+            p0 = state % ENGLISH_ALPHABET_SIZE
+            if state // ENGLISH_ALPHABET_SIZE != middle_key:
+                middle_key = state // ENGLISH_ALPHABET_SIZE
+                middle = self.__middle(middle_key)
+            encoded.append(exit_rows[p0][middle[entry_rows[p0][letter]]])
+        return bytes(encoded)
+
+    def encode_into(self, source, destination=None) -> int:
+        """Encode or decode ASCII letters from a bytes-like object into a writable buffer, e.g., a bytearray,
+        a memoryview or a mmap, without creating intermediate objects. Rotors will not reset.
+
+        :param source: (bytes-like) ASCII letters in a-zA-Z
+        :param destination: (bytes-like) writable buffer of at least the same length, defaults to source (in place)
+        :return: (int) number of letters encoded
+        :raises ValueError: if the source contains anything else than letters, leaving the rotors where they were
+        """
+        if destination is None:
+            destination = source
+        # views are released on the way out, so buffers such as a mmap can be closed afterwards, even after an error
+        with memoryview(source).cast("B") as source, memoryview(destination).cast("B") as destination:
+            if destination.readonly:
+                raise ValueError("Please provide a writable destination buffer")
+            if len(destination) < len(source):
+                raise ValueError("The destination buffer is smaller than the source")
+
+            if self.__ascii_rows is None:
+                self.__ascii_rows = self.__compile_ascii_rows()
+            entry_rows, exit_rows = self.__ascii_rows
+            states = self.stepping_table.walk(to_state(*self.__positions[:3]), len(source))
+            middle_key = -1
+            middle = None
+
+            try:
+                for inx, (state, c) in enumerate(zip(states, source)):
+                    p0 = state % ENGLISH_ALPHABET_SIZE
+                    if state // ENGLISH_ALPHABET_SIZE != middle_key:
+                        middle_key = state // ENGLISH_ALPHABET_SIZE
+                        middle = self.__middle(middle_key)
+
+                    destination[inx] = exit_rows[p0][middle[entry_rows[p0][c]]]
+            except TypeError:
+                # anything else than a letter has no entry in the ASCII rows
+                raise ValueError("Please provide a letter in a-zA-Z.")
+
+        if states:
+            self.__positions[:3] = from_state(states[-1])
+        return len(states)
+
+    def substitutions(self, n: int) -> bytes:
+        """Substitution the machine applies at each of the next n keystrokes, i.e., its keystream.
+        Each keystroke takes 26 bytes, where byte x is the index letter index x is encoded to. Rotors will not reset.
+
+        :param n: (int) number of keystrokes
+        :return: (bytes) n * 26 letter indices
+        """
+        # translate needs tables of 256 bytes, the letter indices only use the first 26
+        entry_rows = [bytes(row) for row in self.__entry_rows]
+        exit_rows = [bytes(row).ljust(256, b"\0") for row in self.__exit_rows]
+        states = self.stepping_table.walk(to_state(*self.__positions[:3]), n)
+        middle_key = -1
+        middle = None
+
+        keystream = bytearray()
+        for state in states:
+            p0 = state % ENGLISH_ALPHABET_SIZE
+            if state // ENGLISH_ALPHABET_SIZE != middle_key:
+                middle_key = state // ENGLISH_ALPHABET_SIZE
+                middle = bytes(self.__middle(middle_key)).ljust(256, b"\0")
+
+            keystream += entry_rows[p0].translate(middle).translate(exit_rows[p0])
+
+        if states:
+            self.__positions[:3] = from_state(states[-1])
+        return bytes(keystream)
+
+    def reflector_entries(self, n: int) -> bytes:
+        """Letter each letter reaches the reflector as, at each of the next n keystrokes, i.e., the keystream of the
+        machine up to the reflector, plugboard included. Whatever the reflector wiring, a keystroke encodes x to the
+        letter y such that entries[y] = reflector[entries[x]], e.g., to try many wirings. Rotors will not reset.
+
+        :param n: (int) number of keystrokes
+        :return: (bytes) n * 26 letter indices
+        """
+        entry_rows = [bytes(row) for row in self.__entry_rows]
+        if len(self.__rotor_tables) == 4:
+            fourth = self.__rotor_tables[3][0][self.__positions[3]]
+        else:
+            fourth = range(ENGLISH_ALPHABET_SIZE)
+        states = self.stepping_table.walk(to_state(*self.__positions[:3]), n)
+        middle_key = -1
+        middle = None
+
+        entries = bytearray()
+        for state in states:
+            p0 = state % ENGLISH_ALPHABET_SIZE
+            if state // ENGLISH_ALPHABET_SIZE != middle_key:
+                middle_key = state // ENGLISH_ALPHABET_SIZE
+                p2, p1 = divmod(middle_key, ENGLISH_ALPHABET_SIZE)
+                forward_1, forward_2 = self.__rotor_tables[1][0][p1], self.__rotor_tables[2][0][p2]
+                middle = bytes(fourth[forward_2[forward_1[x]]] for x in range(ENGLISH_ALPHABET_SIZE)).ljust(256, b"\0")
+
+            entries += entry_rows[p0].translate(middle)
+
+        if states:
+            self.__positions[:3] = from_state(states[-1])
+        return bytes(entries)
+
+    def state_substitutions(self) -> bytes:
+        """Substitution the machine applies in every state of the three stepping rotors, whatever their current
+        positions, e.g., to try every starting position at once. A fourth rotor stays where it is.
+        Each state takes 26 bytes, where byte x is the index letter index x is encoded to, states being in the order
+        of stepping_table.to_state.
+
+        :return: (bytes) 17576 * 26 letter indices
+        """
+        entry_rows = [bytes(row) for row in self.__entry_rows]
+        exit_rows = [bytes(row).ljust(256, b"\0") for row in self.__exit_rows]
+        substitutions = bytearray()
+        for middle_key in range(ENGLISH_ALPHABET_SIZE ** 2):
+            middle = bytes(self.__middle(middle_key)).ljust(256, b"\0")
+            for p0 in range(ENGLISH_ALPHABET_SIZE):
+                substitutions += entry_rows[p0].translate(middle).translate(exit_rows[p0])
+        return bytes(substitutions)
+
+    def decode_indices(self, indices: bytes) -> bytes:
+        """Alias to encode_indices
+        :param indices: (bytes) letter indices
+        :return: (bytes) decoded letter indices
+        """
+        return self.encode_indices(indices)
+
+    def encode(self, message: str, reset_rotors: bool = False) -> str:
+        """Encode or decode a string. Rotors will not reset by default
+        :param message: (str) message in a-zA-Z
+        :param reset_rotors: (bool) reset rotors
+        :return: (str) encoded message
+        """
+        encoded_message = from_indices(self.encode_indices(to_indices(message)))
+
+        if reset_rotors:
+            self.reset_rotors()
+
+        return encoded_message
+
+    def decode(self, message: str, reset_rotors: bool = False) -> str:
+        """Alias to encode
+        :param message: (str) message in a-zA-Z
+        :param reset_rotors: (bool) reset rotors
+        :return: (str) decoded message
+        """
+        return self.encode(message, reset_rotors)
+
+    def encode_parallel(
+            self, message: str, processes: Optional[int] = None, chunk_size: Optional[int] = None,
+            pool: Optional[multiprocessing.pool.Pool] = None,
+    ) -> str:
+        """Encode or decode a long string, splitting it into chunks that are encoded by a pool of worker processes.
+        Each worker seeks its rotors to the offset of its chunk, so the result is the same as encode.
+        Messages shorter than MIN_PARALLEL_LENGTH are encoded in the calling process.
+
+        :param message: (str) message in a-zA-Z
+        :param processes: (int) number of worker processes, defaults to the CPU count
+        :param chunk_size: (int) letters per chunk, defaults to an even split across the workers
+        :param pool: (multiprocessing.pool.Pool) pool to encode on, defaults to one shared across calls
+        :return: (str) encoded message
+        """
+        indices = to_indices(message)
+        processes = processes or os.cpu_count() or 1
+        chunk_size = chunk_size or max(MIN_PARALLEL_CHUNK_SIZE, -(-len(indices) // processes))
+
+        if processes == 1 or len(indices) < MIN_PARALLEL_LENGTH or len(indices) <= chunk_size:
+            return from_indices(self.encode_indices(indices))
+
+        machine = (self.setup, self.__reflector_wiring, self.positions)
+        chunks = (
+            (machine, offset, indices[offset:offset + chunk_size]) for offset in range(0, len(indices), chunk_size)
+        )
+        encoded = b"".join((pool or shared_pool(processes)).imap(_encode_chunk, chunks))
+
+        self.advance(len(indices))
+        return from_indices(encoded)
+
+    def __compile_ascii_rows(self):
+        """Entry and exit rows working on ASCII codes instead of letter indices, lowercase letters included
+        :return: (tuple) entry rows, exit rows
+        """
+        ascii_indices = [None] * 256
+        for inx, letter in enumerate(_ALPHABET_BYTES):
+            ascii_indices[letter] = ascii_indices[letter + ord("a") - ord("A")] = inx
+
+        entry_rows = tuple(
+            tuple(None if x is None else row[x] for x in ascii_indices) for row in self.__entry_rows
+        )
+        exit_rows = tuple(tuple(_ALPHABET_BYTES[x] for x in row) for row in self.__exit_rows)
+        return entry_rows, exit_rows
+
+    def __compile_static_core(self):
+        """The reflector and a fourth rotor never rotate, thus they are combined into a single permutation
+        """
+        core = self.__reflector
+        if len(self.__rotor_tables) == 4:
+            forward_rows, inverse_rows = self.__rotor_tables[3]
+            forward, inverse = forward_rows[self.__positions[3]], inverse_rows[self.__positions[3]]
+            core = tuple(inverse[core[forward[x]]] for x in range(ENGLISH_ALPHABET_SIZE))
+        if core != self.__core:
+            self.__core = core
+            self.__middle_cache = {}
+
+    def __middle(self, key: int) -> Tuple[int, ...]:
+        """Combined permutation of the middle and left rotors, the static core and their way back.
+        It only changes when the middle or left rotor rotate, hence it is cached per position pair.
+
+        :param key: (int) middle and left rotor positions, packed as in a stepping state without the right rotor
+        :return: (tuple) permutation
+        """
+        middle = self.__middle_cache.get(key)
+        if middle is None:
+            p2, p1 = divmod(key, ENGLISH_ALPHABET_SIZE)
+            forward_1, inverse_1 = self.__rotor_tables[1][0][p1], self.__rotor_tables[1][1][p1]
+            forward_2, inverse_2 = self.__rotor_tables[2][0][p2], self.__rotor_tables[2][1][p2]
+            core = self.__core
+            middle = tuple(
+                inverse_1[inverse_2[core[forward_2[forward_1[x]]]]] for x in range(ENGLISH_ALPHABET_SIZE)
+            )
+            self.__middle_cache[key] = middle
+        return middle
+
+
+def _restore_compiled_machine(setup: EnigmaSetup, reflector_wiring: str, positions: List[int]) -> CompiledEnigmaMachine:
+    compiled = CompiledEnigmaMachine(setup, reflector_wiring)
+    compiled.positions = positions
+    return compiled
+
+
+def shared_pool(processes: int) -> multiprocessing.pool.Pool:
+    """The pool of worker processes used by encode_parallel when none is given, kept across calls.
+    It is created on first use, and again when another number of processes is asked for.
+
+    :param processes: (int) number of worker processes
+    :return: (multiprocessing.pool.Pool) pool
+    """
+    global _shared_pool
+    if _shared_pool is None or _shared_pool[:2] != (os.getpid(), processes):
+        close_shared_pool()
+        _shared_pool = (os.getpid(), processes, multiprocessing.Pool(processes))
+    return _shared_pool[2]
+
+
+@atexit.register
+def close_shared_pool():
+    """Terminate the shared pool, if any, e.g., once there is nothing left to encode
+    :return:
+    """
+    global _shared_pool
+    if _shared_pool is not None and _shared_pool[0] == os.getpid():
+        _shared_pool[2].terminate()
+    _shared_pool = None
+
+
+_worker_machine: Optional[CompiledEnigmaMachine] = None
+
+
+def _encode_chunk(chunk: Tuple[Tuple[EnigmaSetup, str, List[int]], int, bytes]) -> bytes:
+    """Encode a chunk of letter indices starting offset keystrokes into the message.
+    Each worker process keeps its machine, reconfiguring it only when a chunk comes from another setup.
+
+    :param chunk: (tuple) setup, reflector wiring and positions the message starts at, offset, letter indices
+    :return: (bytes) encoded letter indices
+    """
+    global _worker_machine
+    (setup, reflector_wiring, positions), offset, indices = chunk
+    if _worker_machine is None:
+        _worker_machine = CompiledEnigmaMachine(setup, reflector_wiring)
+    elif _worker_machine.setup != setup or _worker_machine.reflector_wiring != reflector_wiring:
+        _worker_machine.reconfigure(setup, reflector_wiring)
+    _worker_machine.positions = positions
+    _worker_machine.advance(offset)
+    return _worker_machine.encode_indices(indices)
@@ -3,6 +3,8 @@ import os
 
 from enigma_machine.exceptions import InvalidLead
 
+logging.basicConfig(level=os.environ.get("LOG_LEVEL", logging.INFO))
+
 
 class PlugLead:
     """
@@ -17,10 +19,9 @@ class PlugLead:
         * PlugLead("AG") is equivalent to PlugLead("GA")
     """
 
-    def __init__(self, mapping: str) -> None:
-        logging.basicConfig(level=os.environ.get("LOG_LEVEL", logging.INFO))
-        self.__logger = logging.getLogger(PlugLead.__name__)
+    __logger = logging.getLogger("PlugLead")
 
+    def __init__(self, mapping: str) -> None:
         self.__connection = tuple(mapping)
         self.__validate_mapping()
 
@@ -60,4 +60,5 @@ class Plugboard:
             self.add(lead)
 
     def __str__(self):
-        return str(set("{0}".format(" ".join(str(self.__wiring_pairs[i]) for i in self.__wiring_pairs)).split()))
+        # leads are sorted, so the same plugboard always gives the same string
+        return "-".join(sorted(set(str(lead) for lead in self.__wiring_pairs.values())))
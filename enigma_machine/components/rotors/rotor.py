@@ -66,6 +66,14 @@ class Rotor:
     def position(self, value):
         self.__position = value
 
+    @property
+    def ring_setting(self) -> int:
+        return self.__ring_setting
+
+    @property
+    def notch(self):
+        return self.__notch
+
     @property
     def wiring(self):
         return self.__left_pins
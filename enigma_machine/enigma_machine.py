@@ -1,8 +1,10 @@
 import logging
 import os
 import re
+from typing import Optional
 
 from enigma_machine.components import Plugboard
+from enigma_machine.compiled_enigma_machine import CompiledEnigmaMachine
 from enigma_machine.components.rotors import RotorLabel, Rotor, RotorWiring
 from enigma_machine.constants import ENGLISH_ALPHABET_SIZE
 from enigma_machine.enigma_setup import EnigmaSetup
@@ -17,13 +19,18 @@ class EnigmaMachine:
     the most top-secret messages.
 
     Read more: https://en.wikipedia.org/wiki/Enigma_machine
+
+    When compiled is set, encode and decode run on a CompiledEnigmaMachine, which produces the same output
+    from integer permutation tables, while the rotors keep track of the positions.
     """
 
-    def __init__(self, setup: EnigmaSetup):
+    def __init__(self, setup: EnigmaSetup, compiled: bool = False):
         logging.basicConfig(level=os.environ.get("LOG_LEVEL", logging.INFO))
         self.__logger = logging.getLogger(EnigmaMachine.__name__)
 
         self.setup = setup
+        self.compiled = compiled
+        self.__compiled_machine: Optional[CompiledEnigmaMachine] = None
         self.plugboard = Plugboard(self.setup.plugs)
         self.input_ring = RotorWiring.from_label(RotorLabel.ETW)  # connects to the right-most rotor
         self.__set_rotors(zip(setup.rotor_labels, setup.initial_positions, setup.ring_settings))
@@ -99,11 +106,47 @@ class EnigmaMachine:
 
         :param message:
         :param reset_rotors: (bool) reset rotors
-        :return: decoded or encoded string
+        :return: decoded or encoded string, or bytes if the message is bytes-like
+        """
+        if isinstance(message, (bytes, bytearray, memoryview)):
+            encoded_message = bytearray(memoryview(message).nbytes)
+            self.encode_into(message, encoded_message)
+            encoded_message = bytes(encoded_message)
+        elif self.compiled:
+            encoded_message = self.__encode_compiled(message)
+        else:
+            encoded_message = "".join(self.encode_character(c) for c in message)
+
+        if reset_rotors:
+            self.reset_rotors()
+
+        return encoded_message
+
+    def encode_into(self, source, destination=None) -> int:
+        """Encode or decode ASCII letters from bytes, bytearray or memoryview into a preallocated buffer,
+        or in place when no destination is given. Rotors will not reset.
+
+        :param source: (bytes-like) ASCII letters in a-zA-Z
+        :param destination: (bytes-like) writable buffer of at least the same length
+        :return: (int) number of letters encoded
+        """
+        compiled = self.__compiled()
+        encoded = compiled.encode_into(source, destination)
+        self.__move_rotors(compiled.positions)
+        return encoded
+
+    def encode_parallel(self, message: str, processes: int = None, reset_rotors: bool = False):
+        """Encode or decode a long string in chunks, concurrently on a pool of worker processes.
+        Same output as encode.
+
+        :param message: (str) a string to be encoded
+        :param processes: (int) number of worker processes, defaults to the CPU count
+        :param reset_rotors: (bool) reset rotors
+        :return: (str) encoded message
         """
-        encoded_message = ""
-        for c in message:
-            encoded_message += str(self.encode_character(c.upper()))
+        compiled = self.__compiled()
+        encoded_message = compiled.encode_parallel(message, processes)
+        self.__move_rotors(compiled.positions)
 
         if reset_rotors:
             self.reset_rotors()
@@ -125,6 +168,23 @@ class EnigmaMachine:
         for rotor, initial_position in zip(self.rotors[:-1], self.setup.initial_positions):
             rotor.position = self.input_ring.index(initial_position)
 
+    def seek(self, n: int):
+        """Position the rotors where they are after n keystrokes from the initial positions.
+        The positions are computed directly, including the double step, rather than rotating n times.
+
+        :param n: (int) number of keystrokes
+        :return:
+        """
+        compiled = self.__compiled()
+        compiled.seek(n)
+        self.__move_rotors(compiled.positions)
+
+    def compile(self) -> CompiledEnigmaMachine:
+        """Compile the machine as it is, i.e., current rotor positions and reflector wiring
+        :return: (CompiledEnigmaMachine) compiled machine
+        """
+        return CompiledEnigmaMachine.from_machine(self)
+
     def get_reflector(self):
         return self.rotors[-1]  # get the last rotor
 
@@ -149,6 +209,39 @@ class EnigmaMachine:
                 if rotate_left_rotor:
                     self.rotors[2].rotate()
 
+    def __encode_compiled(self, message: str) -> str:
+        """Encode a string on the compiled machine and move the rotors to where it stopped
+        :param message: (str) message
+        :return: (str) encoded message
+        """
+        compiled = self.__compiled()
+        encoded_message = compiled.encode(message)
+        self.__move_rotors(compiled.positions)
+        return encoded_message
+
+    def __compiled(self) -> CompiledEnigmaMachine:
+        """The compiled machine kept for encoding, seeking and the like, set to the current rotor positions.
+        It is compiled once and reconfigured in place only if the setup or the reflector wiring change.
+
+        :return: (CompiledEnigmaMachine) compiled machine
+        """
+        compiled, reflector_wiring = self.__compiled_machine, self.get_reflector().wiring
+        if compiled is None:
+            compiled = self.__compiled_machine = CompiledEnigmaMachine(self.setup, reflector_wiring)
+        elif compiled.setup is not self.setup or compiled.reflector_wiring != reflector_wiring:
+            compiled.reconfigure(self.setup, reflector_wiring)
+        compiled.positions = [rotor.position for rotor in self.rotors[:-1]]
+        return compiled
+
+    def __move_rotors(self, positions):
+        """Move the rotors to the given positions, e.g., where a compiled machine stopped
+        :param positions: (list) rotor positions from right to left
+        :return:
+        """
+        for rotor, position in zip(self.rotors, positions):
+            if rotor.position % ENGLISH_ALPHABET_SIZE != position:
+                rotor.position = position
+
     @staticmethod
     def __validate_character(character) -> None:
         """Make sure the letter is in a-zA-Z.
@@ -1,17 +1,26 @@
+import functools
 import logging
 import os
 from typing import Tuple, Union, List
 
 from enigma_machine.components import Plugboard, PlugLead
-from enigma_machine.components.rotors import Rotor, RotorLabel
+from enigma_machine.components.rotors import RotorLabel
+from enigma_machine.constants import ENGLISH_ALPHABET
 from enigma_machine.exceptions import InvalidEnigmaSetup, PlugAlreadyInUse, TooManyPlugs
 
 logging.basicConfig(level=os.environ.get("LOG_LEVEL", logging.INFO))
 logger = logging.getLogger(__name__)
 
+FROM_STRING_CACHE_SIZE = 8192  # parsed configuration strings kept by EnigmaSetup.from_string
+
 
 class EnigmaSetup:
-    """The rotor, reflector and plugboard setup of the Enigma machine"""
+    """The rotor, reflector and plugboard setup of the Enigma machine
+
+    Setups are compared and hashed by their canonical form, so setups that only differ in the order of the plugs,
+    the order of the letters in a plug or the formatting of ring settings, positions and plugs are equal. Hence, a setup
+    cannot be changed once built: its parts are kept as tuples, and given out as copies.
+    """
 
     def __init__(
             self,
@@ -23,66 +32,59 @@ class EnigmaSetup:
             initial_positions: Union[Tuple[str, str, str], Tuple[str, str, str, str]],
             plugs: List[PlugLead],
     ):
-        self.__rotor_labels = rotor_labels
-        self.__reflector_label = reflector_label
-        self.__ring_settings = ring_settings
-        self.__initial_positions = initial_positions
-        self.__plugs = plugs
+        self.__set(rotor_labels, reflector_label, ring_settings, initial_positions, plugs)
         self.__validate_setup()
 
     @property
-    def rotor_labels(self):
-        return self.__rotor_labels
-
-    @rotor_labels.setter
-    def rotor_labels(self, value):
-        self.__rotor_labels = value
+    def rotor_labels(self) -> List[RotorLabel]:
+        return list(self.__rotor_labels)
 
     @property
-    def reflector_label(self):
+    def reflector_label(self) -> RotorLabel:
         return self.__reflector_label
 
-    @reflector_label.setter
-    def reflector_label(self, value: Rotor):
-        assert value.__label in [RotorLabel.A, RotorLabel.B, RotorLabel.C]
-        self.__reflector_label = value
-
     @property
-    def ring_settings(self):
-        return self.__ring_settings
-
-    @ring_settings.setter
-    def ring_settings(self, value):
-        self.__ring_settings = value
+    def ring_settings(self) -> List[int]:
+        return list(self.__ring_settings)
 
     @property
-    def initial_positions(self):
-        return self.__initial_positions
-
-    @initial_positions.setter
-    def initial_positions(self, value):
-        self.__initial_positions = value
+    def initial_positions(self) -> List[str]:
+        return list(self.__initial_positions)
 
     @property
-    def plugs(self):
-        return self.__plugs
+    def plugs(self) -> List[PlugLead]:
+        return list(self.__plugs)
 
-    @plugs.setter
-    def plugs(self, value):
-        self.__plugs = value
+    def __set(self, rotor_labels, reflector_label, ring_settings, initial_positions, plugs):
+        """Keep the parts of the setup, ring settings as numbers, positions and plugs in uppercase
+        """
+        try:
+            self.__ring_settings = tuple(int(r) for r in ring_settings)
+        except (TypeError, ValueError):
+            raise InvalidEnigmaSetup("Invalid ring settings. They must be numbers")
+        self.__rotor_labels = tuple(rotor_labels)
+        self.__reflector_label = reflector_label
+        self.__initial_positions = tuple(str(p).upper() for p in initial_positions)
+        self.__plugs = tuple(
+            plug if str(plug).isupper() else PlugLead(str(plug).upper()) for plug in plugs
+        )
+        self.__key = None
+        self.__canonical_string = None
 
     def __validate_setup(self):
         """Validates Enigma setup
         """
         try:
-            Plugboard(self.plugs)
-            assert len(self.rotor_labels) == len(self.ring_settings) == len(self.initial_positions)
+            Plugboard(self.__plugs)
+            assert len(self.__rotor_labels) == len(self.__ring_settings) == len(self.__initial_positions)
         except (TooManyPlugs, PlugAlreadyInUse) as ex:
             raise InvalidEnigmaSetup(f"Invalid plugboard configuration. {str(ex)}")
         except AssertionError:
             raise InvalidEnigmaSetup(
                 "The number os rotors, rings settings and initial positions, must be the same"
             )
+        if any(len(p) != 1 or p not in ENGLISH_ALPHABET for p in self.__initial_positions):
+            raise InvalidEnigmaSetup("Invalid initial positions. Each of them must be a letter")
 
     @classmethod
     def from_string(cls, config_string: str):
@@ -95,9 +97,25 @@ class EnigmaSetup:
             * Ring setting right to left: 01, 01, 01, 01
             * Plugboard settings: AB, CD, EF, GH
 
+        Parsed strings are cached, so parsing the same string again only costs a new EnigmaSetup.
+
         :param config_string: (str) an input configuration string
         :return: (EnigmaSetup) instance of the setup class
         """
+        rotor_labels, reflector, ring_settings, initial_positions, plugs = EnigmaSetup.__parse(config_string)
+
+        # the parts were validated when parsed, thus there is no need to validate them again
+        setup = cls.__new__(cls)
+        setup.__set(rotor_labels, reflector, ring_settings, initial_positions, plugs)
+        return setup
+
+    @staticmethod
+    @functools.lru_cache(maxsize=FROM_STRING_CACHE_SIZE)
+    def __parse(config_string: str) -> tuple:
+        """Parse and validate a configuration string, see from_string
+        :param config_string: (str) an input configuration string
+        :return: (tuple) rotor labels, reflector, ring settings, initial positions and plugs
+        """
         try:
             config_parts = config_string.split()
             rotor_labels = []
@@ -135,13 +153,20 @@ class EnigmaSetup:
             if reflector not in RotorLabel.get_reflector_labels():
                 raise InvalidEnigmaSetup("Invalid reflector. It must be A, B or C")
 
-            return cls(
+            setup = EnigmaSetup(
                 rotor_labels=rotor_labels,
                 reflector_label=reflector,
                 ring_settings=parsed_ring_settings,
                 initial_positions=parsed_initial_positions,
                 plugs=plugs
             )
+            return (
+                setup.__rotor_labels,
+                setup.__reflector_label,
+                setup.__ring_settings,
+                setup.__initial_positions,
+                setup.__plugs,
+            )
         except Exception as ex:
             # in case a more specific exception was generated, re-raise it
             if isinstance(ex, InvalidEnigmaSetup):
@@ -151,6 +176,41 @@ class EnigmaSetup:
                 "Unable to setup machine with given string configuration. Please check your entry."
             )
 
+    def to_canonical_string(self) -> str:
+        """EnigmaSetup to its canonical string, with sorted plugs
+        :return: (str) setup like "I-II-III B 01-01-01 A-A-Z AJ-HL-MO"
+        """
+        if self.__canonical_string is None:
+            rotor_labels, reflector_label, ring_settings, initial_positions, plugs = self.__canonical_key()
+            self.__canonical_string = "{0} {1} {2} {3} {4}".format(
+                "-".join(r.name for r in rotor_labels[::-1]),
+                reflector_label.name,
+                "-".join("{:02d}".format(r) for r in ring_settings[::-1]),
+                "-".join(initial_positions[::-1]),
+                "-".join(plugs),
+            ).rstrip()
+        return self.__canonical_string
+
+    def __canonical_key(self) -> tuple:
+        """Parts of the setup, with sorted plugs, worked out once as the setup does not change"""
+        if self.__key is None:
+            self.__key = (
+                self.__rotor_labels,
+                self.__reflector_label,
+                self.__ring_settings,
+                self.__initial_positions,
+                tuple(sorted("".join(sorted(str(lead))) for lead in self.__plugs)),
+            )
+        return self.__key
+
+    def __eq__(self, other):
+        if not isinstance(other, EnigmaSetup):
+            return NotImplemented
+        return self.__canonical_key() == other.__canonical_key()
+
+    def __hash__(self):
+        return hash(self.__canonical_key())
+
     def __str__(self):
         """EnigmaSetup to string
         :return: (str) setup like "I-II-III B 01-01-01 A-A-A"
@@ -0,0 +1,142 @@
+import mmap
+import struct
+from typing import Iterator, Optional, Tuple
+
+from enigma_machine.compiled_enigma_machine import CompiledEnigmaMachine, from_indices, to_indices
+from enigma_machine.constants import ENGLISH_ALPHABET_SIZE
+from enigma_machine.enigma_setup import EnigmaSetup
+from enigma_machine.stepping_table import to_state
+
+MAGIC = b"ENIGMAKS"
+VERSION = 1
+# magic, version, setup length, lead-in keystrokes, cycle keystrokes
+_HEADER = struct.Struct("<8sHHII")
+
+
+def schedule_length(machine: CompiledEnigmaMachine) -> Tuple[int, int]:
+    """Keystrokes a machine goes through before its rotors repeat, from its current positions
+    :param machine: (CompiledEnigmaMachine) the machine
+    :return: (tuple) lead-in keystrokes, only found once, and cycle keystrokes, repeated after the lead-in
+    """
+    table = machine.stepping_table
+    state = to_state(*machine.positions[:3])
+
+    lead_in = 0
+    while not table.is_in_cycle(table.next(state)):
+        state = table.next(state)
+        lead_in += 1
+    return lead_in, table.cycle_length(table.next(state))
+
+
+class KeySchedule:
+    """Per-keystroke substitutions of a setup for a whole stepping cycle, stored in a memory-mapped file.
+
+    File layout (little-endian):
+        * header: magic "ENIGMAKS", version (u16), setup length (u16), lead-in (u32), cycle (u32) keystrokes
+        * the setup string, as in EnigmaSetup.__str__
+        * 26 bytes per keystroke: byte x is the letter index x is encoded to
+
+    The lead-in covers the few positions only found right after the machine is set up, after that the rotors repeat
+    the same cycle, so any offset maps into the file. Encoding reads the substitutions straight from the mapping,
+    which the operating system shares between all the processes that load the same file.
+    """
+
+    def __init__(self, path: str):
+        """Load a key schedule exported with KeySchedule.export
+        :param path: (str) key schedule file
+        """
+        with open(path, "rb") as schedule_file:
+            self.__map = mmap.mmap(schedule_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        header = _HEADER
+        if len(self.__map) < header.size:
+            raise ValueError(f"{path} is not a key schedule file")
+        magic, version, setup_length, self.lead_in, self.cycle = header.unpack_from(self.__map)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a key schedule file (version {VERSION})")
+
+        self.setup = self.__map[header.size:header.size + setup_length].decode("ascii")
+        self.__data_offset = header.size + setup_length
+        if len(self.__map) != self.__data_offset + len(self) * ENGLISH_ALPHABET_SIZE:
+            raise ValueError(f"{path} is truncated")
+
+    def __len__(self) -> int:
+        """Number of keystrokes stored"""
+        return self.lead_in + self.cycle
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        self.__map.close()
+
+    @staticmethod
+    def export(setup: EnigmaSetup, path: str, reflector_wiring: Optional[str] = None) -> int:
+        """Compile the setup and write its key schedule
+        :param setup: (EnigmaSetup) the setup
+        :param path: (str) key schedule file to be created or overwritten
+        :param reflector_wiring: (str) a non-standard reflector wiring, if any
+        :return: (int) number of keystrokes written
+        """
+        machine = CompiledEnigmaMachine(setup, reflector_wiring)
+        lead_in, cycle = schedule_length(machine)
+
+        setup_string = str(setup).encode("ascii")
+        with open(path, "wb") as schedule_file:
+            schedule_file.write(_HEADER.pack(MAGIC, VERSION, len(setup_string), lead_in, cycle))
+            schedule_file.write(setup_string)
+            schedule_file.write(machine.substitutions(lead_in + cycle))
+
+        return lead_in + cycle
+
+    def encode_indices(self, indices: bytes, offset: int = 0) -> bytes:
+        """Encode or decode letter indices starting offset keystrokes after the initial positions
+        :param indices: (bytes) letter indices
+        :param offset: (int) keystrokes already made
+        :return: (bytes) encoded letter indices
+        """
+        schedule = self.__map
+        encoded = bytearray(len(indices))
+        inx = 0
+        for first, count in self.__ranges(offset, len(indices)):
+            start = self.__data_offset + first * ENGLISH_ALPHABET_SIZE
+            stop = start + count * ENGLISH_ALPHABET_SIZE
+            for position in range(start, stop, ENGLISH_ALPHABET_SIZE):
+                encoded[inx] = schedule[position + indices[inx]]
+                inx += 1
+        return bytes(encoded)
+
+    def encode(self, message: str, offset: int = 0) -> str:
+        """Encode or decode a message starting offset keystrokes after the initial positions
+        :param message: (str) message in a-zA-Z
+        :param offset: (int) keystrokes already made
+        :return: (str) encoded message
+        """
+        return from_indices(self.encode_indices(to_indices(message), offset))
+
+    def decode(self, message: str, offset: int = 0) -> str:
+        """Alias to encode
+        """
+        return self.encode(message, offset)
+
+    def __ranges(self, offset: int, n: int) -> Iterator[Tuple[int, int]]:
+        """Contiguous runs of stored keystrokes covering n keystrokes from offset, wrapping around the cycle
+        :param offset: (int) keystrokes already made
+        :param n: (int) number of keystrokes
+        :return: (Iterator[tuple]) first stored keystroke, count
+        """
+        if offset < 0:
+            raise ValueError("Please provide a non-negative offset")
+
+        while n > 0:
+            if offset >= self.lead_in:
+                first = self.lead_in + (offset - self.lead_in) % self.cycle
+            else:
+                first = offset
+            count = min(n, len(self) - first)
+            yield first, count
+            offset += count
+            n -= count
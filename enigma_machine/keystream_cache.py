@@ -0,0 +1,144 @@
+import itertools
+import threading
+from collections import OrderedDict
+from typing import Hashable, Iterable, Optional
+
+from enigma_machine.compiled_enigma_machine import CompiledEnigmaMachine, from_indices, to_indices
+from enigma_machine.constants import ENGLISH_ALPHABET_SIZE
+from enigma_machine.enigma_setup import EnigmaSetup
+from enigma_machine.key_schedule import schedule_length
+
+DEFAULT_MAX_BYTES = 64 << 20  # 64 MiB
+
+
+def setup_key(setup: EnigmaSetup, reflector_wiring: Optional[str] = None) -> Hashable:
+    """Key of a setup, the same for setups that encode the same way, e.g., regardless of the order of the plugs
+    :param setup: (EnigmaSetup) the setup
+    :param reflector_wiring: (str) a non-standard reflector wiring, if any
+    :return: (Hashable) key
+    """
+    return setup.to_canonical_string(), reflector_wiring
+
+
+class Keystream:
+    """Substitutions a setup applies from its initial positions, 26 bytes per keystroke.
+    It grows on demand as longer messages are encoded, carrying on from where the compiled machine stopped, up to
+    the lead-in and a single stepping cycle, as in KeySchedule: keystrokes past them wrap around the cycle.
+
+    Substitutions are kept by letter, i.e., what letter x is encoded to at each keystroke, so encoding a letter of a
+    message is a single lookup, with no stepping, rotors or plugboard to go through.
+    """
+
+    def __init__(self, machine: CompiledEnigmaMachine):
+        self.__machine = machine
+        self.lead_in, self.cycle = schedule_length(machine)
+        self.__columns = [bytearray() for _ in range(ENGLISH_ALPHABET_SIZE)]
+
+    def __len__(self) -> int:
+        """Number of keystrokes available"""
+        return len(self.__columns[0])
+
+    @property
+    def size_in_bytes(self) -> int:
+        return len(self) * ENGLISH_ALPHABET_SIZE
+
+    def extend_to(self, n: int):
+        """Make sure there are substitutions for at least n keystrokes, or for all of them once they wrap around
+        :param n: (int) number of keystrokes
+        """
+        n = min(n, self.lead_in + self.cycle)
+        if n > len(self):
+            substitutions = self.__machine.substitutions(n - len(self))
+            for letter, column in enumerate(self.__columns):
+                column += substitutions[letter::ENGLISH_ALPHABET_SIZE]
+
+    def encode_indices(self, indices: bytes) -> bytes:
+        """Encode or decode letter indices from the initial positions
+        :param indices: (bytes) letter indices
+        :return: (bytes) encoded letter indices
+        """
+        n = len(indices)
+        self.extend_to(n)
+        columns = self.__columns
+        return bytes([columns[letter][keystroke] for keystroke, letter in zip(self.__keystrokes(n), indices)])
+
+    def __keystrokes(self, n: int) -> Iterable[int]:
+        """Keystrokes of the keystream the letters of an n-letter message are encoded at, wrapping around the cycle"""
+        if n <= len(self):
+            return range(n)
+        return itertools.chain(range(len(self)), itertools.cycle(range(self.lead_in, len(self))))
+
+
+class KeystreamCache:
+    """In-process cache of keystreams per setup, for many messages encoded under the same keys.
+
+    Keystreams are evicted, least recently used first, once their total size goes over the byte budget. A keystream
+    larger than the whole budget is used for the message at hand, but not kept.
+    A hot key then costs a lookup per letter, as the setup, the rotors and their stepping are all skipped.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.__size_in_bytes = 0
+        self.__keystreams = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.__keystreams)
+
+    @property
+    def size_in_bytes(self) -> int:
+        return self.__size_in_bytes
+
+    def encode(self, setup: EnigmaSetup, message: str, reflector_wiring: Optional[str] = None) -> str:
+        """Encode or decode a message from the initial positions of the setup
+        :param setup: (EnigmaSetup) the setup
+        :param message: (str) message in a-zA-Z
+        :param reflector_wiring: (str) a non-standard reflector wiring, if any
+        :return: (str) encoded message
+        """
+        indices = to_indices(message)
+        with self.__lock:
+            keystream = self.__get(setup, reflector_wiring)
+            size_before = keystream.size_in_bytes
+            encoded = keystream.encode_indices(indices)
+            self.__size_in_bytes += keystream.size_in_bytes - size_before
+            if keystream.size_in_bytes > self.max_bytes:
+                del self.__keystreams[setup_key(setup, reflector_wiring)]
+                self.__size_in_bytes -= keystream.size_in_bytes
+                self.evictions += 1
+            self.__evict()
+        return from_indices(encoded)
+
+    def decode(self, setup: EnigmaSetup, message: str, reflector_wiring: Optional[str] = None) -> str:
+        """Alias to encode
+        """
+        return self.encode(setup, message, reflector_wiring)
+
+    def clear(self):
+        with self.__lock:
+            self.__keystreams.clear()
+            self.__size_in_bytes = 0
+
+    def __get(self, setup: EnigmaSetup, reflector_wiring: Optional[str]) -> Keystream:
+        key = setup_key(setup, reflector_wiring)
+        keystream = self.__keystreams.get(key)
+        if keystream is None:
+            self.misses += 1
+            keystream = Keystream(CompiledEnigmaMachine(setup, reflector_wiring))
+            self.__keystreams[key] = keystream
+        else:
+            self.hits += 1
+            self.__keystreams.move_to_end(key)
+        return keystream
+
+    def __evict(self):
+        """Drop the least recently used keystreams until the cache is within budget
+        """
+        while self.__size_in_bytes > self.max_bytes and self.__keystreams:
+            _, keystream = self.__keystreams.popitem(last=False)
+            self.__size_in_bytes -= keystream.size_in_bytes
+            self.evictions += 1
@@ -0,0 +1,90 @@
+import contextlib
+import os
+from typing import Iterator, List, Optional, Tuple
+
+from enigma_machine.compiled_enigma_machine import CompiledEnigmaMachine
+from enigma_machine.components.rotors import RotorWiring
+from enigma_machine.enigma_setup import EnigmaSetup
+
+DEFAULT_MAX_IDLE = 8  # idle machines kept per pool
+
+_process_pool: Optional[Tuple[int, "MachinePool"]] = None
+
+
+class MachinePool:
+    """Compiled machines kept for reuse by a search loop trying one candidate setup after another.
+
+    A released machine is reconfigured in place for the next setup instead of being compiled from scratch,
+    preferably one with the same rotors and reflector, whose tables and middle permutations are all still valid.
+    A pool is meant for a single thread, use MachinePool.for_current_process in worker processes.
+
+    Example:
+        * with MachinePool.for_current_process().machine(setup) as machine:
+        *     decoded = machine.decode(code)
+    """
+
+    def __init__(self, max_idle: int = DEFAULT_MAX_IDLE):
+        """
+        :param max_idle: (int) machines kept once released, any further one is left to the garbage collector
+        """
+        self.max_idle = max_idle
+        self.created = 0
+        self.reused = 0
+        self.__idle: List[CompiledEnigmaMachine] = []
+
+    def __len__(self) -> int:
+        """Number of idle machines"""
+        return len(self.__idle)
+
+    @classmethod
+    def for_current_process(cls) -> "MachinePool":
+        """The pool of the calling process, created on first use, so each worker process gets its own
+        :return: (MachinePool) pool
+        """
+        global _process_pool
+        if _process_pool is None or _process_pool[0] != os.getpid():
+            _process_pool = (os.getpid(), cls())
+        return _process_pool[1]
+
+    def acquire(self, setup: EnigmaSetup, reflector_wiring: Optional[str] = None) -> CompiledEnigmaMachine:
+        """Take a machine set up at the initial positions of the setup, reusing an idle one if any
+        :param setup: (EnigmaSetup) the setup
+        :param reflector_wiring: (str) a non-standard reflector wiring, if any
+        :return: (CompiledEnigmaMachine) machine
+        """
+        if not self.__idle:
+            self.created += 1
+            return CompiledEnigmaMachine(setup, reflector_wiring)
+
+        wiring = reflector_wiring or RotorWiring.from_label(setup.reflector_label)
+        inx = len(self.__idle) - 1
+        for candidate_inx, candidate in enumerate(self.__idle):
+            if candidate.setup.rotor_labels == setup.rotor_labels and candidate.reflector_wiring == wiring:
+                inx = candidate_inx
+                break
+
+        machine = self.__idle.pop(inx)
+        machine.reconfigure(setup, reflector_wiring)
+        self.reused += 1
+        return machine
+
+    def release(self, machine: CompiledEnigmaMachine):
+        """Give a machine back to the pool
+        :param machine: (CompiledEnigmaMachine) machine taken with acquire
+        :return:
+        """
+        if len(self.__idle) < self.max_idle:
+            self.__idle.append(machine)
+
+    @contextlib.contextmanager
+    def machine(self, setup: EnigmaSetup, reflector_wiring: Optional[str] = None) -> Iterator[CompiledEnigmaMachine]:
+        """Acquire a machine for the duration of a with block
+        :param setup: (EnigmaSetup) the setup
+        :param reflector_wiring: (str) a non-standard reflector wiring, if any
+        :return: (Iterator[CompiledEnigmaMachine]) machine
+        """
+        machine = self.acquire(setup, reflector_wiring)
+        try:
+            yield machine
+        finally:
+            self.release(machine)
@@ -0,0 +1,16 @@
+import importlib
+import importlib.util
+
+NUMPY_INSTALLED = importlib.util.find_spec("numpy") is not None
+
+
+def require_numpy():
+    """NumPy, only needed for batches, i.e., the BatchEncoder, batched scoring and searches
+    :return: (module) numpy
+    :raises ImportError: if it is not installed, telling how to install it
+    """
+    if not NUMPY_INSTALLED:
+        raise ImportError(
+            "NumPy is needed for batches. Please install it with `pip install -r requirements-optional.txt`"
+        )
+    return importlib.import_module("numpy")
@@ -0,0 +1,153 @@
+import functools
+from array import array
+from typing import Tuple
+
+from enigma_machine.constants import ENGLISH_ALPHABET_SIZE
+
+STATE_COUNT = ENGLISH_ALPHABET_SIZE ** 3  # 17576 positions of the three stepping rotors
+
+
+def to_state(p0: int, p1: int, p2: int) -> int:
+    """Pack the positions of the three stepping rotors, from right to left, into a single state
+    :param p0: (int) right rotor position
+    :param p1: (int) middle rotor position
+    :param p2: (int) left rotor position
+    :return: (int) state in 0-17575
+    """
+    return p0 + ENGLISH_ALPHABET_SIZE * (p1 + ENGLISH_ALPHABET_SIZE * p2)
+
+
+def from_state(state: int) -> Tuple[int, int, int]:
+    """Opposite to to_state
+    :param state: (int) state in 0-17575
+    :return: (tuple) right, middle and left rotor positions
+    """
+    state, p0 = divmod(state, ENGLISH_ALPHABET_SIZE)
+    p2, p1 = divmod(state, ENGLISH_ALPHABET_SIZE)
+    return p0, p1, p2
+
+
+class SteppingTable:
+    """Precomputed stepping of the three right-most rotors for a given pair of notches.
+
+    Only the notches of the right and middle rotors (already shifted by their ring settings) decide how the rotors
+    step, thus every rotor order sharing them shares a table. The table keeps the successor of every state and the
+    cycles the states run through, laid out one after the other in a compact array, so the rotors are moved forward by
+    walking an index instead of simulating each step and the double step anomaly.
+
+    Some states are only reachable when the machine is set up, e.g., the middle rotor sitting on its notch,
+    those are stepped through the successor array until they join their cycle.
+    """
+
+    def __init__(self, notches: Tuple[int, int]):
+        self.notches = tuple(notches)
+        self.__successor = array("H", (self.__step(state) for state in range(STATE_COUNT)))
+        self.__sequence = array("H")
+        self.__cycle_start = array("l", [-1] * STATE_COUNT)  # -1 for states which are not in a cycle
+        self.__cycle_length = array("l", [0] * STATE_COUNT)
+        self.__offset = array("l", [0] * STATE_COUNT)
+        self.__find_cycles()
+
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def for_notches(notches: Tuple[int, int]) -> "SteppingTable":
+        """Shared stepping table for a pair of notches
+        :param notches: (tuple) right and middle rotor notches in 0-25, -1 if a rotor has no notch
+        :return: (SteppingTable) stepping table
+        """
+        return SteppingTable(notches)
+
+    def next(self, state: int) -> int:
+        """State after a single keystroke
+        :param state: (int) current state
+        :return: (int) next state
+        """
+        return self.__successor[state]
+
+    def is_in_cycle(self, state: int) -> bool:
+        return self.__cycle_start[state] >= 0
+
+    def cycle_length(self, state: int) -> int:
+        """Number of keystrokes until the rotors are back in the same positions
+        :param state: (int) state in a cycle
+        :return: (int) cycle length
+        """
+        return self.__cycle_length[state]
+
+    def advance(self, state: int, n: int) -> int:
+        """State after n keystrokes, found in the cycle directly instead of stepping n times
+        :param state: (int) current state
+        :param n: (int) number of keystrokes
+        :return: (int) state
+        """
+        while n > 0 and self.__cycle_start[state] < 0:
+            state = self.__successor[state]
+            n -= 1
+
+        if n > 0:
+            offset = (self.__offset[state] + n) % self.__cycle_length[state]
+            state = self.__sequence[self.__cycle_start[state] + offset]
+
+        return state
+
+    def walk(self, state: int, n: int) -> array:
+        """States the rotors go through in the next n keystrokes, i.e., the state each keystroke is encoded with
+        :param state: (int) current state
+        :param n: (int) number of keystrokes
+        :return: (array) n states
+        """
+        states = array("H")
+        while n > 0 and self.__cycle_start[state] < 0:
+            state = self.__successor[state]
+            states.append(state)
+            n -= 1
+
+        if n > 0:
+            start, length = self.__cycle_start[state], self.__cycle_length[state]
+            offset = self.__offset[state] + 1
+            while n > 0:
+                offset %= length
+                chunk = min(n, length - offset)
+                states.extend(self.__sequence[start + offset:start + offset + chunk])
+                offset += chunk
+                n -= chunk
+
+        return states
+
+    def __step(self, state: int) -> int:
+        """Rotate the rotors from right to left, as in EnigmaMachine
+        :param state: (int) current state
+        :return: (int) next state
+        """
+        p0, p1, p2 = from_state(state)
+        n0, n1 = self.notches
+        if p1 == n1:
+            p1 = (p1 + 1) % ENGLISH_ALPHABET_SIZE
+            p2 = (p2 + 1) % ENGLISH_ALPHABET_SIZE
+        elif p0 == n0:
+            p1 = (p1 + 1) % ENGLISH_ALPHABET_SIZE
+        return to_state((p0 + 1) % ENGLISH_ALPHABET_SIZE, p1, p2)
+
+    def __find_cycles(self):
+        """Follow the successors from every state until a known state is found, recording each new cycle
+        """
+        visited = bytearray(STATE_COUNT)
+        for origin in range(STATE_COUNT):
+            if visited[origin]:
+                continue
+
+            path = {}
+            state = origin
+            while not visited[state]:
+                visited[state] = 1
+                path[state] = len(path)
+                state = self.__successor[state]
+
+            if state in path:
+                cycle = list(path)[path[state]:]
+                start = len(self.__sequence)
+                for offset, cycle_state in enumerate(cycle):
+                    self.__cycle_start[cycle_state] = start
+                    self.__cycle_length[cycle_state] = len(cycle)
+                    self.__offset[cycle_state] = offset
+                self.__sequence.extend(cycle)
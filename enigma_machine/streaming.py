@@ -0,0 +1,66 @@
+import re
+from typing import Iterable, Iterator, TextIO
+
+from enigma_machine.compiled_enigma_machine import CompiledEnigmaMachine, from_indices, to_indices
+
+DEFAULT_CHUNK_SIZE = 1 << 16  # characters read at a time
+_NON_LETTERS = re.compile(r"([^a-zA-Z]+)")
+
+
+def read_chunks(reader: TextIO, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[str]:
+    """Read a text stream in fixed-size chunks
+    :param reader: (TextIO) a text stream, e.g., a file or sys.stdin
+    :param chunk_size: (int) characters per chunk
+    :return: (Iterator[str]) chunks
+    """
+    while True:
+        chunk = reader.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def encode_chunks(
+        machine: CompiledEnigmaMachine, chunks: Iterable[str], skip_non_letters: bool = False,
+) -> Iterator[str]:
+    """Encode or decode a message given in chunks. The machine keeps its rotor positions between chunks,
+    so the result is the same as encoding the whole message at once.
+
+    :param machine: (CompiledEnigmaMachine) the machine, e.g., EnigmaMachine(setup).compile()
+    :param chunks: (Iterable[str]) parts of the message
+    :param skip_non_letters: (bool) pass anything else than letters through, without rotating the rotors,
+        instead of raising ValueError
+    :return: (Iterator[str]) encoded chunks
+    """
+    for chunk in chunks:
+        if not skip_non_letters:
+            yield from_indices(machine.encode_indices(to_indices(chunk)))
+            continue
+
+        # split keeps the separators, so letters and anything else alternate
+        parts = _NON_LETTERS.split(chunk)
+        for inx in range(0, len(parts), 2):
+            parts[inx] = from_indices(machine.encode_indices(to_indices(parts[inx])))
+        yield "".join(parts)
+
+
+def encode_stream(
+        machine: CompiledEnigmaMachine,
+        reader: TextIO,
+        writer: TextIO,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        skip_non_letters: bool = False,
+) -> int:
+    """Encode or decode a text stream into another one, holding a single chunk in memory at a time
+    :param machine: (CompiledEnigmaMachine) the machine, e.g., EnigmaMachine(setup).compile()
+    :param reader: (TextIO) input stream
+    :param writer: (TextIO) output stream
+    :param chunk_size: (int) characters per chunk
+    :param skip_non_letters: (bool) pass anything else than letters through instead of raising ValueError
+    :return: (int) number of characters written
+    """
+    written = 0
+    for encoded_chunk in encode_chunks(machine, read_chunks(reader, chunk_size), skip_non_letters):
+        writer.write(encoded_chunk)
+        written += len(encoded_chunk)
+    return written
@@ -1,12 +1,28 @@
-import itertools
+import atexit
 import logging
-import multiprocessing
 import os
 import time
 import typing
 import unittest
 
-from enigma_machine import EnigmaMachine, EnigmaSetup
+from enigma_machine import EnigmaSetup
+from enigma_machine.code_breaking import CiphertextOnlySolver, CribCheck, Scheduler, SearchCheckpoint
+from enigma_machine.code_breaking import RingEquivalence, SearchSpace, Strategy, search_key, sharded_search
+from enigma_machine.code_breaking.search_space import to_setup
+from enigma_machine.code_breaking.sharding import DEFAULT_SHARD_SIZE
+
+_scheduler: typing.Optional[Scheduler] = None
+
+
+def scheduler() -> Scheduler:
+    """Scheduler shared by all the code breakers, so worker processes are started once, if ever, and stopped on exit.
+    By default, it takes the available CPU count.
+    """
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = Scheduler()
+        atexit.register(_scheduler.close)
+    return _scheduler
 
 
 class EnigmaCodeBreakerBase(unittest.TestCase):
@@ -50,13 +66,13 @@ class EnigmaCodeBreakerBase(unittest.TestCase):
             "------------------------------------------------------------------------\n"
         )
 
-    def generate_variants(self) -> list[tuple]:
+    def generate_variants(self) -> SearchSpace:
         """Generates all possible variants.
         It considers the defined instance variables for rotors, reflectors, ring settings,
-        starting positions and pluboards.
+        starting positions and pluboards, which may be lists or lazy dimensions of a search space.
 
         :raises: AssertionError if a variant is empty.
-        :return: all possible variants
+        :return: all possible variants, generated on demand
         """
         self.assertFalse(0, len(self.possible_rotors))
         self.assertFalse(0, len(self.possible_reflectors))
@@ -64,64 +80,90 @@ class EnigmaCodeBreakerBase(unittest.TestCase):
         self.assertFalse(0, len(self.possible_starting_positions))
         self.assertFalse(0, len(self.possible_plugboards))
 
-        variants = list(
-            itertools.product(
-                self.possible_rotors,
-                self.possible_reflectors,
-                self.possible_ring_settings,
-                self.possible_starting_positions,
-                self.possible_plugboards,
-            )
+        variants = SearchSpace(
+            self.possible_rotors,
+            self.possible_reflectors,
+            self.possible_ring_settings,
+            self.possible_starting_positions,
+            self.possible_plugboards,
         )
         self.logger.info(f"{len(variants)} were generated.")
-        return set(variants)
+        return variants
 
     def check_variants(
-            self, variants: list[tuple], parallel: bool = False,
+            self,
+            variants: SearchSpace,
+            parallel: typing.Optional[bool] = None,
+            max_hits: typing.Optional[int] = None,
+            nodes: typing.Optional[int] = None,
     ) -> list[typing.Optional[tuple[EnigmaSetup, str]]]:
         """Test all provided variants
-        :param variants: enigma_machine machine config variants
-        :param parallel: a flag to control whether the execution will be serial or parallel
+        :param variants: (SearchSpace) enigma_machine machine config variants
+        :param parallel: a flag to force a serial or parallel execution, by default the scheduler picks the fastest
+            of a serial, parallel or batched execution given the number of variants and the length of the code
+        :param max_hits: (int) stop as soon as that many potential setups are found, defaults to checking all
+        :param nodes: (int) split the variants into shards checked by that many node processes, which get them
+            from a coordinator over a local socket, as nodes on other hosts would
         :return: results (Optional[tuple[EnigmaSetup, str]]) from tests
-
-        Args:
-            reflector_wiring_override:
         """
-        results = []
-        if not parallel:
-            self.logger.info("Checking variants sequentially")
-            for v, variant in enumerate(variants, start=1):
-                self.logger.debug(f"Checking variant {v}:{str(variant)}")
-                result = self.check_potential_setup(self.code, self.crib, variant)
-                if result:
-                    self.logger.debug(f"Potential setup found for variant: {str(result)}")
-                    results.append(result)
-
+        strategy = None
+        if parallel is not None:
+            strategy = Strategy.PROCESS_POOL if parallel else Strategy.SERIAL
+
+        # variants only differing by ring settings and starting positions giving the same rotor cores are the same
+        # machine, so only one of each is checked, if that makes fewer variants, as it can with several ring settings
+        equivalence = None
+        if len(variants.dimensions[2]) > 1:
+            equivalence = RingEquivalence(variants)
+        if equivalence is not None and equivalence.collapsed:
+            self.logger.info(f"{len(equivalence.representatives)} variants left once equivalent ones are collapsed")
+            variants = equivalence.representatives
+
+        # In parallel, the search space, code and crib are sent once to each worker, then tasks are just ranges
+        # of variant indices, which workers turn back into variants themselves.
+        # Only the letters under the places a crib can be at are decoded, the whole message is decoded for hits.
+        check = CribCheck(self.code, self.crib, windows=True)
+        checkpoint_dir = os.environ.get("CHECKPOINT_DIR")
+        if nodes:
+            shards = -(-len(variants) // DEFAULT_SHARD_SIZE)
+            hits = list(sharded_search(variants, check, nodes=nodes, max_hits=max_hits))
+            self.logger.info(f"Checked variants on {nodes} nodes, in up to {shards} shards of {DEFAULT_SHARD_SIZE}")
+        else:
+            if not checkpoint_dir:
+                hits = scheduler().search(variants, check, max_hits=max_hits, strategy=strategy)
+            else:
+                # long searches can be stopped at any point and resumed by running the test again
+                checkpoint_path = os.path.join(checkpoint_dir, f"{self.id()}.jsonl")
+                self.logger.info(f"Checkpointing to {checkpoint_path}")
+                with SearchCheckpoint(checkpoint_path, search_key(variants, check)) as checkpoint:
+                    hits = scheduler().search(
+                        variants, check, max_hits=max_hits, strategy=strategy, checkpoint=checkpoint,
+                    )
+            self.logger.info(f"Checked variants: {scheduler().decisions[-1]}")
+
+        if equivalence is None or not equivalence.collapsed:
+            results = [hit.result for hit in hits]
         else:
-            self.logger.info("Checking variants in parallel")
-            results = self.__check_variants_in_parallel(variants)
+            # every variant a hit stands for decodes the same message
+            results = [
+                (to_setup(variant), hit.result[1])
+                for hit in hits for variant in equivalence.expand(variants.unrank(hit.index))
+            ]
 
         return results
 
-    def __check_variants_in_parallel(self, variants: typing.List[typing.Tuple]):
-        """Run the test of potential setups in parallel
-        :param variants:
-        :return:
+    def solve_without_crib(
+            self, variants: SearchSpace, max_plugs: int = 0,
+    ) -> list[typing.Optional[tuple[EnigmaSetup, str]]]:
+        """Rank all provided variants by how English the decoded message looks, leaving the crib aside
+        :param variants: (SearchSpace) enigma_machine machine config variants
+        :param max_plugs: (int) plugs the solver may add up to, none by default as the plugboards are given
+        :return: results (Optional[tuple[EnigmaSetup, str]]) the best setup and its decoded message
         """
-        # Creates a pool of worker processes and offloaded tasks.
-        # By default, it takes the available CPU count.
-        with multiprocessing.Pool() as pool:
-            args = zip(
-                itertools.repeat(self.code),  # fixed and known code
-                itertools.repeat(self.crib),  # fixed and known crib
-                variants,
-            )
-            # pass collection of iterables to the worker test_potential_setup
-            # it blocks until the result is ready.
-            # pool.starmap is used so each potential variant is unpacked as arguments.
-            results = pool.starmap(self.check_potential_setup, args)
-
-        return list(filter(None, results))
+        solver = CiphertextOnlySolver(self.code, scheduler(), max_plugs=max_plugs, progress=self.logger.debug)
+        best = solver.solve(variants)[0]
+        self.logger.info(f"Best setup without crib: {' '.join(best.variant)}, scoring {best.score:.2f}")
+        return [(to_setup(best.variant), best.message)]
 
     def assert_variant_results(self, results: typing.List[typing.Optional[tuple[EnigmaSetup, str]]]):
         """Assert all variant results.
@@ -163,41 +205,3 @@ class EnigmaCodeBreakerBase(unittest.TestCase):
 
         self.assertEqual(self.expected_setup, setup_as_string)
         self.assertEqual(self.expected_decoded_message, potential_decoded_message)
-
-    @staticmethod
-    def lookup_crib(known_crib: str, potential_decoded_message: str, setup: EnigmaSetup):
-        """Verify if one or more cribs are in the potential decoded message
-        :param known_crib: one or more cribs separated by comma
-        :param potential_decoded_message: a decoded message
-        :param setup: an EnigmaMachine setup
-        :return:
-        """
-        if any(crib in potential_decoded_message for crib in known_crib.split(",")):
-            return setup, potential_decoded_message
-        return None
-
-    @staticmethod
-    def check_potential_setup(
-            known_code: str, known_crib: str, variant: typing.Tuple,
-    ) -> typing.Optional[tuple[EnigmaSetup, str]]:
-        """Test a potential setup considering the known code and crib and the variants.
-        Those are taken in following order: rotor_config, reflector, ring_config, starting_positions, plugboard
-
-        :param known_code: (str) encoded message
-        :param known_crib: (str) a clue to help breaking code
-        :param variant: (typing.Tuple) a enigma setup variant
-        :return: (EnigmaSetup) setup, (str) potential_decoded_message
-
-        """
-        rotor_config = variant[0]
-        reflector = variant[1]
-        ring_config = variant[2]
-        starting_positions = variant[3]
-        plugboard = variant[4]
-
-        setup = EnigmaSetup.from_string(
-            f"{rotor_config} {reflector} {ring_config} {starting_positions} {plugboard}".upper()
-        )
-        potential_decoded_message = EnigmaMachine(setup).encode(known_code)
-
-        return EnigmaCodeBreakerBase.lookup_crib(known_crib, potential_decoded_message, setup)
@@ -43,12 +43,22 @@ class EnigmaCodeBreakerTestCase1(EnigmaCodeBreakerBase):
         self.possible_starting_positions = ["M-J-M"]
         self.possible_plugboards = ["KI-XN-FL"]
 
-        # due to the small number of variants for this scenario
-        # initializing multiprocessing is more expensive (takes more time) than running it serially
+        # a single setup is expected, so the search stops as soon as it is found
         self.assert_variant_results(
-            self.check_variants(variants=self.generate_variants(), parallel=False)
+            self.check_variants(variants=self.generate_variants(), max_hits=1)
         )
 
+    def test_break_code_without_crib(self):
+        """Same as test_break_code, but the reflector is the one whose decoded message looks most English
+        """
+        self.logger.info("CODE BREAKER CASE 1 (WITHOUT CRIB)")
+        self.possible_rotors = ["BETA-GAMMA-V"]
+        self.possible_reflectors = [ref.name for ref in RotorLabel.get_reflector_labels()]
+        self.possible_ring_settings = ["04-02-14"]
+        self.possible_starting_positions = ["M-J-M"]
+        self.possible_plugboards = ["KI-XN-FL"]
+
+        self.assert_variant_results(self.solve_without_crib(self.generate_variants()))
 
 if __name__ == '__main__':
     unittest.main()
@@ -2,7 +2,9 @@ import itertools
 import string
 import unittest
 
-from enigma_machine import RotorLabel
+from enigma_machine import RotorLabel, EnigmaSetup, ENGLISH_ALPHABET
+from enigma_machine.code_breaking import Permutations
+from enigma_machine.optional_dependencies import NUMPY_INSTALLED
 from tests.code_breaker.enigma_code_breaker_base import EnigmaCodeBreakerBase
 
 
@@ -44,16 +46,65 @@ class EnigmaCodeBreakerTestCase2(EnigmaCodeBreakerBase):
         self.possible_reflectors = [RotorLabel.B.name]
         self.possible_ring_settings = ["23-02-10"]
 
-        # first generate all possible combinations of starting positions
-        potential_starting_positions = itertools.permutations(string.ascii_uppercase, 3)
-        self.possible_starting_positions = ["-".join(sp) for sp in potential_starting_positions]
+        # all possible combinations of starting positions, generated as they are checked
+        self.possible_starting_positions = Permutations(string.ascii_uppercase, 3)
 
         self.possible_plugboards = ["VH-PT-ZG-BJ-EY-FS"]
 
+        # a single setup is expected, so the search stops as soon as it is found
         self.assert_variant_results(
-            self.check_variants(variants=self.generate_variants(), parallel=True)
+            self.check_variants(variants=self.generate_variants(), max_hits=1)
         )
 
+    def test_break_code_sharded(self):
+        """Same as test_break_code, but the starting positions are split into shards checked by two nodes
+        """
+        self.logger.info("CODE BREAKER CASE 2 (SHARDED)")
+        self.possible_rotors = ["Beta-I-III"]
+        self.possible_reflectors = [RotorLabel.B.name]
+        self.possible_ring_settings = ["23-02-10"]
+        self.possible_starting_positions = Permutations(string.ascii_uppercase, 3)
+        self.possible_plugboards = ["VH-PT-ZG-BJ-EY-FS"]
+
+        self.assert_variant_results(
+            self.check_variants(variants=self.generate_variants(), max_hits=1, nodes=2)
+        )
+
+    def test_break_code_without_crib(self):
+        """Same as test_break_code, but the starting positions are ranked by index of coincidence, and the best ones
+        by trigrams, instead of looking for the crib
+        """
+        self.logger.info("CODE BREAKER CASE 2 (WITHOUT CRIB)")
+        self.possible_rotors = ["Beta-I-III"]
+        self.possible_reflectors = [RotorLabel.B.name]
+        self.possible_ring_settings = ["23-02-10"]
+        self.possible_starting_positions = Permutations(string.ascii_uppercase, 3)
+        self.possible_plugboards = ["VH-PT-ZG-BJ-EY-FS"]
+
+        self.assert_variant_results(self.solve_without_crib(self.generate_variants()))
+
+    @unittest.skipUnless(NUMPY_INSTALLED, "numpy is not installed")
+    def test_break_code_in_batch(self):
+        """Same as test_break_code, but all the starting positions are decoded at once by the BatchEncoder
+        """
+        from enigma_machine.batch_encoder import BatchEncoder
+
+        self.logger.info("CODE BREAKER CASE 2 (BATCH)")
+
+        encoder = BatchEncoder(EnigmaSetup.from_string("BETA-I-III B 23-02-10 A-A-A VH-PT-ZG-BJ-EY-FS"))
+        # positions are given from the right-most rotor to the left-most one
+        starting_positions = [sp[::-1] for sp in itertools.permutations(range(len(ENGLISH_ALPHABET)), 3)]
+
+        decoded_messages = encoder.decode(self.code, positions=starting_positions)
+
+        results = []
+        for candidate in encoder.find(decoded_messages, self.crib):
+            positions = "-".join(ENGLISH_ALPHABET[p] for p in starting_positions[candidate][::-1])
+            setup = EnigmaSetup.from_string(f"BETA-I-III B 23-02-10 {positions} VH-PT-ZG-BJ-EY-FS")
+            results.append((setup, BatchEncoder.to_string(decoded_messages[candidate])))
+
+        self.assert_variant_results(results)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,7 +1,8 @@
-import itertools
+import string
 import unittest
 
 from enigma_machine import RotorLabel, ENGLISH_ALPHABET_SIZE
+from enigma_machine.code_breaking import Permutations, Product
 from tests.code_breaker.enigma_code_breaker_base import EnigmaCodeBreakerBase
 
 
@@ -45,42 +46,62 @@ class EnigmaCodeBreakerTestCase3(EnigmaCodeBreakerBase):
 
         rotors_possibilities = ["Beta", "Gamma", "II", "IV"]
         # permute all rotors
-        rotor_permutations = itertools.permutations(rotors_possibilities, 3)
-        # permute all ring settings
-        ring_settings_permutations = itertools.permutations(range(1, ENGLISH_ALPHABET_SIZE + 1), 3)
+        self.possible_rotors = Permutations(rotors_possibilities, 3)
+        # permute all ring settings, odd ones are filtered out before any permutation is generated
+        ring_settings = ["{:02d}".format(ring) for ring in range(1, ENGLISH_ALPHABET_SIZE + 1)]
 
-        self.possible_rotors = list("-".join(rotor_config) for rotor_config in rotor_permutations)
         self.possible_reflectors = [ref.name for ref in RotorLabel.get_reflector_labels()]
-        self.possible_ring_settings = self.__filter_ring_settings(ring_settings_permutations)
+        self.possible_ring_settings = Permutations(ring_settings, 3, predicate=self.__is_even)
         self.possible_starting_positions = ["E-M-Y"]
         self.possible_plugboards = ["FH-TS-BE-UQ-KD-AL"]
 
+        # a single setup is expected, so the search stops as soon as it is found
         self.assert_variant_results(
-            self.check_variants(variants=self.generate_variants(), parallel=True)
+            self.check_variants(variants=self.generate_variants(), max_hits=1)
         )
 
+    def test_break_code_without_left_position(self):
+        """Same as test_break_code, with the rotors and reflector it found, but the starting position of the left
+        rotor being lost as well. The left rotor never steps another one, so its ring setting and starting position
+        only matter through their difference: each of the 26 differences is checked once, instead of 26 positions
+        times 13 ring settings. A hit then stands for all the setups with the same difference, which decode the
+        same message, i.e., the left ring setting cannot be told apart
+        """
+        self.logger.info("CODE BREAKER CASE 3 (LEFT POSITION UNKNOWN)")
+        ring_settings = ["{:02d}".format(ring) for ring in range(1, ENGLISH_ALPHABET_SIZE + 1)]
+        self.possible_rotors = ["II-GAMMA-IV"]
+        self.possible_reflectors = ["C"]
+        self.possible_ring_settings = Permutations(ring_settings, 3, predicate=self.__is_even)
+        self.possible_starting_positions = Product(string.ascii_uppercase, ["M"], ["Y"])
+        self.possible_plugboards = ["FH-TS-BE-UQ-KD-AL"]
+
+        # every even left ring setting but 08 and 20, which the other rotors use
+        self.expected_qtd_potential_configurations = 11
+        self.assert_variant_results(
+            self.check_variants(variants=self.generate_variants(), max_hits=1)
+        )
+
+    def test_break_code_without_crib(self):
+        """Same as test_break_code, but the setups are ranked by index of coincidence, and the best ones by trigrams,
+        instead of looking for the crib
+        """
+        self.logger.info("CODE BREAKER CASE 3 (WITHOUT CRIB)")
+        ring_settings = ["{:02d}".format(ring) for ring in range(1, ENGLISH_ALPHABET_SIZE + 1)]
+        self.possible_rotors = Permutations(["Beta", "Gamma", "II", "IV"], 3)
+        self.possible_reflectors = [ref.name for ref in RotorLabel.get_reflector_labels()]
+        self.possible_ring_settings = Permutations(ring_settings, 3, predicate=self.__is_even)
+        self.possible_starting_positions = ["E-M-Y"]
+        self.possible_plugboards = ["FH-TS-BE-UQ-KD-AL"]
+
+        self.assert_variant_results(self.solve_without_crib(self.generate_variants()))
+
     @staticmethod
-    def __filter_ring_settings(ring_settings_permutations):
+    def __is_even(ring_setting: str) -> bool:
         """Filter odd ring settings out
-        :param ring_settings_permutations: all possible ring settings
-        :return: all-even ring settings
+        :param ring_setting: a ring setting, e.g. "04"
+        :return: whether the ring setting is even
         """
-        potential_ring_settings = []
-        for permutation in ring_settings_permutations:
-            even_num_count = 0
-
-            for ring in permutation:
-                if ring % 2 == 0:
-                    even_num_count += 1
-
-            # check if all are even
-            if even_num_count == len(permutation):
-                # format and append
-                potential_ring_settings.append(
-                    '-'.join(["{:02d}".format(num) for num in permutation])
-                )
-
-        return potential_ring_settings
+        return int(ring_setting) % 2 == 0
 
 
 if __name__ == '__main__':
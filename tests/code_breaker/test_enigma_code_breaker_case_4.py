@@ -1,8 +1,7 @@
-import itertools
-import string
 import unittest
 
-from enigma_machine import RotorLabel
+from enigma_machine import EnigmaSetup, RotorLabel
+from enigma_machine.code_breaking import PlugboardClimber, PlugboardCompletions
 from tests.code_breaker.enigma_code_breaker_base import EnigmaCodeBreakerBase
 
 
@@ -49,38 +48,47 @@ class EnigmaCodeBreakerTestCase4(EnigmaCodeBreakerBase):
 
         incomplete_plugboard = "WP-RJ-A?-VF-I?-HN-CG-BS"
 
-        self.possible_plugboards = self.__generate_plugboards(incomplete_plugboard)
+        # missing leads are filled in with plugs not used by any other lead
+        self.possible_plugboards = PlugboardCompletions(incomplete_plugboard)
 
-        # due to the small number of variants for this scenario
-        # initializing multiprocessing is more expensive (takes more time) than running it serially
         self.assert_variant_results(
-            self.check_variants(variants=self.generate_variants(), parallel=True)
+            self.check_variants(variants=self.generate_variants())
         )
 
-    @staticmethod
-    def __generate_plugboards(incomplete_plugboard: str):
-        """Generate plugboards based upon permuting ASCII uppercase letters
-        and filtering them to generate valid plugboards
+    def test_break_code_without_crib(self):
+        """Same as test_break_code, but the completion of the plugboard whose decoded message looks most English is
+        the only setup kept, where the crib lets several through
+        """
+        self.logger.info("CODE BREAKER CASE 4 (WITHOUT CRIB)")
+        self.expected_qtd_potential_configurations = 1
+        self.possible_rotors = ["V-III-IV"]
+        self.possible_reflectors = [RotorLabel.A.name]
+        self.possible_ring_settings = ["24-12-10"]
+        self.possible_starting_positions = ["S-W-U"]
+        self.possible_plugboards = PlugboardCompletions("WP-RJ-A?-VF-I?-HN-CG-BS")
 
-        :param incomplete_plugboard: plugboard missing leads
-        :return: list of possible plugboards
+        self.assert_variant_results(self.solve_without_crib(self.generate_variants()))
+
+    def test_break_code_by_climbing(self):
+        """Same as test_break_code_without_crib, but the missing leads are found by hill-climbing from the known
+        plugs instead of trying every completion, so more missing leads would cost about the same
         """
-        plugboards = []
-        for perm in itertools.permutations(string.ascii_uppercase, 2):
-            replacements = 0
-            complemented_plugboard = incomplete_plugboard
-            if perm[0] not in complemented_plugboard:
-                complemented_plugboard = complemented_plugboard.replace("?", perm[0], 1)
-                replacements += 1
-
-            if perm[1] not in complemented_plugboard:
-                complemented_plugboard = complemented_plugboard.replace("?", perm[1], 1)
-                replacements += 1
-
-            if replacements == 2:
-                plugboards.append(complemented_plugboard)
-
-        return plugboards
+        self.logger.info("CODE BREAKER CASE 4 (HILL-CLIMBING)")
+        self.expected_qtd_potential_configurations = 1
+        incomplete_plugboard = "WP-RJ-A?-VF-I?-HN-CG-BS"
+        known_plugs = "-".join(plug for plug in incomplete_plugboard.split("-") if "?" not in plug)
+
+        climber = PlugboardClimber(self.code, EnigmaSetup.from_string(f"V-III-IV A 24-12-10 S-W-U {known_plugs}"))
+        plugs = climber.climb(max_plugs=8)
+        self.logger.info(f"Missing leads found: {'-'.join(plugs)}")
+
+        # each missing lead is the plug found for its letter
+        plugboard = "-".join(
+            next((found for found in plugs if plug[0] in found), plug) if "?" in plug else plug
+            for plug in incomplete_plugboard.split("-")
+        )
+        setup = EnigmaSetup.from_string(f"V-III-IV A 24-12-10 S-W-U {plugboard}")
+        self.assert_variant_results([(setup, climber.message)])
 
 
 if __name__ == '__main__':
@@ -1,8 +1,10 @@
-import itertools
 import unittest
 
-from enigma_machine import RotorLabel, EnigmaSetup, EnigmaMachine, RotorWiring
+from enigma_machine import RotorLabel, EnigmaSetup
+from enigma_machine.code_breaking import ReflectorSearch, reflector_rewirings
+from enigma_machine.compiled_enigma_machine import from_indices
 from enigma_machine.constants import ENGLISH_ALPHABET
+from enigma_machine.optional_dependencies import NUMPY_INSTALLED
 from tests.code_breaker.enigma_code_breaker_base import EnigmaCodeBreakerBase
 
 
@@ -54,37 +56,20 @@ class EnigmaCodeBreakerTestCase5(EnigmaCodeBreakerBase):
         """
         self.logger.info("CODE BREAKER CASE 5")
 
-        rotor_config = "V-II-IV"
-        ring_settings = "06-18-07"
-        starting_positions = "A-J-L"
-        plugboard = "UG-IE-PO-NX-WT"
         results = []
         modified_reflector_wiring = None
         modified_reflector = None
 
         for reflector in RotorLabel.get_reflector_labels():
-            muddled_wiring_permutations = EnigmaCodeBreakerTestCase5.__permutate_reflector_wiring(
-                RotorWiring.from_label(reflector)
-            )
-            for muddled_wiring in muddled_wiring_permutations:
-                setup = EnigmaSetup.from_string(
-                    f"{rotor_config} {reflector.name} {ring_settings} {starting_positions} {plugboard}".upper()
-                )
-                enigma_machine = EnigmaMachine(setup)
-                # override reflector wiring with a hacked one
-                enigma_machine.get_reflector().wiring = muddled_wiring
-                potential_decoded_message = enigma_machine.encode(self.code)
-
-                # search for crib in message
-                result = self.lookup_crib(self.crib, potential_decoded_message, setup)
-                if result:
-                    modified_reflector = reflector
-                    modified_reflector_wiring = muddled_wiring
-                    results.append(result)
-                    break
-            else:
-                continue
-            break
+            setup = EnigmaSetup.from_string(f"V-II-IV {reflector.name} 06-18-07 A-J-L UG-IE-PO-NX-WT")
+            # the rotors and plugboard are worked out once, each crib then rules most of the rewirings out
+            search = ReflectorSearch(self.code, setup, swaps=2)
+            hit = next(search.run(self.crib), None)
+            if hit:
+                modified_reflector = reflector
+                modified_reflector_wiring = hit.wiring
+                results.append((setup, hit.message))
+                break
 
         # assert the expected reflector modification
         self.assertEqual(self.expected_reflector_hiring, modified_reflector_wiring)
@@ -93,94 +78,40 @@ class EnigmaCodeBreakerTestCase5(EnigmaCodeBreakerBase):
         # assert rest of the config
         self.assert_variant_results(results)
 
-    @staticmethod
-    def __swap_pairs(pair, another_pair):
-        """Swaps two wiring pairs and return new combinations
-        Given (A,C), (B,E), returns [(A,B), (C,E), (A,E), (C,B)]
-        :param pair: wiring pair
-        :param another_pair: another wiring pair
-        :return: possible swaps
-        :return:
-        """
-        return [
-            [(pair[0], another_pair[0]), (pair[1], another_pair[1])],
-            [(pair[0], another_pair[1]), (pair[1], another_pair[0])]
-        ]
-
-    @staticmethod
-    def __wiring_to_pairs(reflector_wiring: str):
-        """Covert reflector wiring into pairs, e.g., BADC => (A,B), (C,D)
-        :param reflector_wiring: 
-        :return: list of wiring pairs
-        """
-        unique_pairs = set()
-        # Leads are symmetric, so AI = IA in the reflector, which means 13 pairs
-        # Therefore, need to ensure there are no duplicates
-        exclude = set()
-        for c in reflector_wiring:
-            if not reflector_wiring.index(c) in exclude:
-                unique_pairs.add((c, ENGLISH_ALPHABET[reflector_wiring.index(c)]))
-                exclude.add(ENGLISH_ALPHABET.index(c))
-        return unique_pairs
-
-    @staticmethod
-    def __stringify_wiring_pairs(reflector_pairs):
-        """Opposite to wiring_to_pairs. Convert wiring pairs wiring string
-        :param reflector_pairs:
-        :return:
+    @unittest.skipUnless(NUMPY_INSTALLED, "numpy is not installed")
+    def test_break_code_by_ranking(self):
+        """Same as test_break_code, but the crib being only a guess, every rewired reflector is ranked by the quadgram
+        log-likelihood of its decoded message instead, all the rewirings of a reflector being decoded at once
         """
-        # considering 13 pairs, thus reflector_pairs * 2 = ENGLISH_ALPHABET_SIZE = 26
-        letters = list(ENGLISH_ALPHABET[:len(reflector_pairs) * 2])
-        for pair in reflector_pairs:
-            i, j = letters.index(pair[0]), letters.index(pair[1])
-            letters[i], letters[j] = letters[j], letters[i]
+        import numpy as np
 
-        return "".join(letters)
+        from enigma_machine.batch_encoder import BatchEncoder
+        from enigma_machine.code_breaking.batch_fitness import TopK, english_ngram_table
 
-    @staticmethod
-    def __permutate_reflector_wiring(original_wiring: str, r: int = 2):
-        """Takes the original wiring and a swap factor and returns its permutations.
-        Unlike a regular rotor a reflector has only 13 pairs (so if A is mapped to E, then E is also mapped to A).
-        Each swap affects two pairs, e.g. (A,D), (B,C), thus if A is swapped with B then (A,B), (C,D).
+        self.logger.info("CODE BREAKER CASE 5 (RANKING)")
 
-        If multiple swaps are required, a single wire can only be swapped once. Two swaps, for example,
-        means swapping two wires, which affects four pairs, because a single wire swap affects two pairs.
-
-        Each of these four-pair combinations provides three ways to swap the wires between them (two new ways).
-        Only new methods will be returned., e.g. [(A,B),(C,E)] and [(A,E),(C,B)].
+        best = TopK(1)
+        for reflector in RotorLabel.get_reflector_labels():
+            muddled_wirings = [from_indices(wiring) for wiring in reflector_rewirings(reflector, swaps=2)]
+            setup = EnigmaSetup.from_string(f"V-II-IV {reflector.name} 06-18-07 A-J-L UG-IE-PO-NX-WT")
+            # each candidate is decoded with its own reflector wiring, the rest of the machine is the same
+            encoder = BatchEncoder(setup, reflectors=muddled_wirings)
+            # positions are kept from the right-most rotor to the left-most one, as the encoder expects them
+            positions = [[ENGLISH_ALPHABET.index(p) for p in setup.initial_positions]] * len(muddled_wirings)
+            decoded_messages = encoder.decode(
+                self.code, positions=positions, reflectors=np.arange(len(muddled_wirings)),
+            )
+            best.push(
+                english_ngram_table().score(decoded_messages),
+                [(reflector, wiring, setup, BatchEncoder.to_string(decoded)) for wiring, decoded in zip(
+                    muddled_wirings, decoded_messages,
+                )],
+            )
 
-        :param original_wiring: original wiring of reflector
-        :param r: swap factor, defaults to 2, as stated in the problem
-        :return: wiring pairs permutations
-        """
-        unique_pairs = EnigmaCodeBreakerTestCase5.__wiring_to_pairs(original_wiring)
-        result = []
-        for pair_combination in list(itertools.combinations(unique_pairs, r * 2)):
-            swap_combinations = list(itertools.combinations(pair_combination, 2))
-            for selected_pairs in swap_combinations[:int(len(swap_combinations) / 2)]:
-                # selected pairs are the two pairs chosen from a set of four, and
-                # remaining_two_pairs are the remaining ones.
-                remaining_two_pairs = list(set(pair_combination) - set(selected_pairs))
-                # swap two pairs in two new ways:
-                all_swaps_selected_pairs = EnigmaCodeBreakerTestCase5.__swap_pairs(
-                    selected_pairs[0], selected_pairs[1]
-                )
-                # swap again, but now the remaining pairs:
-                all_swaps_remaining_pairs = EnigmaCodeBreakerTestCase5.__swap_pairs(
-                    remaining_two_pairs[0], remaining_two_pairs[1]
-                )
-
-                # combine swapped wiring pairs
-                for i in range(len(all_swaps_selected_pairs)):
-                    for j in range(len(all_swaps_remaining_pairs)):
-                        chain = itertools.chain(
-                            all_swaps_selected_pairs[i] + all_swaps_remaining_pairs[j],
-                            (unique_pairs - set(pair_combination))
-                        )
-                        result.append(list(chain))
-
-        # return permutation, without duplications
-        return set([EnigmaCodeBreakerTestCase5.__stringify_wiring_pairs(pair_combo) for pair_combo in result])
+        [(_, (modified_reflector, modified_reflector_wiring, setup, decoded_message))] = best.best()
+        self.assertEqual(self.expected_reflector_hiring, modified_reflector_wiring)
+        self.assertEqual(self.modified_reflector, modified_reflector)
+        self.assert_variant_results([(setup, decoded_message)])
 
 
 if __name__ == '__main__':
@@ -0,0 +1,78 @@
+import unittest
+
+from enigma_machine import to_indices
+from enigma_machine.code_breaking import english_ngrams, index_of_coincidence
+from enigma_machine.optional_dependencies import NUMPY_INSTALLED
+
+
+@unittest.skipUnless(NUMPY_INSTALLED, "numpy is not installed")
+class BatchFitnessTestCase(unittest.TestCase):
+    MESSAGES = [
+        "THEWEATHERFORECASTFORTHENORTHSEAISRAIN",
+        "QXAZMVLKPWJUGDYTBORNCEHIFSQXAZMVLKPWJU",
+        "ATTACKATDAWNATTACKATDAWNATTACKATDAWNAT",
+    ]
+
+    def setUp(self):
+        import numpy as np
+
+        self.candidates = np.array([list(to_indices(message)) for message in self.MESSAGES], dtype=np.uint8)
+
+    def test_letter_counts(self):
+        from enigma_machine.code_breaking.batch_fitness import letter_counts
+
+        counts = letter_counts(self.candidates)
+        self.assertEqual((3, 26), counts.shape)
+        for message, row in zip(self.MESSAGES, counts):
+            self.assertEqual([message.count(letter) for letter in "ABCDEFGHIJKLMNOPQRSTUVWXYZ"], list(row))
+
+    def test_index_of_coincidence(self):
+        from enigma_machine.code_breaking import batch_fitness
+
+        expected = [index_of_coincidence(to_indices(message)) for message in self.MESSAGES]
+        self.assertEqual(expected, list(batch_fitness.index_of_coincidence(self.candidates)))
+        self.assertEqual([0.0], list(batch_fitness.index_of_coincidence([[3]])))
+
+    def test_chi_squared(self):
+        from enigma_machine.code_breaking.batch_fitness import chi_squared, english_frequencies
+
+        self.assertAlmostEqual(1.0, english_frequencies().sum())
+        self.assertGreater(english_frequencies()[4], english_frequencies()[25])  # E is more frequent than Z
+        statistics = chi_squared(self.candidates)
+        self.assertLess(statistics[0], statistics[1])
+        # against uniform frequencies, a message made of every letter as often is a perfect fit
+        self.assertEqual([0.0], list(chi_squared([list(range(26)) * 2], [1 / 26] * 26)))
+
+    def test_ngram_table(self):
+        from enigma_machine.code_breaking.batch_fitness import english_ngram_table
+
+        for n in (1, 2, 3, 4):
+            with self.subTest(n=n):
+                scores = english_ngram_table(n).score(self.candidates)
+                expected = [english_ngrams(n).score(to_indices(message)) for message in self.MESSAGES]
+                for score, expected_score in zip(scores, expected):
+                    self.assertAlmostEqual(expected_score, score)
+        self.assertEqual([0.0], list(english_ngram_table().score([[1, 2, 3]])))
+
+    def test_top_k(self):
+        from enigma_machine.code_breaking.batch_fitness import TopK, top_k
+
+        self.assertEqual([(9.0, 3), (5.0, 1)], top_k([1, 5, 2, 9, 5], 2))
+        # the first pushed comes first among equal scores
+        self.assertEqual([(9.0, 3), (5.0, 1), (5.0, 4)], top_k([1, 5, 2, 9, 5], 3))
+        self.assertEqual([(1.0, 0), (2.0, 2)], top_k([1, 5, 2, 9, 5], 2, largest=False))
+        self.assertEqual([], top_k([1, 2], 0))
+
+        # batches keep numbering candidates where the previous one stopped, unless candidates are given
+        best = TopK(3)
+        best.push([4, 1, 7])
+        best.push([6, 8], ["x", "y"])
+        best.push([5, 0])
+        self.assertEqual([(8.0, "y"), (7.0, 2), (6.0, "x")], best.best())
+        self.assertEqual(3, len(best))
+        self.assertEqual(7, best.pushed)
+        self.assertRaises(ValueError, best.push, [1, 2], ["z"])
+
+
+if __name__ == '__main__':
+    unittest.main()
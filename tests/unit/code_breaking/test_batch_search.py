@@ -0,0 +1,49 @@
+import unittest
+
+from enigma_machine import EnigmaMachine, EnigmaSetup, to_indices
+from enigma_machine.code_breaking import CribCheck, Permutations, Product, SearchSpace, search
+from enigma_machine.optional_dependencies import NUMPY_INSTALLED
+
+
+@unittest.skipUnless(NUMPY_INSTALLED, "numpy is not installed")
+class BatchSearchTestCase(unittest.TestCase):
+
+    def test_same_hits_as_search(self):
+        from enigma_machine.code_breaking.batch_search import batch_search
+
+        code = EnigmaMachine(EnigmaSetup.from_string("II-GAMMA-IV C 24-08-20 E-M-Y FH-TS-BE")).encode("THOUSANDSOFTREES")
+        space = SearchSpace(
+            Permutations(["BETA", "GAMMA", "II", "IV"], 3), ["B", "C"], Product(["24"], ["06", "08"], ["20", "22"]),
+            ["E-M-Y", "E-M-Z"], ["FH-TS-BE", "FH-TS"], predicate=lambda variant: variant[3] != "E-M-Z",
+        )
+        for cribs in (["NOTFOUND", "THOUSANDS", "TREE S"], ["NOTFOUND", "T?OUSAN?S"]):
+            with self.subTest(cribs=cribs):
+                check = CribCheck(code, cribs)
+                expected = list(search(space, check))
+                self.assertEqual(1, len(expected))
+                self.assertEqual(expected, sorted(batch_search(space, check, batch_size=5)))
+                self.assertEqual(expected, list(batch_search(space, check, max_hits=1)))
+
+    def test_batch_rank(self):
+        from enigma_machine.code_breaking.batch_fitness import chi_squared, english_ngram_table
+        from enigma_machine.code_breaking.batch_search import batch_rank
+
+        message = "THOUSANDSOFNEWTREESAREPLANTEDEACHYEARBYSQUIRRELSFORGETTINGWHERETHEYPUTTHEIRACORNS"
+        code = EnigmaMachine(EnigmaSetup.from_string("II-GAMMA-IV C 24-08-20 E-M-Y FH-TS-BE")).encode(message)
+        space = SearchSpace(
+            Permutations(["BETA", "GAMMA", "II", "IV"], 3), ["B", "C"], Product(["24"], ["06", "08"], ["20", "22"]),
+            ["E-M-Y", "E-M-Z"], ["FH-TS-BE", "FH-TS"],
+        )
+        expected = ("II-GAMMA-IV", "C", "24-08-20", "E-M-Y", "FH-TS-BE")
+        best = batch_rank(space, code, 3, batch_size=7)
+        self.assertEqual(3, len(best))
+        self.assertEqual(expected, best[0][1])
+        self.assertAlmostEqual(english_ngram_table().score([list(to_indices(message))])[0], best[0][0])
+        self.assertGreaterEqual(best[1][0], best[2][0])
+
+        best = batch_rank(space, code, 1, score=chi_squared, largest=False)
+        self.assertEqual(expected, best[0][1])
+
+
+if __name__ == '__main__':
+    unittest.main()
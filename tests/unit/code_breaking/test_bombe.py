@@ -0,0 +1,64 @@
+import unittest
+
+from enigma_machine import CompiledEnigmaMachine, EnigmaSetup, IncompatibleConfiguration
+from enigma_machine.code_breaking import Bombe, Menu, MenuEdge
+from enigma_machine.code_breaking.search_space import to_setup
+
+
+class BombeTestCase(unittest.TestCase):
+    PLUGBOARD = "AZ-BY-CX-DW-EV-FU-GT-HS-IR-JQ"
+    MESSAGE = "WETTERVORHERSAGEBISKAYAREGENUNDSTURMAUSWESTEN"
+
+    def encode(self, setup: str) -> str:
+        return CompiledEnigmaMachine(EnigmaSetup.from_string(setup)).encode(self.MESSAGE)
+
+    def test_menu(self):
+        menu = Menu("BCDAB", "CDAB", 0)
+        self.assertEqual([MenuEdge("C", "B", 0), MenuEdge("D", "C", 1), MenuEdge("A", "D", 2), MenuEdge("B", "A", 3)],
+                         menu.edges)
+        self.assertEqual(["A", "B", "C", "D"], menu.letters)
+        self.assertEqual(1, menu.components)
+        self.assertEqual(1, menu.loops)
+
+        # wildcards are left out of the menu
+        menu = Menu("XBCDAB", "?DA?", 1)
+        self.assertEqual([MenuEdge("D", "C", 2), MenuEdge("A", "D", 3)], menu.edges)
+        self.assertEqual(0, menu.loops)
+        self.assertEqual("D", menu.centre)
+        self.assertIsNone(Menu("AB", "??", 0).centre)
+
+        self.assertRaises(ValueError, Menu, "ABCD", "ABC", 2)  # does not fit
+        self.assertRaises(ValueError, Menu, "ABCD", "XBX", 0)  # B encoded to itself
+
+    def test_stop_at_actual_setup(self):
+        code = self.encode(f"II-V-III B 04-11-19 K-D-P {self.PLUGBOARD}")
+        menu = Menu(code, "WETTERVORHERSAGEBISKAYA", 0)
+        self.assertEqual(4, menu.loops)
+
+        bombe = Bombe(menu, ring_settings=["04-11-19"])
+        stops = list(bombe.run(["II-V-III"]))
+        self.assertEqual(26 ** 3, bombe.positions_tested)
+        self.assertEqual(["K-D-P"], [stop.starting_positions for stop in stops])
+        # the plugs of the letters reached from the menu, every one of them plugged as in the actual setup
+        plugs = set(stops[0].plugboard.split("-"))
+        self.assertTrue(plugs <= set(self.PLUGBOARD.split("-")))
+        self.assertGreaterEqual(len(plugs), 8)
+
+        setup = to_setup(stops[0].to_variant())
+        self.assertEqual("WETTERVORHERSAGEBISKAYA", CompiledEnigmaMachine(setup).decode(code)[:23])
+
+    def test_equivalent_positions(self):
+        # neither the actual rings nor the ones of the bombe step the middle rotor while the menu is gone through
+        code = self.encode(f"II-V-III B 01-01-03 K-D-Y {self.PLUGBOARD}")
+        bombe = Bombe(Menu(code, "WETTERVORHERS", 0), reflectors=["C", "B"])
+        stops = list(bombe.run(["II-V-III", "I-II-III"], ["K-D-W", "K-D-X", "A-A-A"]))
+        self.assertEqual([("II-V-III", "B", "01-01-01", "K-D-W")], [stop[:4] for stop in stops])
+        self.assertEqual(2 * 2 * 3, bombe.positions_tested)
+
+    def test_four_rotors(self):
+        with self.assertRaises(IncompatibleConfiguration):
+            list(Bombe(Menu("BCDAB", "CDAB", 0)).run(["BETA-I-II-III"]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+import os
+import tempfile
+import threading
+import unittest
+
+from enigma_machine.code_breaking import CribCheck, SearchCheckpoint, SearchHit, SearchPool, SearchSpace, resume_search
+from enigma_machine.code_breaking import search, search_key
+
+
+def _is_multiple_of_seven(variant):
+    return variant if int(variant[2]) % 7 == 0 else None
+
+
+class SearchCheckpointTestCase(unittest.TestCase):
+    SPACE = SearchSpace(["I"], ["B"], ["{:04d}".format(n) for n in range(1000)], ["A"], [""])
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "search.jsonl")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_ranges(self):
+        with SearchCheckpoint(self.path, "key") as checkpoint:
+            self.assertEqual([range(0, 100)], list(checkpoint.remaining(range(100))))
+            checkpoint.record(range(10, 20), [])
+            checkpoint.record(range(30, 40), [SearchHit(35, None)])
+            checkpoint.record(range(20, 25), [])
+            self.assertEqual(
+                [range(0, 10), range(25, 30), range(40, 100)], list(checkpoint.remaining(range(100)))
+            )
+            self.assertEqual([range(25, 30)], list(checkpoint.remaining(range(15, 35))))
+            self.assertEqual(25, checkpoint.done)
+
+        with SearchCheckpoint(self.path, "key") as checkpoint:
+            self.assertEqual([35], checkpoint.hits)
+            self.assertEqual(25, checkpoint.done)
+            checkpoint.record(range(0, 100), [])
+            self.assertEqual([], list(checkpoint.remaining(range(100))))
+
+    def test_other_search_starts_over(self):
+        with SearchCheckpoint(self.path, "key") as checkpoint:
+            checkpoint.record(range(0, 10), [SearchHit(5, None)])
+        with SearchCheckpoint(self.path, "another key") as checkpoint:
+            self.assertEqual([], checkpoint.hits)
+            self.assertEqual([range(0, 100)], list(checkpoint.remaining(range(100))))
+
+    def test_record_cut_short(self):
+        with SearchCheckpoint(self.path, "key") as checkpoint:
+            checkpoint.record(range(0, 10), [])
+        with open(self.path, "a") as checkpoint_file:
+            checkpoint_file.write('{"done": [10, 2')
+
+        with SearchCheckpoint(self.path, "key") as checkpoint:
+            self.assertEqual([range(10, 100)], list(checkpoint.remaining(range(100))))
+            checkpoint.record(range(10, 20), [])
+        with SearchCheckpoint(self.path, "key") as checkpoint:
+            self.assertEqual([range(20, 100)], list(checkpoint.remaining(range(100))))
+
+    def test_search_key(self):
+        self.assertEqual(search_key(self.SPACE, _is_multiple_of_seven), search_key(self.SPACE, _is_multiple_of_seven))
+        len(self.SPACE)
+        self.assertEqual(search_key(self.SPACE, _is_multiple_of_seven), search_key(self.SPACE, _is_multiple_of_seven))
+        self.assertNotEqual(search_key(self.SPACE, _is_multiple_of_seven), search_key(self.SPACE, print))
+
+    def test_search_key_of_lambdas(self):
+        def space(divisor):
+            return SearchSpace(["I"], ["B"], ["{:04d}".format(n) for n in range(100)], ["A"], [""],
+                               predicate=lambda variant: int(variant[2]) % divisor == 0)
+
+        self.assertEqual(search_key(space(7), _is_multiple_of_seven), search_key(space(7), _is_multiple_of_seven))
+        self.assertNotEqual(search_key(space(7), _is_multiple_of_seven), search_key(space(5), _is_multiple_of_seven))
+        self.assertNotEqual(
+            search_key(space(7), lambda variant: variant), search_key(space(7), lambda variant: None),
+        )
+
+    def test_search_key_of_closures_over_objects(self):
+        def check_for(crib_check):
+            return lambda variant: crib_check(variant)
+
+        # captured objects are told apart by their state, not by their address, which changes from run to run
+        self.assertEqual(
+            search_key(self.SPACE, check_for(CribCheck("DMEXBMKYCV", "SECRETS"))),
+            search_key(self.SPACE, check_for(CribCheck("DMEXBMKYCV", "SECRETS"))),
+        )
+        self.assertNotEqual(
+            search_key(self.SPACE, check_for(CribCheck("DMEXBMKYCV", "SECRETS"))),
+            search_key(self.SPACE, check_for(CribCheck("DMEXBMKYCV", "SECRET"))),
+        )
+        with self.assertRaisesRegex(TypeError, "cannot be pickled"):
+            search_key(self.SPACE, check_for(threading.Lock()))
+
+    def test_resume_search(self):
+        expected = list(search(self.SPACE, _is_multiple_of_seven))
+        with SearchCheckpoint(self.path, "key") as checkpoint:
+            self.assertEqual(expected[:3], list(resume_search(self.SPACE, _is_multiple_of_seven, checkpoint, 3)))
+            self.assertEqual(expected[2].index + 1, checkpoint.done)
+
+        # a search killed halfway through is resumed from where it stopped
+        with SearchCheckpoint(self.path, "key") as checkpoint:
+            hits = resume_search(self.SPACE, _is_multiple_of_seven, checkpoint, chunk_size=100)
+            self.assertEqual(expected[:10], [next(hits) for _ in range(10)])
+            done = checkpoint.done
+        with SearchCheckpoint(self.path, "key") as checkpoint:
+            self.assertEqual(done, checkpoint.done)
+            self.assertEqual(expected, sorted(resume_search(self.SPACE, _is_multiple_of_seven, checkpoint)))
+            self.assertEqual(len(self.SPACE), checkpoint.done)
+
+    def test_resume_search_on_pool(self):
+        expected = list(search(self.SPACE, _is_multiple_of_seven))
+        with SearchCheckpoint(self.path, "key") as checkpoint:
+            checkpoint.record(range(0, 500), [SearchHit(hit.index, None) for hit in expected if hit.index < 500])
+        with SearchPool(processes=2) as pool, SearchCheckpoint(self.path, "key") as checkpoint:
+            hits = list(resume_search(self.SPACE, _is_multiple_of_seven, checkpoint, pool=pool))
+            self.assertEqual(expected, sorted(hits))
+            self.assertEqual(len(self.SPACE), checkpoint.done)
+            self.assertEqual(500, pool.checked)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import string
+import unittest
+
+from enigma_machine import CompiledEnigmaMachine, EnigmaSetup
+from enigma_machine.code_breaking import CiphertextOnlySolver, IocCheck, Product, SearchSpace
+
+
+class CiphertextOnlySolverTestCase(unittest.TestCase):
+    MESSAGE = (
+        "THEWEATHERFORECASTFORTHENORTHSEAISRAINANDSTRONGWINDSFROMTHEWESTTHECONVOYWILLLEAVETHEHARBOURATDAWN"
+        "ANDREACHTHECOASTBYNIGHTALLSHIPSARETOKEEPRADIOSILENCEUNTILTHEYARRIVE"
+    )
+    ALL_POSITIONS = Product(string.ascii_uppercase, string.ascii_uppercase, string.ascii_uppercase)
+
+    def encode(self, setup: str) -> str:
+        return CompiledEnigmaMachine(EnigmaSetup.from_string(setup)).encode(self.MESSAGE)
+
+    def test_ioc_check(self):
+        code = self.encode("II-V-III B 04-11-19 K-D-P")
+        check = IocCheck(code)
+        self.assertGreater(check(("II-V-III", "B", "04-11-19", "K-D-P", "")), 0.06)
+        self.assertLess(check(("II-V-III", "B", "04-11-19", "A-A-A", "")), 0.05)
+
+    def test_ring_settings(self):
+        code = self.encode("II-V-III B 04-11-19 K-D-P")
+        rings = Product(*[["{:02d}".format(ring) for ring in range(1, 27)]] * 3)
+        solver = CiphertextOnlySolver(code, keep=4, max_plugs=0)
+        best = solver.solve(SearchSpace(["II-V-III"], ["B"], rings, self.ALL_POSITIONS, [""]))[0]
+
+        self.assertEqual(self.MESSAGE, best.message)
+        # the left ring never matters, nor does the middle one as long as the left rotor does not step
+        rotors, _, ring_settings, _, _ = best.variant
+        self.assertEqual("II-V-III", rotors)
+        self.assertEqual("19", ring_settings.split("-")[-1])
+
+    def test_plugboard(self):
+        code = self.encode("II-V-III B 04-11-19 K-D-P AZ-BY-CX-DW-EV")
+        solver = CiphertextOnlySolver(code, max_plugs=5)
+        best = solver.solve(SearchSpace(["II-V-III"], ["B"], ["04-11-19"], ["K-D-P"], [""]))[0]
+
+        self.assertEqual(self.MESSAGE, best.message)
+        self.assertEqual({"AZ", "BY", "CX", "DW", "EV"}, set(best.variant[4].split("-")))
+
+        # known plugs are kept
+        best = solver.solve(SearchSpace(["II-V-III"], ["B"], ["04-11-19"], ["K-D-P"], ["AZ-BY"]))[0]
+        self.assertEqual(self.MESSAGE, best.message)
+        self.assertEqual(["AZ", "BY"], best.variant[4].split("-")[:2])
+
+    def test_progress_and_budget(self):
+        code = self.encode("II-V-III B 04-11-19 K-D-P")
+        reports = []
+        solver = CiphertextOnlySolver(code, keep=2, max_plugs=0, max_seconds=0, progress=reports.append)
+        candidates = solver.solve(SearchSpace(["II-V-III"], ["B"], ["04-11-19"], self.ALL_POSITIONS, [""]))
+
+        self.assertEqual(2, len(candidates))
+        self.assertGreaterEqual(candidates[0].score, candidates[1].score)
+        key_search = [report for report in reports if report.stage == "key search"]
+        # stopped at the first report, out of time
+        self.assertEqual(1, len(key_search))
+        self.assertLess(key_search[0].done, key_search[0].total)
+        self.assertEqual(26 ** 3, key_search[0].total)
+        self.assertIsNotNone(key_search[0].best)
+        self.assertEqual(["plugboard", "plugboard"], [report.stage for report in reports[1:]])
+        self.assertIn("key search: ", str(key_search[0]))
+
+
+if __name__ == '__main__':
+    unittest.main()
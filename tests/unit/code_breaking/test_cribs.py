@@ -0,0 +1,82 @@
+import unittest
+
+from enigma_machine import CompiledEnigmaMachine, EnigmaSetup
+from enigma_machine.code_breaking import CribCheck, CribMatcher, CribPlacement, Permutations, SearchSpace, search
+from enigma_machine.code_breaking import crib_placements, parse_cribs
+
+
+class CribsTestCase(unittest.TestCase):
+    SETUP = "II-IV-V B 03-07-11 A-B-C FH-TS-BE"
+    MESSAGE = "WEATHERREPORTFORTHENORTHSEASECRETSTOBEKEPTUNTILDAWNTHENSTORMSFROMTHEWEST" * 4
+
+    def setUp(self) -> None:
+        self.code = CompiledEnigmaMachine(EnigmaSetup.from_string(self.SETUP)).encode(self.MESSAGE)
+
+    def test_crib_placements(self):
+        self.assertEqual(
+            [
+                CribPlacement("B", 0), CribPlacement("CA", 0), CribPlacement("CA", 1),
+                CribPlacement("B", 2), CribPlacement("B", 3),
+            ],
+            crib_placements("ABCA", ["CA", "b", "A B"]),
+        )
+
+        placements = crib_placements(self.code, ["SECRETS", "DAWN"])
+        self.assertIn(CribPlacement("SECRETS", self.MESSAGE.index("SECRETS")), placements)
+        self.assertIn(CribPlacement("DAWN", self.MESSAGE.index("DAWN")), placements)
+        for crib, offset in placements:
+            self.assertTrue(all(c != p for c, p in zip(self.code[offset:], crib)))
+
+    def test_parse_cribs(self):
+        self.assertEqual(("INSTAGRAM", "FLICKR", "TREE S"), parse_cribs("Instagram, FLICKR,,  TREE S "))
+        self.assertEqual(("TUMBLR",), parse_cribs([" tumblr", ""]))
+        self.assertEqual(("FLICKR", "TUMBLR"), parse_cribs("flickr, TUMBLR, Flickr, tumblr"))
+
+    def test_crib_matcher(self):
+        matcher = CribMatcher("INSTAGRAM, FLICKR, PINTEREST, TUMBLR, TREE S")
+        self.assertEqual(("INSTAGRAM", "FLICKR", "PINTEREST", "TUMBLR"), matcher.cribs)
+        self.assertEqual(CribPlacement("INSTAGRAM", 19), matcher.find("YOUCANFOLLOWMYDOGONINSTAGRAMATTALES"))
+        self.assertEqual(
+            [CribPlacement("FLICKR", 2), CribPlacement("TUMBLR", 8), CribPlacement("PINTEREST", 14)],
+            list(matcher.find_all("ONFLICKRTUMBLRPINTERESTANDTREES")),
+        )
+        self.assertIsNone(matcher.find("NOSOCIALMEDIAHERE"))
+        # cribs which are suffixes or overlap one another are all found
+        self.assertEqual(
+            [CribPlacement("HIS", 1), CribPlacement("IS", 2), CribPlacement("SHE", 3), CribPlacement("HE", 4)],
+            list(CribMatcher(["HE", "SHE", "HIS", "IS"]).find_all("THISHE")),
+        )
+        # a few cribs are looked for one by one, many of them by the automaton, the first found is the same
+        for cribs in (["HE", "SHE", "HIS", "IS"], ["HE", "SHE", "HIS", "IS"] * 10):
+            self.assertEqual(CribPlacement("HIS", 1), CribMatcher(cribs).find("THISHE"))
+        # anything else than a letter breaks a crib
+        self.assertEqual([CribPlacement("TUMBLR", 7)], list(matcher.find_all("tum blrTumblr")))
+
+    def test_crib_matcher_wildcards(self):
+        matcher = CribMatcher(["TUMBL?", "?LICK?", "A?B?A"])
+        self.assertEqual(
+            [CribPlacement("TUMBL?", 0), CribPlacement("?LICK?", 7)], list(matcher.find_all("TUMBLESFLICKR")),
+        )
+        self.assertEqual([CribPlacement("A?B?A", 0), CribPlacement("A?B?A", 4)], list(matcher.find_all("AXBYAZBWA")))
+        # a wildcard stands for a letter which has to be there
+        self.assertEqual([], list(matcher.find_all("LICKR")))
+        self.assertEqual([], list(matcher.find_all("TUMBL")))
+        self.assertEqual([CribPlacement("???", 0)], list(CribMatcher("???").find_all("LICKR")))
+        self.assertEqual([], list(CribMatcher("???").find_all("LI")))
+
+    def test_windows_same_hits_as_whole_message(self):
+        space = SearchSpace(["II-IV-V"], ["B"], ["03-07-11"], Permutations("ABCD", 3), ["FH-TS-BE", "FH-TS"])
+        for cribs in ("SECRETS", "DAWN,NOTFOUND", "STORMS, DAWN", "S?CR?TS", "D", "????"):
+            with self.subTest(cribs=cribs):
+                check = CribCheck(self.code, cribs, windows=True)
+                self.assertEqual(list(search(space, CribCheck(self.code, cribs))), list(search(space, check)))
+
+        check = CribCheck(self.code, "SECRETS", windows=True)
+        self.assertLess(check.decoded_letters, len(self.code) // 5)
+        hits = list(search(space, check))
+        self.assertEqual(1, len(hits))
+        self.assertEqual((EnigmaSetup.from_string(self.SETUP), self.MESSAGE), hits[0].result)
+
+
+if __name__ == '__main__':
+    unittest.main()
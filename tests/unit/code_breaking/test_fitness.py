@@ -0,0 +1,51 @@
+import os
+import tempfile
+import unittest
+
+from enigma_machine import to_indices
+from enigma_machine.code_breaking import NgramScorer, english_ngrams, index_of_coincidence
+
+
+class FitnessTestCase(unittest.TestCase):
+    ENGLISH = "THEWEATHERFORECASTFORTHENORTHSEAISRAINANDSTRONGWINDSFROMTHEWEST"
+    RANDOM = "QXAZMVLKPWJUGDYTBORNCEHIFSQXAZMVLKPWJUGDYTBORNCEHIFSQXAZMVLKPW"
+
+    def test_index_of_coincidence(self):
+        self.assertEqual(1.0, index_of_coincidence(to_indices("AAAA")))
+        self.assertEqual(0.0, index_of_coincidence(to_indices("ABCD")))
+        self.assertEqual(0.0, index_of_coincidence(b""))
+        self.assertGreater(index_of_coincidence(to_indices(self.ENGLISH)), 0.06)
+        self.assertLess(index_of_coincidence(to_indices(self.RANDOM)), 0.045)
+
+    def test_english_ngrams(self):
+        for n in (1, 2, 3, 4):
+            with self.subTest(n=n):
+                scorer = english_ngrams(n)
+                self.assertEqual(n, scorer.n)
+                self.assertEqual(26 ** n, len(scorer.log_probabilities))
+                self.assertGreater(scorer.score(to_indices(self.ENGLISH)), scorer.score(to_indices(self.RANDOM)))
+        self.assertIs(english_ngrams(3), english_ngrams(3))
+        self.assertRaises(ValueError, english_ngrams, 5)
+
+    def test_ngram_scorer(self):
+        scorer = NgramScorer({"AB": 3, "BA": 1})
+        self.assertAlmostEqual(-0.1249, scorer.score(to_indices("AB")), places=4)
+        self.assertAlmostEqual(-0.1249 - 0.6021, scorer.score(to_indices("ABA")), places=4)
+        self.assertEqual(scorer.floor, scorer.score(to_indices("ZZ")))
+        self.assertEqual(0.0, scorer.score(to_indices("A")))
+
+        # longer n-grams are looked up the same way
+        scorer = NgramScorer({"ABCD": 1})
+        self.assertEqual(0.0, scorer.score(to_indices("ABCD")))
+        self.assertEqual(2 * scorer.floor, scorer.score(to_indices("ABCDA")) + scorer.floor)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "bigrams.txt")
+            with open(path, "w") as counts_file:
+                counts_file.write("# comment\nab 3\n\nBA 1\n")
+            self.assertEqual(NgramScorer({"AB": 3, "BA": 1}).log_probabilities,
+                             NgramScorer.from_file(path).log_probabilities)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+
+from enigma_machine import CompiledEnigmaMachine, EnigmaSetup
+from enigma_machine.code_breaking import PlugboardClimber, english_ngrams
+from enigma_machine.compiled_enigma_machine import to_indices
+
+
+class PlugboardClimberTestCase(unittest.TestCase):
+    MESSAGE = (
+        "THEWEATHERFORECASTFORTHENORTHSEAISRAINANDSTRONGWINDSFROMTHEWESTTHECONVOYWILLLEAVETHEHARBOURATDAWN"
+        "ANDREACHTHECOASTBYNIGHTALLSHIPSARETOKEEPRADIOSILENCEUNTILTHEYARRIVE"
+    )
+    SETUP = "II-V-III B 04-11-19 K-D-P"
+
+    def setUp(self):
+        self.code = CompiledEnigmaMachine(EnigmaSetup.from_string(f"{self.SETUP} AZ-BY-CX-DW-EV")).encode(self.MESSAGE)
+
+    def test_changes_are_scored_incrementally(self):
+        trigrams = english_ngrams(3)
+        climber = PlugboardClimber(self.code, EnigmaSetup.from_string(f"{self.SETUP} AZ"), trigrams)
+        for one, two in ["BY", "CX", "BC", "QR", "DE", "ED", "YX"]:
+            delta, score = climber.delta(one, two), climber.score
+            climber.change(one, two)
+            decoded = CompiledEnigmaMachine(
+                EnigmaSetup.from_string(f"{self.SETUP} {climber.plugboard}")
+            ).decode(self.code)
+
+            self.assertEqual(decoded, climber.message)
+            self.assertAlmostEqual(trigrams.score(to_indices(decoded)), climber.score)
+            self.assertAlmostEqual(score + delta, climber.score)
+        # plugging two letters moves them out of their plugs, plugging them again unplugs them
+        self.assertEqual("AZ-BC-QR-XY", climber.plugboard)
+
+    def test_fixed_plugs(self):
+        climber = PlugboardClimber(self.code, EnigmaSetup.from_string(f"{self.SETUP} AZ-BY"))
+        self.assertEqual(["AZ", "BY"], climber.fixed)
+        self.assertEqual([], climber.plugs)
+        with self.assertRaises(ValueError):
+            climber.change("A", "C")
+        with self.assertRaises(ValueError):
+            climber.change("C", "C")
+
+    def test_climb(self):
+        climber = PlugboardClimber(self.code, EnigmaSetup.from_string(self.SETUP), english_ngrams(2))
+        climber.climb(5)
+        climber.rescore(english_ngrams(3))
+        plugs = climber.climb(5)
+
+        self.assertEqual(self.MESSAGE, climber.message)
+        self.assertEqual(["AZ", "BY", "CX", "DW", "EV"], plugs)
+
+    def test_climb_max_plugs_and_stop(self):
+        climber = PlugboardClimber(self.code, EnigmaSetup.from_string(f"{self.SETUP} AZ"))
+        self.assertLessEqual(len(climber.climb(3)), 2)
+
+        climber = PlugboardClimber(self.code, EnigmaSetup.from_string(self.SETUP))
+        self.assertEqual(1, len(climber.climb(5, stop=lambda: True)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import itertools
+import unittest
+
+from enigma_machine import CompiledEnigmaMachine, EnigmaSetup, RotorLabel, RotorWiring
+from enigma_machine.code_breaking import CribPlacement, ReflectorSearch, reflector_rewirings
+from enigma_machine.compiled_enigma_machine import from_indices, to_indices
+
+
+class ReflectorSearchTestCase(unittest.TestCase):
+    MESSAGE = "THEWEATHERFORECASTFORTHENORTHSEAISRAINANDSTRONGWINDSFROMTHEWEST"
+    SETUP = "V-II-IV B 06-18-07 A-J-L UG-IE-PO-NX-WT"
+
+    def test_rewirings(self):
+        original = to_indices(RotorWiring.from_label(RotorLabel.B))
+        # wires to swap, two by two, times the two ways of swapping them
+        for swaps, expected in [(0, 1), (1, 78 * 2), (2, 715 * 3 * 4), (3, 1716 * 15 * 8)]:
+            with self.subTest(swaps=swaps):
+                rewirings = list(reflector_rewirings(RotorLabel.B, swaps))
+                self.assertEqual(expected, len(rewirings))
+                self.assertEqual(expected, len(set(rewirings)))
+                for wiring in rewirings[:1000]:
+                    self.assertTrue(all(wiring[wiring[x]] == x != wiring[x] for x in range(26)))
+                    self.assertEqual(swaps * 4, sum(wiring[x] != original[x] for x in range(26)))
+
+        self.assertEqual([], list(reflector_rewirings(RotorLabel.B, 7)))
+        with self.assertRaises(ValueError):
+            next(reflector_rewirings("ABCDEFGHIJKLMNOPQRSTUVWXYZ", 1))
+
+    def test_required_letters(self):
+        # A and B are connected once their wires are swapped
+        rewirings = list(reflector_rewirings(RotorLabel.B, 2, {0: 1, 1: 0}))
+        self.assertTrue(rewirings)
+        self.assertTrue(all(wiring[0] == 1 for wiring in rewirings))
+        self.assertEqual(
+            sorted(rewirings), sorted(w for w in reflector_rewirings(RotorLabel.B, 2) if w[0] == 1),
+        )
+
+    def test_run(self):
+        original = RotorWiring.from_label(RotorLabel.B)
+        for swaps in (2, 3, 4):
+            with self.subTest(swaps=swaps):
+                wiring = from_indices(next(itertools.islice(reflector_rewirings(RotorLabel.B, swaps), 1234, None)))
+                setup = EnigmaSetup.from_string(self.SETUP)
+                code = CompiledEnigmaMachine(setup, wiring).encode(self.MESSAGE)
+                self.assertNotEqual(original, wiring)
+
+                search = ReflectorSearch(code, setup, swaps)
+                hits = list(search.run("WEATHERFORECAST"))
+                self.assertIn(wiring, [hit.wiring for hit in hits])
+                for hit in hits:
+                    self.assertEqual("B", hit.reflector)
+                    self.assertEqual(CribPlacement("WEATHERFORECAST", 3), hit.placement)
+                    self.assertEqual(CompiledEnigmaMachine(setup, hit.wiring).decode(code), hit.message)
+                    self.assertEqual("WEATHERFORECAST", hit.message[3:18])
+
+    def test_required_wires(self):
+        setup = EnigmaSetup.from_string(self.SETUP)
+        code = CompiledEnigmaMachine(setup).encode(self.MESSAGE)
+        search = ReflectorSearch(code, setup, swaps=0)
+
+        required = search.required_wires(CribPlacement("TH?WEATHER", 0))
+        wiring = to_indices(RotorWiring.from_label(RotorLabel.B))
+        self.assertTrue(all(wiring[one] == two for one, two in required.items()))
+        self.assertEqual(self.MESSAGE, search.decode(wiring))
+        self.assertEqual([wiring], list(search.rewirings(CribPlacement("THEWEATHER", 0))))
+        # a crib at the wrong offset asks for a letter connected to itself or to two others, sooner or later
+        self.assertEqual([], list(search.rewirings(CribPlacement("THEWEATHERFORECAST", 1))))
+
+
+if __name__ == "__main__":
+    unittest.main()
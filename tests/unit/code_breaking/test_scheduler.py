@@ -0,0 +1,106 @@
+import os
+import tempfile
+import unittest
+
+from enigma_machine import EnigmaMachine, EnigmaSetup
+from enigma_machine.code_breaking import CribCheck, Permutations, Product, Scheduler, SearchCheckpoint, SearchSpace
+from enigma_machine.code_breaking import Strategy, search
+from enigma_machine.code_breaking.scheduler import CALIBRATION_VARIANTS
+from enigma_machine.optional_dependencies import NUMPY_INSTALLED
+
+
+class _CountingCheck:
+    """A check other than a crib check, counting the variants it is given"""
+
+    def __init__(self, check):
+        self.check = check
+        self.checked = []
+
+    def __call__(self, variant):
+        self.checked.append(variant)
+        return self.check(variant)
+
+
+class SchedulerTestCase(unittest.TestCase):
+    CODE = EnigmaMachine(EnigmaSetup.from_string("I-II-III B 01-01-01 Q-E-V")).encode("ATTACKATDAWN")
+
+    def setUp(self):
+        self.scheduler = Scheduler(processes=2)
+
+    def tearDown(self):
+        self.scheduler.close()
+
+    def test_small_searches_are_serial(self):
+        space = SearchSpace(["I-II-III"], ["A", "B", "C"], ["01-01-01"], ["Q-E-V"], [""])
+        hits = list(self.scheduler.search(space, CribCheck(self.CODE, "DAWN")))
+
+        self.assertEqual(1, len(hits))
+        decision = self.scheduler.decisions[-1]
+        self.assertEqual(Strategy.SERIAL, decision.strategy)
+        self.assertEqual(3, decision.variants)
+        self.assertEqual(len(self.CODE), decision.message_length)
+        self.assertIn(Strategy.PROCESS_POOL, decision.estimated_seconds)
+        self.assertIn("serial for 3 variants", str(decision))
+
+    def test_plan(self):
+        small = SearchSpace(["I-II-III"], ["B"], ["01-01-01"], ["Q-E-V"], [""])
+        large = SearchSpace(["I-II-III"], ["B"], ["01-01-01"], Product(*["ABCDEFGHIJKLMNOPQRSTUVWXYZ"] * 3), [""])
+        check = CribCheck(self.CODE * 10, "DAWN")
+
+        self.assertEqual(Strategy.SERIAL, self.scheduler.plan(small, check).strategy)
+        self.assertNotEqual(Strategy.SERIAL, self.scheduler.plan(large, check).strategy)
+        # no process pool on a single CPU
+        self.assertNotIn(Strategy.PROCESS_POOL, Scheduler(processes=1).plan(large, check).estimated_seconds)
+        # any other check is not batched
+        self.assertNotIn(Strategy.BATCH, self.scheduler.plan(large, lambda variant: None).estimated_seconds)
+
+    def test_strategies_find_the_same_hits(self):
+        space = SearchSpace(["I-II-III", "II-I-III"], ["B", "C"], ["01-01-01"], Permutations("QEVAB", 3), [""])
+        check = CribCheck(self.CODE, "DAWN")
+        expected = list(search(space, check))
+
+        strategies = [Strategy.SERIAL, Strategy.PROCESS_POOL] + ([Strategy.BATCH] if NUMPY_INSTALLED else [])
+        for strategy in strategies:
+            with self.subTest(strategy=strategy):
+                self.assertEqual(expected, sorted(self.scheduler.search(space, check, strategy=strategy)))
+                self.assertEqual(strategy, self.scheduler.decisions[-1].strategy)
+                # a given strategy is not planned
+                self.assertEqual({}, self.scheduler.decisions[-1].estimated_seconds)
+                self.assertIn("(given)", str(self.scheduler.decisions[-1]))
+
+    def test_plan_counts_the_variants_kept_by_the_predicate(self):
+        positions = Product(*["ABCDEFGHIJKLMNOPQRSTUVWXYZ"] * 3)
+        space = SearchSpace(["I-II-III"], ["B"], ["01-01-01"], positions, [""],
+                            predicate=lambda variant: variant[3].startswith("A"))
+        decision = self.scheduler.plan(space, CribCheck(self.CODE, "DAWN"))
+        self.assertAlmostEqual(26 * 26, decision.variants, delta=26 * 26 * 0.1)
+
+    def test_variants_timed_are_not_checked_again(self):
+        positions = Product("QAB", "EAB", "VAB")
+        space = SearchSpace(["I-II-III"], ["B", "C"], ["01-01-01"], positions, [""],
+                            predicate=lambda variant: variant[3] != "A-A-A")
+        crib_check = CribCheck(self.CODE, "DAWN")
+        expected = list(search(space, crib_check))
+
+        with Scheduler(processes=1) as scheduler:
+            check = _CountingCheck(crib_check)
+            self.assertEqual(expected, list(scheduler.search(space, check)))
+            self.assertEqual(len(space), len(check.checked))
+            self.assertEqual(len(space), len(set(check.checked)))
+
+            # the hit is among the variants timed, so nothing else is checked
+            check = _CountingCheck(crib_check)
+            self.assertEqual(expected, list(scheduler.search(space, check, max_hits=1)))
+            self.assertLessEqual(len(check.checked), CALIBRATION_VARIANTS + 1)
+
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, "search.jsonl")
+                with SearchCheckpoint(path, "key") as checkpoint:
+                    check = _CountingCheck(crib_check)
+                    self.assertEqual(expected, list(scheduler.search(space, check, checkpoint=checkpoint)))
+                    self.assertEqual(len(space) + len(expected), len(check.checked))  # hits are decoded again
+                    self.assertEqual([], list(checkpoint.remaining(space.indices)))
+
+
+if __name__ == '__main__':
+    unittest.main()
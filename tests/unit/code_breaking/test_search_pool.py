@@ -0,0 +1,79 @@
+import unittest
+
+from enigma_machine import EnigmaMachine, EnigmaSetup
+from enigma_machine.code_breaking import CribCheck, Permutations, SearchPool, SearchSpace, search
+
+
+def _is_multiple_of_seven(variant):
+    return variant if int(variant[2]) % 7 == 0 else None
+
+
+class SearchPoolTestCase(unittest.TestCase):
+    CODE = EnigmaMachine(EnigmaSetup.from_string("I-II-III B 01-01-01 Q-E-V")).encode("ATTACKATDAWN")
+
+    @classmethod
+    def setUpClass(cls):
+        cls.pool = SearchPool(processes=2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.close()
+
+    def test_search(self):
+        space = SearchSpace(["I-II-III"], ["B", "C"], ["01-01-01"], Permutations("QEVAB", 3), [""])
+        hits = list(search(space, CribCheck(self.CODE, "DAWN")))
+        self.assertEqual(1, len(hits))
+        self.assertEqual(EnigmaSetup.from_string("I-II-III B 01-01-01 Q-E-V"), hits[0].result[0])
+        self.assertEqual("ATTACKATDAWN", hits[0].result[1])
+        self.assertEqual(space.unrank(hits[0].index), ("I-II-III", "B", "01-01-01", "Q-E-V", ""))
+
+    def test_search_pool(self):
+        space = SearchSpace(["I-II-III"], ["B", "C"], ["01-01-01"], Permutations("QEVAB", 3), [""])
+        self.assertEqual(list(search(space, CribCheck(self.CODE, "DAWN"))),
+                         list(self.pool.search(space, CribCheck(self.CODE, "DAWN"))))
+
+        space = SearchSpace(["I"], ["B"], ["{:04d}".format(n) for n in range(1000)], ["A"], [""])
+        hits = sorted(self.pool.search(space, _is_multiple_of_seven))
+        self.assertEqual(list(search(space, _is_multiple_of_seven)), hits)
+        self.assertEqual(143, len(hits))
+
+    def test_early_termination(self):
+        space = SearchSpace(["I"], ["B"], ["{:05d}".format(n) for n in range(50000)], ["A"], [""])
+        checked_before = self.pool.checked
+        hits = list(self.pool.search(space, _is_multiple_of_seven, max_hits=3))
+        self.assertEqual(3, len(hits))
+        self.assertLess(self.pool.checked - checked_before, len(space))
+
+        self.assertEqual(3, len(list(search(space, _is_multiple_of_seven, max_hits=3))))
+
+    def test_ranges_done(self):
+        space = SearchSpace(["I"], ["B"], ["{:04d}".format(n) for n in range(500)], ["A"], [""])
+        done = []
+        list(self.pool.search(space, _is_multiple_of_seven, indices=range(100, 500),
+                              on_range_done=lambda indices, hits: done.append(indices)))
+        self.assertEqual(list(range(100, 500)), sorted(index for indices in done for index in indices))
+
+    def test_error_ending_a_search_is_raised(self):
+        space = SearchSpace(["I"], ["B"], ["{:05d}".format(n) for n in range(50000)], ["A"], [""])
+        calls = []
+
+        def on_range_done(indices, hits):
+            calls.append(indices)
+            raise ValueError("first") if len(calls) == 1 else KeyError("while draining")
+
+        with self.assertRaisesRegex(ValueError, "first"):
+            list(self.pool.search(space, _is_multiple_of_seven, on_range_done=on_range_done))
+        self.assertGreater(len(calls), 1)
+        # the pool is ready for the next search
+        self.assertEqual(143, len(list(self.pool.search(space, _is_multiple_of_seven, indices=range(1000)))))
+
+    def test_search_can_be_abandoned(self):
+        space = SearchSpace(["I"], ["B"], ["{:05d}".format(n) for n in range(50000)], ["A"], [""])
+        for hit in self.pool.search(space, _is_multiple_of_seven):
+            break
+        # the pool is ready for the next search
+        self.assertEqual(2, len(list(self.pool.search(space, _is_multiple_of_seven, indices=range(0, 10)))))
+
+
+if __name__ == '__main__':
+    unittest.main()
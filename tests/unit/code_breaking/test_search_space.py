@@ -0,0 +1,194 @@
+import itertools
+import string
+import unittest
+
+from enigma_machine import CompiledEnigmaMachine
+from enigma_machine.code_breaking import Choices, Permutations, PlugboardCompletions, Prefixed, Product, RingEquivalence
+from enigma_machine.code_breaking import Dimension, SearchSpace
+from enigma_machine.code_breaking.search_space import rank_permutation, to_setup, unrank_permutation
+
+
+class SearchSpaceTestCase(unittest.TestCase):
+
+    def test_product(self):
+        positions = Product("AB", "CD", "E")
+        self.assertEqual(["A-C-E", "A-D-E", "B-C-E", "B-D-E"], list(positions))
+        self.assertEqual(4, len(positions))
+
+        rings = Product(*[["{:02d}".format(r) for r in range(1, 27)]] * 3, predicate=lambda r: int(r) % 2 == 0)
+        self.assertEqual(13 ** 3, len(rings))
+        self.assertEqual(len(rings), len(list(rings)))
+
+    def test_permutations(self):
+        rotors = Permutations(["Beta", "Gamma", "II", "IV"], 3)
+        self.assertEqual(24, len(rotors))
+        self.assertEqual(["-".join(p) for p in itertools.permutations(["Beta", "Gamma", "II", "IV"], 3)], list(rotors))
+
+        positions = Permutations(string.ascii_uppercase, 3, predicate=lambda c: c in "ABCD")
+        self.assertEqual(24, len(positions))
+        self.assertNotIn("A-A-B", list(positions))
+
+    def test_plugboard_completions(self):
+        plugboards = PlugboardCompletions("WP-RJ-A?-VF-I?-HN-CG-BS")
+        completions = list(plugboards)
+        self.assertEqual(12 * 11, len(plugboards))
+        self.assertEqual(len(completions), len(set(completions)))
+        self.assertIn("WP-RJ-AT-VF-IK-HN-CG-BS", completions)
+        # no plug is used twice
+        for plugboard in completions:
+            letters = plugboard.replace("-", "")
+            self.assertEqual(len(letters), len(set(letters)))
+
+    def test_search_space(self):
+        variants = SearchSpace(["I-II-III", "II-I-III"], ["B", "C"], ["01-01-01"], Product("AB", "A", "A"), [""])
+        self.assertEqual(8, len(variants))
+        self.assertEqual(("I-II-III", "B", "01-01-01", "A-A-A", ""), next(iter(variants)))
+        self.assertEqual(list(itertools.product(
+            ["I-II-III", "II-I-III"], ["B", "C"], ["01-01-01"], ["A-A-A", "B-A-A"], [""]
+        )), list(variants))
+
+    def test_search_space_predicate(self):
+        variants = SearchSpace(
+            Choices(["I-II-III"]), ["A", "B", "C"], ["01-01-01"], ["A-A-A"], ["", "AB"],
+            predicate=lambda variant: variant[1] != "A",
+        )
+        self.assertEqual(4, len(variants))
+        self.assertTrue(all(variant[1] != "A" for variant in variants))
+
+    def test_search_space_is_lazy(self):
+        positions = Product(*[string.ascii_uppercase] * 3)
+        variants = SearchSpace(Permutations(["I", "II", "III", "IV", "V"], 3), ["A", "B", "C"], positions, positions,
+                               PlugboardCompletions("A?-B?-C?-D?"))
+        self.assertEqual(60 * 3 * 26 ** 6 * 22 * 21 * 20 * 19, len(variants))
+        self.assertEqual(("I-II-III", "A", "A-A-A", "A-A-A", "AE-BF-CG-DH"), next(iter(variants)))
+
+    def test_rank_and_unrank_permutations(self):
+        for inx, permutation in enumerate(itertools.permutations("ABCDE", 3)):
+            self.assertEqual(list(permutation), unrank_permutation("ABCDE", 3, inx))
+            self.assertEqual(inx, rank_permutation("ABCDE", permutation))
+
+    def test_rank_and_unrank_dimensions(self):
+        dimensions = [
+            Choices(["B", "A", "C"]),
+            Product("AB", "CDE", "F"),
+            Permutations(["Beta", "Gamma", "II", "IV"], 3),
+            PlugboardCompletions("WP-RJ-A?-VF-I?-HN-CG-BS"),
+        ]
+        for dimension in dimensions:
+            with self.subTest(dimension=dimension):
+                for inx, value in enumerate(dimension):
+                    self.assertEqual(value, dimension.unrank(inx))
+                    self.assertEqual(inx, dimension.rank(value))
+
+        self.assertRaises(ValueError, dimensions[1].rank, "A-C")
+        self.assertRaises(ValueError, dimensions[2].rank, "II-II-IV")
+        self.assertRaises(ValueError, dimensions[3].rank, "WP-RJ-AW-VF-IK-HN-CG-BS")
+
+    def test_incomplete_dimension(self):
+        class WithoutRank(Dimension):
+            def __len__(self):
+                return 1
+
+            def __iter__(self):
+                return iter(["A"])
+
+            def unrank(self, index):
+                return "A"
+
+        self.assertRaises(TypeError, Dimension)
+        self.assertRaises(TypeError, WithoutRank)
+
+    def test_rank_and_unrank_variants(self):
+        variants = SearchSpace(
+            Permutations(["I", "II", "III"], 2), ["B", "C"], ["01-01-01"], Product("AB", "A", "XYZ"),
+            PlugboardCompletions("A?"),
+        )
+        self.assertEqual(len(variants), len(variants.indices))
+        for inx, variant in enumerate(variants):
+            self.assertEqual(variant, variants.unrank(inx))
+            self.assertEqual(inx, variants.rank(variant))
+        self.assertRaises(IndexError, variants.unrank, len(variants))
+
+    def test_ranges(self):
+        variants = SearchSpace(["I-II-III"], ["A", "B", "C"], ["01-01-01"], Product("ABC", "A", "A"), [""],
+                               predicate=lambda variant: variant[1] != "B")
+        ranges = list(variants.ranges(4))
+        self.assertEqual([range(0, 4), range(4, 8), range(8, 9)], ranges)
+        self.assertEqual(list(variants), [v for indices in ranges for v in variants.variants(indices)])
+        self.assertEqual([range(2, 5), range(5, 6)], list(variants.ranges(3, range(2, 6))))
+
+    def test_ring_equivalence(self):
+        rings = ["{:02d}".format(r) for r in range(1, 27)]
+        space = SearchSpace(
+            ["I-II-III", "II-I-III"], ["B"], Product(rings[::5], ["01", "05"], ["01", "05"]),
+            Product(string.ascii_uppercase, "A", "Q"), [""],
+        )
+        equivalence = RingEquivalence(space)
+        self.assertEqual(1, equivalence.collapsed)
+        # 6 left ring settings times 26 left starting positions give 26 machines
+        self.assertEqual(len(space) // 6, len(equivalence.representatives))
+
+        # every variant is given back once, by the representative giving the same machine
+        expanded = []
+        for representative in equivalence.representatives:
+            variants = equivalence.expand(representative)
+            expanded.extend(variants)
+            messages = {CompiledEnigmaMachine(to_setup(v)).encode("A" * 800) for v in variants + [representative]}
+            self.assertEqual(1, len(messages))
+        self.assertEqual(sorted(space), sorted(expanded))
+
+    def test_ring_equivalence_four_rotors(self):
+        rings = ["01", "02", "03"]
+        space = SearchSpace(
+            ["BETA-I-II-III"], ["B"], Product(rings, rings, ["01"], ["01"]), Product("ABC", "ABC", "A", "A"), [""],
+        )
+        equivalence = RingEquivalence(space)
+        self.assertEqual(2, equivalence.collapsed)
+        # the positions of the two left-most rotor cores, 5 each
+        self.assertEqual(5 * 5, len(equivalence.representatives))
+        self.assertEqual(len(space), sum(len(equivalence.expand(v)) for v in equivalence.representatives))
+
+    def test_ring_equivalence_permutations(self):
+        rings = ["02", "04", "06", "08"]
+        space = SearchSpace(["I-II-III"], ["B"], Permutations(rings, 3), Product("ABCDEFGHIJKL", "M", "Y"), [""])
+        equivalence = RingEquivalence(space)
+        self.assertEqual(1, equivalence.collapsed)
+        self.assertEqual("01-04-02", equivalence.representatives.dimensions[2].unrank(3))
+
+        # representatives standing for no variant, e.g. the left ring setting used by another rotor, are left out
+        expansions = [equivalence.expand(representative) for representative in equivalence.representatives]
+        self.assertNotIn([], expansions)
+        self.assertEqual(sorted(space), sorted(variant for variants in expansions for variant in variants))
+
+    def test_prefixed(self):
+        dimension = Prefixed("01-", Permutations(["02", "04", "06"], 2))
+        self.assertEqual(6, len(dimension))
+        self.assertEqual(["01-02-04", "01-02-06", "01-04-02"], list(dimension)[:3])
+        self.assertEqual("01-04-06", dimension.unrank(3))
+        self.assertEqual(3, dimension.rank("01-04-06"))
+        with self.assertRaises(ValueError):
+            dimension.rank("02-04-06")
+
+    def test_ring_equivalence_not_collapsed(self):
+        rings = ["{:02d}".format(r) for r in range(1, 27)]
+        # known starting positions: every ring setting gives different rotor cores
+        space = SearchSpace(["I-II-III"], ["B"], Permutations(rings, 3), ["E-M-Y"], [""])
+        equivalence = RingEquivalence(space)
+        self.assertEqual(0, equivalence.collapsed)
+        self.assertIs(space, equivalence.representatives)
+        self.assertEqual([("I-II-III", "B", "01-02-03", "E-M-Y", "")],
+                         equivalence.expand(("I-II-III", "B", "01-02-03", "E-M-Y", "")))
+
+        # the predicate is applied to the variants a representative stands for
+        space = SearchSpace(
+            ["I-II-III"], ["B"], Product(rings, ["01"], ["01"]), Product(string.ascii_uppercase, "A", "A"), [""],
+            predicate=lambda variant: variant[2].startswith("1"),
+        )
+        equivalence = RingEquivalence(space)
+        self.assertEqual(1, equivalence.collapsed)
+        representative = ("I-II-III", "B", "01-01-01", "C-A-A", "")
+        self.assertEqual(["10-01-01", "11-01-01", "12-01-01"], [v[2] for v in equivalence.expand(representative)][:3])
+
+
+if __name__ == '__main__':
+    unittest.main()
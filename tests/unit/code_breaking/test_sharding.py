@@ -0,0 +1,112 @@
+import json
+import os
+import socket
+import tempfile
+import threading
+import unittest
+
+from enigma_machine.code_breaking import Coordinator, SearchCheckpoint, SearchSpace, run_node, search, sharded_search
+
+
+def _is_multiple_of_seven(variant):
+    return variant if int(variant[2]) % 7 == 0 else None
+
+
+class ShardingTestCase(unittest.TestCase):
+    SPACE = SearchSpace(["I"], ["B"], ["{:04d}".format(n) for n in range(1000)], ["A"], [""])
+
+    def test_sharded_search(self):
+        expected = list(search(self.SPACE, _is_multiple_of_seven))
+        self.assertEqual(expected, list(sharded_search(self.SPACE, _is_multiple_of_seven, nodes=2, shard_size=64)))
+        self.assertEqual(expected[:1], list(sharded_search(self.SPACE, _is_multiple_of_seven, max_hits=1)))
+
+    def test_nodes_in_threads(self):
+        with Coordinator(self.SPACE, _is_multiple_of_seven, shard_size=100) as coordinator:
+            nodes = [threading.Thread(target=run_node, args=(coordinator.address,)) for _ in range(3)]
+            for node in nodes:
+                node.start()
+            self.assertTrue(coordinator.wait(timeout=30))
+            for node in nodes:
+                node.join()
+            self.assertEqual(10, coordinator.shards_done)
+            self.assertEqual(list(search(self.SPACE, _is_multiple_of_seven)), sorted(coordinator.hits))
+
+    def test_shard_of_a_lost_node_is_handed_out_again(self):
+        with Coordinator(self.SPACE, _is_multiple_of_seven, shard_size=500) as coordinator:
+            with socket.create_connection(coordinator.address) as connection, connection.makefile("rw") as stream:
+                stream.write(json.dumps({"op": "shard"}) + "\n")
+                stream.flush()
+                self.assertEqual([0, 500], json.loads(stream.readline())["shard"])
+
+            self.assertEqual(2, run_node(coordinator.address))
+            self.assertTrue(coordinator.wait(timeout=30))
+            self.assertEqual(143, len(coordinator.hits))
+
+    def test_checkpoint(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "search.jsonl")
+            with SearchCheckpoint(path, "key") as checkpoint:
+                hits = list(sharded_search(self.SPACE, _is_multiple_of_seven, shard_size=100, max_hits=1,
+                                           checkpoint=checkpoint, nodes=1))
+                self.assertEqual(1, len(hits))
+            with SearchCheckpoint(path, "key") as checkpoint:
+                self.assertEqual(100, checkpoint.done)
+                coordinator = Coordinator(self.SPACE, _is_multiple_of_seven, shard_size=100, checkpoint=checkpoint)
+                with coordinator:
+                    self.assertEqual(9, run_node(coordinator.address))
+                self.assertEqual(len(self.SPACE), checkpoint.done)
+
+    def test_resumed_search_gives_recorded_hits_first(self):
+        expected = list(search(self.SPACE, _is_multiple_of_seven))
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "search.jsonl")
+            with SearchCheckpoint(path, "key") as checkpoint:
+                list(sharded_search(self.SPACE, _is_multiple_of_seven, shard_size=100, max_hits=1,
+                                    checkpoint=checkpoint, nodes=1))
+            with SearchCheckpoint(path, "key") as checkpoint:
+                self.assertEqual(expected[:20], list(sharded_search(
+                    self.SPACE, _is_multiple_of_seven, shard_size=100, max_hits=20, checkpoint=checkpoint, nodes=1,
+                )))
+            with SearchCheckpoint(path, "key") as checkpoint:
+                self.assertEqual(expected[:3], list(sharded_search(
+                    self.SPACE, _is_multiple_of_seven, max_hits=3, checkpoint=checkpoint, nodes=1,
+                )))
+
+    def test_only_recorded_hits_given_are_checked_again(self):
+        checked = []
+
+        def check(variant):
+            checked.append(variant)
+            return _is_multiple_of_seven(variant)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "search.jsonl")
+            with SearchCheckpoint(path, "key") as checkpoint:
+                list(sharded_search(self.SPACE, _is_multiple_of_seven, shard_size=100, checkpoint=checkpoint, nodes=1))
+            with SearchCheckpoint(path, "key") as checkpoint:
+                self.assertEqual(143, len(checkpoint.hits))
+                hits = list(sharded_search(self.SPACE, check, max_hits=2, checkpoint=checkpoint, nodes=1))
+                self.assertEqual(list(search(self.SPACE, _is_multiple_of_seven))[:2], hits)
+                self.assertEqual(2, len(checked))
+
+    def test_invalid_requests(self):
+        with Coordinator(self.SPACE, _is_multiple_of_seven, shard_size=500) as coordinator:
+            with socket.create_connection(coordinator.address) as connection, connection.makefile("rw") as stream:
+                for request in ["not json", "[]", json.dumps({"op": "stop"}), json.dumps({"op": "done"}),
+                                json.dumps({"op": "done", "shard": ["0", "500"], "hits": []}),
+                                json.dumps({"op": "done", "shard": [0, 500], "hits": [[7, "not pickled"]]})]:
+                    stream.write(request + "\n")
+                    stream.flush()
+                    self.assertIn("error", json.loads(stream.readline()))
+
+                # the connection is still served
+                stream.write(json.dumps({"op": "shard"}) + "\n")
+                stream.flush()
+                self.assertEqual([0, 500], json.loads(stream.readline())["shard"])
+
+            self.assertEqual(2, run_node(coordinator.address))
+            self.assertTrue(coordinator.wait(timeout=30))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -62,6 +62,9 @@ class PlugboardTestCase(unittest.TestCase):
 
         self.assertRaises(PlugAlreadyInUse, plugboard.add, plug)
 
+    def test_str_is_sorted(self):
+        self.assertEqual("AI-HL-MO", str(Plugboard([PlugLead("MO"), PlugLead("AI"), PlugLead("HL")])))
+
 
 if __name__ == '__main__':
     unittest.main()
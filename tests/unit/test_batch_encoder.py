@@ -0,0 +1,53 @@
+import unittest
+
+from enigma_machine import EnigmaSetup, EnigmaMachine, RotorLabel, ENGLISH_ALPHABET
+from enigma_machine.optional_dependencies import NUMPY_INSTALLED
+
+if NUMPY_INSTALLED:
+    import numpy as np
+    from enigma_machine.batch_encoder import BatchEncoder
+
+
+@unittest.skipUnless(NUMPY_INSTALLED, "numpy is not installed")
+class BatchEncoderTestCase(unittest.TestCase):
+    MESSAGE = "THEQUICKBROWNFOXJUMPSOVERTHELAZYDOG" * 20
+
+    def test_same_output_as_enigma_machine(self):
+        rng = np.random.default_rng(7)
+        for rotors in ("I-II-III", "IV-V-BETA", "BETA-I-III-IV"):
+            rotor_count = len(rotors.split("-"))
+            setup = EnigmaSetup.from_string(
+                f"{rotors} B {'-'.join(['01'] * rotor_count)} {'-'.join(['A'] * rotor_count)} KI-XN-FL"
+            )
+            encoder = BatchEncoder(setup, reflectors=RotorLabel.get_reflector_labels())
+            positions = rng.integers(0, 26, (20, rotor_count))
+            ring_settings = rng.integers(1, 27, (20, rotor_count))
+            reflectors = rng.integers(0, 3, 20)
+
+            encoded = encoder.encode(self.MESSAGE, positions, ring_settings, reflectors)
+
+            self.assertEqual((20, len(self.MESSAGE)), encoded.shape)
+            for k in range(20):
+                config = "{0} {1} {2} {3} KI-XN-FL".format(
+                    rotors,
+                    "ABC"[reflectors[k]],
+                    "-".join(str(r) for r in ring_settings[k][::-1]),
+                    "-".join(ENGLISH_ALPHABET[p] for p in positions[k][::-1]),
+                )
+                with self.subTest(config=config):
+                    expected = EnigmaMachine(EnigmaSetup.from_string(config)).encode(self.MESSAGE)
+                    self.assertEqual(expected, BatchEncoder.to_string(encoded[k]))
+
+    def test_defaults_to_setup_key(self):
+        setup = EnigmaSetup.from_string("I-II-III B 1-1-1 A-A-Z HL-MO-AJ-CX-BZ-SR-NI-YW-DG-PK")
+        encoded = BatchEncoder(setup).encode("ARTIFICIALINTELLIGENCE")
+        self.assertEqual("XABMTXRSXTLZEHCZEJBGUW", BatchEncoder.to_string(encoded[0]))
+
+    def test_find(self):
+        encoded = np.array([[0, 1, 2, 3], [3, 2, 1, 0]], dtype=np.uint8)
+        self.assertEqual([1], list(BatchEncoder.find(encoded, "CB")))
+        self.assertEqual([], list(BatchEncoder.find(encoded, "ABCDE")))
+
+
+if __name__ == '__main__':
+    unittest.main()
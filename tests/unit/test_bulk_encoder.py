@@ -0,0 +1,64 @@
+import os
+import tempfile
+import unittest
+
+from enigma_machine import EnigmaSetup, CompiledEnigmaMachine
+from enigma_machine import bulk_encoder
+from enigma_machine.bulk_encoder import encode_file
+
+
+class BulkEncoderTestCase(unittest.TestCase):
+    SETUP = "I-II-III-IV C 7-11-15-19 Q-E-V-Z HL-MO-AJ-CX-BZ-SR-NI-YW-DG-PK"
+    MESSAGE = "ThisIsALongMessageForTheBulkEncoder" * 200
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.input_path = os.path.join(self.directory.name, "input.txt")
+        self.output_path = os.path.join(self.directory.name, "output.txt")
+        with open(self.input_path, "w") as input_file:
+            input_file.write(self.MESSAGE)
+
+        expected_machine = CompiledEnigmaMachine(EnigmaSetup.from_string(self.SETUP))
+        self.expected = expected_machine.encode(self.MESSAGE)
+        self.expected_positions = expected_machine.positions
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def assert_output(self, machine, report):
+        with open(self.output_path) as output_file:
+            self.assertEqual(self.expected, output_file.read())
+        self.assertEqual(len(self.MESSAGE), report.letters)
+        self.assertGreater(report.throughput, 0)
+        self.assertEqual(self.expected_positions, machine.positions)
+
+    def test_encode_file_serially(self):
+        machine = CompiledEnigmaMachine(EnigmaSetup.from_string(self.SETUP))
+        report = encode_file(machine, self.input_path, self.output_path, processes=1, slice_size=1000)
+        self.assert_output(machine, report)
+
+        # nothing is left behind in the calling process
+        self.assertIsNone(bulk_encoder._worker_machine)
+        self.assertIsNone(bulk_encoder._worker_files)
+
+    def test_encode_file_in_parallel(self):
+        machine = CompiledEnigmaMachine(EnigmaSetup.from_string(self.SETUP))
+        report = encode_file(machine, self.input_path, self.output_path, processes=2, slice_size=1000)
+        self.assert_output(machine, report)
+
+    def test_empty_file(self):
+        open(self.input_path, "w").close()
+        report = encode_file(CompiledEnigmaMachine(EnigmaSetup.from_string(self.SETUP)), self.input_path,
+                             self.output_path)
+        self.assertEqual(0, report.letters)
+        self.assertEqual(0, os.path.getsize(self.output_path))
+
+    def test_invalid_file(self):
+        with open(self.input_path, "w") as input_file:
+            input_file.write("HELLO\n")
+        machine = CompiledEnigmaMachine(EnigmaSetup.from_string(self.SETUP))
+        self.assertRaises(ValueError, encode_file, machine, self.input_path, self.output_path, processes=1)
+
+
+if __name__ == '__main__':
+    unittest.main()
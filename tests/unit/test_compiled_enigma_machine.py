@@ -0,0 +1,232 @@
+import multiprocessing
+import unittest
+from unittest import mock
+
+from enigma_machine import compiled_enigma_machine
+from enigma_machine import EnigmaSetup, EnigmaMachine, CompiledEnigmaMachine, IncompatibleConfiguration
+from enigma_machine.compiled_enigma_machine import to_indices, from_indices
+from enigma_machine.stepping_table import to_state
+
+
+class CompiledEnigmaMachineTestCase(unittest.TestCase):
+    SETUPS = [
+        "I-II-III B 1-1-1 A-A-Z",
+        "I-II-III B 1-1-1 A-D-U HL-MO-AJ-CX-BZ-SR-NI-YW-DG-PK",
+        "IV-V-Beta B 14-9-24 A-A-A",
+        "I-II-III-IV C 7-11-15-19 Q-E-V-Z",
+        "BETA-GAMMA-V C 04-02-14 M-J-M KI-XN-FL",
+        "V-III-IV A 24-12-10 S-W-U WP-RJ-AT-VF-IK-HN-CG-BS",
+    ]
+    MESSAGE = "THEQUICKBROWNFOXJUMPSOVERTHELAZYDOG" * 30
+
+    def test_same_output_as_enigma_machine(self):
+        for config in CompiledEnigmaMachineTestCase.SETUPS:
+            with self.subTest(config=config):
+                expected = EnigmaMachine(EnigmaSetup.from_string(config)).encode(self.MESSAGE)
+                compiled = CompiledEnigmaMachine(EnigmaSetup.from_string(config))
+                self.assertEqual(expected, compiled.encode(self.MESSAGE))
+
+    def test_symmetric_encoding(self):
+        machine = CompiledEnigmaMachine(EnigmaSetup.from_string(self.SETUPS[1]))
+        encoded_message = machine.encode("HELLOWORLD", True)
+        self.assertEqual(encoded_message, "VZFBJCGCVB")
+        self.assertEqual(machine.decode(encoded_message, True), "HELLOWORLD")
+
+    def test_rotors_keep_position_between_calls(self):
+        machine = CompiledEnigmaMachine(EnigmaSetup.from_string(self.SETUPS[0]))
+        self.assertEqual(machine.encode("A"), "U")
+        self.assertEqual(machine.encode("A"), "B")
+
+    def test_encode_indices(self):
+        machine = CompiledEnigmaMachine(EnigmaSetup.from_string(self.SETUPS[0]))
+        self.assertEqual(bytes([20, 1]), machine.encode_indices(bytes([0, 0])))
+
+    def test_lowercase_and_invalid_characters(self):
+        machine = CompiledEnigmaMachine(EnigmaSetup.from_string(self.SETUPS[0]))
+        self.assertEqual(machine.encode("aa"), "UB")
+        self.assertRaises(ValueError, machine.encode, "HELLO WORLD")
+        self.assertRaises(ValueError, machine.encode, "Ä")
+
+    def test_indices_conversion(self):
+        self.assertEqual(bytes([0, 25, 7]), to_indices("aZh"))
+        self.assertEqual("AZH", from_indices(bytes([0, 25, 7])))
+
+    def test_compiled_enigma_machine(self):
+        machine = EnigmaMachine(EnigmaSetup.from_string(self.SETUPS[1]))
+        compiled_machine = EnigmaMachine(EnigmaSetup.from_string(self.SETUPS[1]), compiled=True)
+
+        for part in ("ARTIFICIAL", "INTELLIGENCE"):
+            self.assertEqual(machine.encode(part), compiled_machine.encode(part))
+
+        self.assertEqual(
+            [r.position % 26 for r in machine.rotors], [r.position % 26 for r in compiled_machine.rotors]
+        )
+        self.assertEqual(machine.encode_character("A"), compiled_machine.encode_character("A"))
+
+    def test_compile_considers_reflector_wiring(self):
+        config = "V-II-IV B 06-18-07 A-J-L UG-IE-PO-NX-WT"
+        machine = EnigmaMachine(EnigmaSetup.from_string(config))
+        machine.get_reflector().wiring = "PQUHRSLDYXNGOKMABEFZCWVJIT"
+        compiled = machine.compile()
+
+        self.assertEqual(
+            machine.encode("HWREISXLGTTBYVXRCWWJAKZDTVZWKBDJPVQYNEQIOTIFX"),
+            compiled.encode("HWREISXLGTTBYVXRCWWJAKZDTVZWKBDJPVQYNEQIOTIFX")
+        )
+        self.assertEqual(machine.encode("INSTAGRAM"), compiled.encode("INSTAGRAM"))
+
+    def test_seek(self):
+        machine = CompiledEnigmaMachine(EnigmaSetup.from_string(self.SETUPS[1]))
+        expected = machine.encode(self.MESSAGE, reset_rotors=True)
+
+        for offset in (0, 1, 17, 600, len(self.MESSAGE) - 1):
+            machine.seek(offset)
+            self.assertEqual(expected[offset:], machine.encode(self.MESSAGE[offset:]))
+
+        self.assertRaises(ValueError, machine.seek, -1)
+
+    def test_encode_at(self):
+        machine = CompiledEnigmaMachine(EnigmaSetup.from_string(self.SETUPS[1]))
+        message = to_indices(self.MESSAGE)
+        expected = machine.encode_indices(message)
+        machine.reset_rotors()
+
+        offsets = [600, 3, 4, 17, 0, len(message) - 1]
+        encoded = machine.encode_at(offsets, bytes(message[offset] for offset in offsets))
+        self.assertEqual(bytes(expected[offset] for offset in offsets), encoded)
+        self.assertEqual(b"", machine.encode_at([], b""))
+        # rotors do not move
+        self.assertEqual(expected, machine.encode_indices(message))
+
+    def test_state_substitutions(self):
+        machine = CompiledEnigmaMachine(EnigmaSetup.from_string(self.SETUPS[1]))
+        substitutions = machine.state_substitutions()
+        self.assertEqual(26 ** 3 * 26, len(substitutions))
+
+        states = machine.stepping_table.walk(to_state(*machine.positions[:3]), 100)
+        keystream = machine.substitutions(100)
+        for inx, state in enumerate(states):
+            self.assertEqual(keystream[inx * 26:(inx + 1) * 26], substitutions[state * 26:(state + 1) * 26])
+
+    def test_reflector_entries(self):
+        for config in CompiledEnigmaMachineTestCase.SETUPS:
+            with self.subTest(config=config):
+                machine = CompiledEnigmaMachine(EnigmaSetup.from_string(config))
+                reflector = to_indices(machine.reflector_wiring)
+                entries = machine.reflector_entries(100)
+                advanced = CompiledEnigmaMachine(EnigmaSetup.from_string(config))
+                advanced.advance(100)
+                self.assertEqual(advanced.positions, machine.positions)
+
+                machine.reset_rotors()
+                keystream = machine.substitutions(100)
+                for inx in range(100):
+                    entry = entries[inx * 26:(inx + 1) * 26]
+                    self.assertEqual(
+                        keystream[inx * 26:(inx + 1) * 26], bytes(entry.index(reflector[entry[x]]) for x in range(26)),
+                    )
+
+    def test_seek_enigma_machine(self):
+        machine = EnigmaMachine(EnigmaSetup.from_string(self.SETUPS[3]))
+        expected = machine.encode(self.MESSAGE)
+
+        machine = EnigmaMachine(EnigmaSetup.from_string(self.SETUPS[3]))
+        machine.seek(500)
+        self.assertEqual(expected[500:], machine.encode(self.MESSAGE[500:]))
+
+        # the compiled machine is kept across calls
+        with mock.patch.object(compiled_enigma_machine.CompiledEnigmaMachine, "reconfigure") as reconfigure:
+            machine.seek(10)
+            machine.seek(20)
+        reconfigure.assert_not_called()
+        self.assertEqual(expected[20:], machine.encode(self.MESSAGE[20:]))
+
+    def test_encode_parallel(self):
+        machine = CompiledEnigmaMachine(EnigmaSetup.from_string(self.SETUPS[4]))
+        expected = machine.encode(self.MESSAGE * 3)
+        expected_positions = machine.positions
+        machine.reset_rotors()
+
+        with mock.patch.object(compiled_enigma_machine, "MIN_PARALLEL_LENGTH", 0):
+            self.assertEqual(expected, machine.encode_parallel(self.MESSAGE * 3, processes=2, chunk_size=1000))
+            self.assertEqual(expected_positions, machine.positions)
+
+            # the pool is kept for the next call, which may come from another machine
+            pool = compiled_enigma_machine.shared_pool(2)
+            other = CompiledEnigmaMachine(EnigmaSetup.from_string(self.SETUPS[5]))
+            other_expected = other.encode(self.MESSAGE * 3, reset_rotors=True)
+            self.assertEqual(other_expected, other.encode_parallel(self.MESSAGE * 3, processes=2, chunk_size=1000))
+            self.assertIs(pool, compiled_enigma_machine.shared_pool(2))
+        compiled_enigma_machine.close_shared_pool()
+
+    def test_encode_parallel_on_a_given_pool(self):
+        machine = CompiledEnigmaMachine(EnigmaSetup.from_string(self.SETUPS[3]))
+        expected = machine.encode(self.MESSAGE * 3, reset_rotors=True)
+
+        with multiprocessing.Pool(2) as pool, mock.patch.object(compiled_enigma_machine, "MIN_PARALLEL_LENGTH", 0):
+            self.assertEqual(expected, machine.encode_parallel(self.MESSAGE * 3, chunk_size=1000, pool=pool))
+
+    def test_short_message_is_encoded_serially(self):
+        machine = CompiledEnigmaMachine(EnigmaSetup.from_string(self.SETUPS[1]))
+        expected = machine.encode(self.MESSAGE, reset_rotors=True)
+
+        with mock.patch.object(compiled_enigma_machine, "shared_pool") as shared_pool:
+            self.assertEqual(expected, machine.encode_parallel(self.MESSAGE, processes=2, chunk_size=100))
+        shared_pool.assert_not_called()
+
+    def test_encode_into(self):
+        machine = CompiledEnigmaMachine(EnigmaSetup.from_string(self.SETUPS[1]))
+        expected = machine.encode(self.MESSAGE, reset_rotors=True).encode("ascii")
+
+        destination = bytearray(len(self.MESSAGE) + 3)
+        self.assertEqual(len(self.MESSAGE), machine.encode_into(self.MESSAGE.lower().encode("ascii"), destination))
+        self.assertEqual(expected, destination[:len(self.MESSAGE)])
+
+        machine.reset_rotors()
+        buffer = bytearray(self.MESSAGE.encode("ascii"))
+        machine.encode_into(memoryview(buffer))
+        self.assertEqual(expected, buffer)
+
+    def test_encode_into_invalid_buffers(self):
+        machine = CompiledEnigmaMachine(EnigmaSetup.from_string(self.SETUPS[1]))
+        self.assertRaises(ValueError, machine.encode_into, b"HELLO")
+        self.assertRaises(ValueError, machine.encode_into, b"HELLO", bytearray(4))
+        self.assertRaises(ValueError, machine.encode_into, b"HELLO WORLD", bytearray(11))
+        self.assertEqual(machine.positions, CompiledEnigmaMachine(EnigmaSetup.from_string(self.SETUPS[1])).positions)
+
+    def test_enigma_machine_bytes(self):
+        machine = EnigmaMachine(EnigmaSetup.from_string(self.SETUPS[1]))
+        expected = EnigmaMachine(EnigmaSetup.from_string(self.SETUPS[1])).encode("HELLOWORLD")
+
+        self.assertEqual(expected.encode("ascii"), machine.encode(b"HELLOWORLD", reset_rotors=True))
+        self.assertEqual(expected.encode("ascii"), machine.encode(bytearray(b"helloworld"), reset_rotors=True))
+
+        buffer = bytearray(b"HELLOWORLD")
+        machine.encode_into(buffer)
+        self.assertEqual(expected.encode("ascii"), buffer)
+
+    def test_reconfigure(self):
+        machine = CompiledEnigmaMachine(EnigmaSetup.from_string(self.SETUPS[0]))
+        machine.encode(self.MESSAGE)
+
+        # every setup from any other one, so rotor order, rings, positions, plugs and reflectors all change
+        for config in self.SETUPS + list(reversed(self.SETUPS)):
+            with self.subTest(config=config):
+                machine.reconfigure(EnigmaSetup.from_string(config))
+                expected = CompiledEnigmaMachine(EnigmaSetup.from_string(config)).encode(self.MESSAGE)
+                self.assertEqual(expected, machine.encode(self.MESSAGE))
+
+        wiring = "PQUHRSLDYXNGOKMABEFZCWVJIT"
+        config = "V-II-IV B 06-18-07 A-J-L UG-IE-PO-NX-WT"
+        machine.reconfigure(EnigmaSetup.from_string(config), wiring)
+        self.assertEqual(wiring, machine.reflector_wiring)
+        self.assertEqual(
+            CompiledEnigmaMachine(EnigmaSetup.from_string(config), wiring).encode(self.MESSAGE),
+            machine.encode(self.MESSAGE),
+        )
+
+        self.assertRaises(IncompatibleConfiguration, machine.reconfigure, EnigmaSetup.from_string("I-II B 1-1 A-A"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,6 @@
 import unittest
 
-from enigma_machine import EnigmaSetup, RotorLabel
+from enigma_machine import EnigmaMachine, EnigmaSetup, PlugLead, RotorLabel
 from enigma_machine.exceptions import InvalidEnigmaSetup
 
 
@@ -55,6 +55,82 @@ class EnigmaSetupTestCase(unittest.TestCase):
             InvalidEnigmaSetup, EnigmaSetup.from_string, "I-II-III X 1-1-1 %-%-& HL-MO-MO-CX-BZ-SR-NI-YW-DG-PK TOO MUCH"
         )
 
+    def test_canonical_string(self):
+        enigma_setup = EnigmaSetup.from_string("I-II-III B 1-1-1 a-A-Z MO-LH-AJ")
+        self.assertEqual("I-II-III B 01-01-01 A-A-Z AJ-HL-MO", enigma_setup.to_canonical_string())
+        self.assertEqual(
+            "I-II-III B 01-01-01 A-A-Z", EnigmaSetup.from_string("I-II-III B 1-1-1 A-A-Z").to_canonical_string()
+        )
+
+    def test_equality_and_hash(self):
+        enigma_setup = EnigmaSetup.from_string("I-II-III B 1-1-1 A-A-Z HL-MO-AJ")
+        equivalent_setup = EnigmaSetup.from_string("I-II-III B 01-01-01 A-A-Z JA-HL-OM")
+        other_setup = EnigmaSetup.from_string("I-II-III B 01-01-02 A-A-Z JA-HL-OM")
+
+        self.assertEqual(enigma_setup, equivalent_setup)
+        self.assertEqual(hash(enigma_setup), hash(equivalent_setup))
+        self.assertNotEqual(enigma_setup, other_setup)
+        self.assertEqual(2, len({enigma_setup, equivalent_setup, other_setup}))
+
+    def test_from_string_returns_new_setups(self):
+        enigma_setup = EnigmaSetup.from_string("I-II-III B 1-1-1 A-A-Z HL-MO")
+        same_setup = EnigmaSetup.from_string("I-II-III B 1-1-1 A-A-Z HL-MO")
+
+        self.assertIsNot(enigma_setup, same_setup)
+        self.assertRaises(
+            InvalidEnigmaSetup, EnigmaSetup.from_string, "I-II-III X 1-1-1 A-A-Z HL-MO-AJ-CX-BZ-SR-NI-YW-DG-PK"
+        )
+
+    def test_immutable(self):
+        enigma_setup = EnigmaSetup.from_string("I-II-III B 1-1-1 A-A-Z HL-MO")
+        key = hash(enigma_setup)
+
+        enigma_setup.initial_positions[0] = "B"
+        enigma_setup.plugs.append(PlugLead("AJ"))
+        with self.assertRaises(AttributeError):
+            enigma_setup.initial_positions = ["B", "A", "A"]
+        with self.assertRaises(AttributeError):
+            enigma_setup.plugs = []
+
+        self.assertEqual(["Z", "A", "A"], enigma_setup.initial_positions)
+        self.assertEqual(["HL", "MO"], [str(plug) for plug in enigma_setup.plugs])
+        self.assertEqual(key, hash(enigma_setup))
+
+    def test_positions_in_uppercase(self):
+        enigma_setup = EnigmaSetup([RotorLabel.III, RotorLabel.II, RotorLabel.I], RotorLabel.B, ["01", 1, 1],
+                                   ["z", "a", "A"], [])
+        self.assertEqual(["Z", "A", "A"], enigma_setup.initial_positions)
+        self.assertEqual([1, 1, 1], enigma_setup.ring_settings)
+        self.assertEqual(EnigmaSetup.from_string("I-II-III B 1-1-1 a-a-z"), enigma_setup)
+        self.assertEqual("I-II-III B 01-01-01 A-A-Z", str(EnigmaSetup.from_string("I-II-III B 1-1-1 a-a-z")).rstrip())
+        self.assertEqual(
+            EnigmaMachine(enigma_setup).encode("ARTIFICIALINTELLIGENCE"),
+            EnigmaMachine(EnigmaSetup.from_string("I-II-III B 1-1-1 a-a-z")).encode("ARTIFICIALINTELLIGENCE"),
+        )
+
+        self.assertRaises(InvalidEnigmaSetup, EnigmaSetup.from_string, "I-II-III B 1-1-1 A-AB-Z")
+        self.assertRaises(InvalidEnigmaSetup, EnigmaSetup.from_string, "I-II-III B 1-1-1 A-1-Z")
+        self.assertRaises(
+            InvalidEnigmaSetup, EnigmaSetup, [RotorLabel.III, RotorLabel.II, RotorLabel.I], RotorLabel.B, [1, 1, 1],
+            ["Z", "A", ""], [],
+        )
+
+    def test_plugs_in_uppercase(self):
+        enigma_setup = EnigmaSetup.from_string("I-II-III B 01-01-01 A-A-A ab-Dc")
+        same_setup = EnigmaSetup.from_string("I-II-III B 01-01-01 A-A-A AB-CD")
+
+        self.assertEqual(["AB", "DC"], [str(plug) for plug in enigma_setup.plugs])
+        self.assertEqual(same_setup, enigma_setup)
+        self.assertEqual(hash(same_setup), hash(enigma_setup))
+        self.assertEqual("I-II-III B 01-01-01 A-A-A AB-CD", enigma_setup.to_canonical_string())
+        self.assertEqual(
+            EnigmaSetup([RotorLabel.III, RotorLabel.II, RotorLabel.I], RotorLabel.B, [1, 1, 1], ["A", "A", "A"],
+                        [PlugLead("ab"), PlugLead("CD")]),
+            same_setup,
+        )
+        self.assertEqual("ILACB", EnigmaMachine(enigma_setup).encode("HELLO"))
+        self.assertEqual(EnigmaMachine(same_setup).encode("HELLO"), EnigmaMachine(enigma_setup).encode("HELLO"))
+
 
 if __name__ == '__main__':
     unittest.main()
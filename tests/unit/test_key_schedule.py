@@ -0,0 +1,48 @@
+import os
+import tempfile
+import unittest
+
+from enigma_machine import EnigmaSetup, EnigmaMachine
+from enigma_machine.key_schedule import KeySchedule
+
+
+class KeyScheduleTestCase(unittest.TestCase):
+    SETUP = "I-II-III B 01-01-01 A-D-U HL-MO-AJ-CX-BZ-SR-NI-YW-DG-PK"
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "schedule.bin")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_export_and_load(self):
+        written = KeySchedule.export(EnigmaSetup.from_string(self.SETUP), self.path)
+
+        with KeySchedule(self.path) as schedule:
+            self.assertEqual(written, len(schedule))
+            self.assertEqual(26 * 25 * 26, schedule.cycle)
+            self.assertEqual(self.SETUP, schedule.setup)
+            self.assertEqual("VZFBJCGCVB", schedule.encode("HELLOWORLD"))
+            self.assertEqual("HELLOWORLD", schedule.decode("VZFBJCGCVB"))
+
+    def test_offsets_wrap_around_the_cycle(self):
+        # both the right and the middle rotor start on their notches, so the schedule has a lead-in
+        setup = "I-II-III B 01-01-01 A-E-V"
+        KeySchedule.export(EnigmaSetup.from_string(setup), self.path)
+        message = "THEQUICKBROWNFOXJUMPSOVERTHELAZYDOG" * 1000
+        expected = EnigmaMachine(EnigmaSetup.from_string(setup), compiled=True).encode(message)
+
+        with KeySchedule(self.path) as schedule:
+            self.assertEqual(1, schedule.lead_in)
+            self.assertEqual(expected, schedule.encode(message))
+            self.assertEqual(expected[20000:], schedule.encode(message[20000:], offset=20000))
+
+    def test_invalid_file(self):
+        with open(self.path, "wb") as schedule_file:
+            schedule_file.write(b"NOT A KEY SCHEDULE FILE")
+        self.assertRaises(ValueError, KeySchedule, self.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
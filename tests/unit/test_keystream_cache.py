@@ -0,0 +1,88 @@
+import unittest
+
+from enigma_machine import EnigmaSetup, EnigmaMachine
+from enigma_machine.compiled_enigma_machine import CompiledEnigmaMachine
+from enigma_machine.keystream_cache import Keystream, KeystreamCache, setup_key
+
+
+class KeystreamCacheTestCase(unittest.TestCase):
+    SETUP = "I-II-III B 1-1-1 A-A-Z HL-MO-AJ-CX-BZ-SR-NI-YW-DG-PK"
+
+    def test_encode(self):
+        cache = KeystreamCache()
+        setup = EnigmaSetup.from_string(self.SETUP)
+
+        self.assertEqual("XABMTXRSXTLZEHCZEJBGUW", cache.encode(setup, "ARTIFICIALINTELLIGENCE"))
+        self.assertEqual("RFKTMBXVVW", cache.encode(setup, "HELLOWORLD"))
+        self.assertEqual("HELLOWORLD", cache.decode(setup, "RFKTMBXVVW"))
+
+        long_message = "ARTIFICIALINTELLIGENCE" * 50
+        expected = EnigmaMachine(EnigmaSetup.from_string(self.SETUP)).encode(long_message)
+        self.assertEqual(expected, cache.encode(setup, long_message))
+        self.assertEqual(1, cache.misses)
+        self.assertEqual(3, cache.hits)
+        self.assertEqual(len(long_message) * 26, cache.size_in_bytes)
+
+    def test_equivalent_setups_share_a_keystream(self):
+        cache = KeystreamCache()
+        cache.encode(EnigmaSetup.from_string("I-II-III B 1-1-1 A-A-Z HL-MO"), "HELLO")
+        cache.encode(EnigmaSetup.from_string("I-II-III B 01-01-01 A-A-Z OM-LH"), "HELLO")
+
+        self.assertEqual(1, len(cache))
+        self.assertEqual(1, cache.hits)
+        self.assertNotEqual(
+            setup_key(EnigmaSetup.from_string("I-II-III B 1-1-1 A-A-Z HL-MO")),
+            setup_key(EnigmaSetup.from_string("I-II-III B 1-1-1 A-A-Z HL-MO"), "PQUHRSLDYXNGOKMABEFZCWVJIT"),
+        )
+
+    def test_least_recently_used_eviction(self):
+        cache = KeystreamCache(max_bytes=26 * 25)
+        first = EnigmaSetup.from_string("I-II-III B 1-1-1 A-A-A")
+        second = EnigmaSetup.from_string("I-II-III B 1-1-1 A-A-B")
+        third = EnigmaSetup.from_string("I-II-III B 1-1-1 A-A-C")
+
+        cache.encode(first, "A" * 10)
+        cache.encode(second, "A" * 10)
+        cache.encode(first, "A" * 10)
+        cache.encode(third, "A" * 10)
+
+        self.assertEqual(2, len(cache))
+        self.assertEqual(1, cache.evictions)
+        self.assertEqual(26 * 20, cache.size_in_bytes)
+
+        cache.encode(first, "A")
+        self.assertEqual(2, cache.hits)
+        cache.encode(second, "A")
+        self.assertEqual(4, cache.misses)
+
+    def test_keystream_wraps_around_the_cycle(self):
+        setup = EnigmaSetup.from_string(self.SETUP)
+        keystream = Keystream(CompiledEnigmaMachine(setup))
+        self.assertEqual(26 * 25 * 26, keystream.cycle)
+
+        cache = KeystreamCache()
+        message = "ARTIFICIALINTELLIGENCE" * 1000
+        expected = EnigmaMachine(EnigmaSetup.from_string(self.SETUP)).encode(message)
+        self.assertEqual(expected, cache.encode(setup, message))
+        self.assertEqual((keystream.lead_in + keystream.cycle) * 26, cache.size_in_bytes)
+
+    def test_keystream_over_budget_is_not_kept(self):
+        cache = KeystreamCache(max_bytes=26 * 25)
+        setup = EnigmaSetup.from_string(self.SETUP)
+        expected = EnigmaMachine(EnigmaSetup.from_string(self.SETUP)).encode("A" * 30)
+
+        self.assertEqual(expected, cache.encode(setup, "A" * 30))
+        self.assertEqual(0, len(cache))
+        self.assertEqual(0, cache.size_in_bytes)
+        self.assertEqual(1, cache.evictions)
+
+    def test_clear(self):
+        cache = KeystreamCache()
+        cache.encode(EnigmaSetup.from_string(self.SETUP), "HELLO")
+        cache.clear()
+        self.assertEqual(0, len(cache))
+        self.assertEqual(0, cache.size_in_bytes)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import multiprocessing
+import unittest
+
+from enigma_machine import EnigmaSetup, CompiledEnigmaMachine
+from enigma_machine.machine_pool import MachinePool
+
+
+def _pool_id(_):
+    return id(MachinePool.for_current_process())
+
+
+class MachinePoolTestCase(unittest.TestCase):
+    SETUPS = [
+        "I-II-III B 1-1-1 A-A-Z",
+        "I-II-III B 2-4-1 C-D-U HL-MO-AJ-CX",
+        "IV-V-Beta C 14-9-24 A-A-A",
+    ]
+    MESSAGE = "THEQUICKBROWNFOXJUMPSOVERTHELAZYDOG"
+
+    def test_machines_are_reused(self):
+        pool = MachinePool()
+        for config in self.SETUPS * 2:
+            with self.subTest(config=config):
+                expected = CompiledEnigmaMachine(EnigmaSetup.from_string(config)).encode(self.MESSAGE)
+                with pool.machine(EnigmaSetup.from_string(config)) as machine:
+                    self.assertEqual(expected, machine.encode(self.MESSAGE))
+
+        self.assertEqual(1, pool.created)
+        self.assertEqual(len(self.SETUPS) * 2 - 1, pool.reused)
+        self.assertEqual(1, len(pool))
+
+    def test_same_rotors_are_preferred(self):
+        pool = MachinePool()
+        first = pool.acquire(EnigmaSetup.from_string(self.SETUPS[0]))
+        second = pool.acquire(EnigmaSetup.from_string(self.SETUPS[2]))
+        self.assertEqual(2, pool.created)
+        pool.release(first)
+        pool.release(second)
+
+        self.assertIs(first, pool.acquire(EnigmaSetup.from_string(self.SETUPS[1])))
+        self.assertIs(second, pool.acquire(EnigmaSetup.from_string(self.SETUPS[2])))
+
+    def test_max_idle(self):
+        pool = MachinePool(max_idle=1)
+        machines = [pool.acquire(EnigmaSetup.from_string(config)) for config in self.SETUPS]
+        for machine in machines:
+            pool.release(machine)
+        self.assertEqual(1, len(pool))
+
+    def test_for_current_process(self):
+        self.assertIs(MachinePool.for_current_process(), MachinePool.for_current_process())
+        with multiprocessing.Pool(1) as workers:
+            worker_pools = workers.map(_pool_id, range(2))
+        self.assertEqual(1, len(set(worker_pools)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,22 @@
+import unittest
+from unittest import mock
+
+from enigma_machine import optional_dependencies
+from enigma_machine.optional_dependencies import NUMPY_INSTALLED, require_numpy
+
+
+class OptionalDependenciesTestCase(unittest.TestCase):
+
+    @unittest.skipUnless(NUMPY_INSTALLED, "numpy is not installed")
+    def test_require_numpy(self):
+        import numpy as np
+        self.assertIs(np, require_numpy())
+
+    def test_require_numpy_missing(self):
+        with mock.patch.object(optional_dependencies, "NUMPY_INSTALLED", False):
+            with self.assertRaisesRegex(ImportError, "requirements-optional.txt"):
+                require_numpy()
+
+
+if __name__ == '__main__':
+    unittest.main()
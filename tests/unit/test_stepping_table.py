@@ -0,0 +1,50 @@
+import unittest
+
+from enigma_machine import EnigmaSetup, EnigmaMachine
+from enigma_machine.stepping_table import SteppingTable, STATE_COUNT, to_state, from_state
+
+
+class SteppingTableTestCase(unittest.TestCase):
+
+    def test_state_packing(self):
+        self.assertEqual((3, 7, 25), from_state(to_state(3, 7, 25)))
+        self.assertEqual(STATE_COUNT - 1, to_state(25, 25, 25))
+
+    def test_double_step(self):
+        # notches of rotors III (V) and II (E), with ring settings 01
+        table = SteppingTable.for_notches((21, 4))
+        self.assertEqual(to_state(22, 4, 0), table.next(to_state(21, 3, 0)))
+        self.assertEqual(to_state(23, 5, 1), table.next(to_state(22, 4, 0)))
+        self.assertEqual(to_state(24, 5, 1), table.next(to_state(23, 5, 1)))
+
+    def test_cycle(self):
+        table = SteppingTable.for_notches((21, 4))
+        self.assertEqual(26 * 25 * 26, table.cycle_length(0))
+        # the middle rotor is only found on its notch with the right rotor right past its own notch
+        self.assertFalse(table.is_in_cycle(to_state(0, 4, 0)))
+        self.assertTrue(table.is_in_cycle(to_state(22, 4, 0)))
+
+    def test_rotors_without_notch(self):
+        table = SteppingTable.for_notches((-1, -1))
+        self.assertEqual(26, table.cycle_length(to_state(5, 6, 7)))
+        self.assertEqual(to_state(0, 6, 7), table.next(to_state(25, 6, 7)))
+
+    def test_walk_matches_enigma_machine(self):
+        machine = EnigmaMachine(EnigmaSetup.from_string("I-II-III B 1-1-1 A-D-U"))
+        table = SteppingTable.for_notches((21, 4))
+        states = table.walk(to_state(*(r.position for r in machine.rotors[:3])), 20000)
+
+        self.assertEqual(20000, len(states))
+        for state in states[:1000]:
+            machine.encode_character("A")
+            self.assertEqual(from_state(state), tuple(r.position for r in machine.rotors[:3]))
+
+    def test_walk_wraps_around_the_cycle(self):
+        table = SteppingTable.for_notches((21, 4))
+        states = table.walk(0, 2 * table.cycle_length(0) + 5)
+        self.assertEqual(states[:5], states[table.cycle_length(0):table.cycle_length(0) + 5])
+        self.assertEqual(0, states[table.cycle_length(0) - 1])
+
+
+if __name__ == '__main__':
+    unittest.main()
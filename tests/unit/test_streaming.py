@@ -0,0 +1,48 @@
+import io
+import unittest
+
+from enigma_machine import EnigmaSetup, EnigmaMachine, CompiledEnigmaMachine
+from enigma_machine.streaming import encode_chunks, encode_stream, read_chunks
+
+
+class StreamingTestCase(unittest.TestCase):
+    SETUP = "I-II-III B 1-1-1 A-A-Z HL-MO-AJ-CX-BZ-SR-NI-YW-DG-PK"
+    MESSAGE = "ARTIFICIALINTELLIGENCE" * 100
+
+    def setUp(self):
+        self.expected = EnigmaMachine(EnigmaSetup.from_string(self.SETUP)).encode(self.MESSAGE)
+
+    def test_read_chunks(self):
+        self.assertEqual(["ABC", "DEF", "G"], list(read_chunks(io.StringIO("ABCDEFG"), 3)))
+
+    def test_encode_chunks_carries_rotor_positions(self):
+        machine = CompiledEnigmaMachine(EnigmaSetup.from_string(self.SETUP))
+        chunks = [self.MESSAGE[i:i + 7] for i in range(0, len(self.MESSAGE), 7)]
+        self.assertEqual(self.expected, "".join(encode_chunks(machine, chunks)))
+
+    def test_encode_stream(self):
+        machine = CompiledEnigmaMachine(EnigmaSetup.from_string(self.SETUP))
+        writer = io.StringIO()
+
+        written = encode_stream(machine, io.StringIO(self.MESSAGE), writer, chunk_size=100)
+
+        self.assertEqual(len(self.MESSAGE), written)
+        self.assertEqual(self.expected, writer.getvalue())
+
+    def test_skip_non_letters(self):
+        machine = CompiledEnigmaMachine(EnigmaSetup.from_string(self.SETUP))
+        reader = io.StringIO("HELLO WORLD\nHELLO, WORLD!\n")
+        writer = io.StringIO()
+
+        encode_stream(machine, reader, writer, chunk_size=4, skip_non_letters=True)
+
+        expected = EnigmaMachine(EnigmaSetup.from_string(self.SETUP)).encode("HELLOWORLDHELLOWORLD")
+        self.assertEqual(f"{expected[:5]} {expected[5:10]}\n{expected[10:15]}, {expected[15:]}!\n", writer.getvalue())
+
+    def test_non_letters_are_rejected_by_default(self):
+        machine = CompiledEnigmaMachine(EnigmaSetup.from_string(self.SETUP))
+        self.assertRaises(ValueError, encode_stream, machine, io.StringIO("HELLO WORLD"), io.StringIO())
+
+
+if __name__ == '__main__':
+    unittest.main()